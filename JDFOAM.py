@@ -4,14 +4,21 @@ JDFOAM (JD's OpenFOAM Assistant) 是一个用于 GMSH 网格转换和 OpenFOAM 
 该模块作为程序的主入口点，支持命令行模式和图形界面模式两种运行方式。
 
 功能特性：
-- 支持命令行参数直接执行网格转换
+- 命令行模式（convert / check / bind / pdf / batch），不加载 Qt，支持 JSON 输出和退出码
+- 图形界面只运行一个实例，再次启动时把 .msh 文件、算例目录和操作转交给已运行的实例后立即退出
+- --profile-startup[=报告路径]：记录模块导入、窗口构造和首次绘制的耗时，首次绘制后写入报告并退出
 - 提供图形用户界面进行交互式操作
 - 集成 GMSH 到 OpenFOAM 的完整工作流程
 - 支持源代码文档生成和PDF导出
 """
 
-import os
-import sys
+import time
+
+# 主脚本开始执行的时间，用于统计 GUI 首次绘制的耗时
+start_time = time.perf_counter()
+
+import os  # noqa: E402
+import sys  # noqa: E402
 
 # 确保当前目录被识别，解决多文件调用的导入问题
 # 将当前目录添加到 Python 模块搜索路径中
@@ -19,24 +26,50 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# 导入核心网格转换功能
-from function.Gmsh2OpenFOAM import update_mesh_and_bc
+# 启动性能分析需要在导入其他模块之前开始，才能记录到所有模块的导入耗时
+from function import startup_profile  # noqa: E402
+
+profile_report_path, argv = startup_profile.parse_option(sys.argv[1:])
+if profile_report_path and __name__ == "__main__":
+    startup_profile.start(profile_report_path, start_time)
+
+# 命令行模块及其导入的模块都不依赖 Qt
+from function.cli import is_cli_invocation, main as cli_main  # noqa: E402
 
 
 if __name__ == "__main__":
-    # 检查命令行参数数量
-    # 如果提供了至少2个参数（脚本名、MSH文件、算例目录），则执行命令行模式
-    if len(sys.argv) >= 3:
-        # 执行网格转换和边界条件更新
-        # 参数1: MSH文件路径
-        # 参数2: OpenFOAM算例目录路径
-        update_mesh_and_bc(sys.argv[1], sys.argv[2])
+    # 打包后的程序以 spawn 方式启动 PDF 并行渲染子进程时，由此进入子进程的任务而不是再次启动程序；
+    # 未打包时 freeze_support 不做任何事，不必为它导入 multiprocessing
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+
+    # 第一个参数是子命令，或提供了 MSH 文件和算例目录两个参数（旧用法）时执行命令行模式
+    if is_cli_invocation(argv):
+        sys.exit(cli_main(argv))
     else:
-        # 参数不足，启动图形用户界面模式
-        from gui.qt_gui import run_jdfoam_gui
+        # 启动图形用户界面模式；单实例模式下已有实例运行时，把参数转交给它后立即退出，
+        # 不再重复加载界面、主题和配置。性能分析时总是启动新实例
+        from gui.single_instance import parse_gui_args, forward_request
+        from function.config import ConfigManager
+
+        request = parse_gui_args(argv)
+        with startup_profile.measure("单实例检测"):
+            config = ConfigManager()
+            config.load_config()
+            single_instance = (config.get_single_instance() and not request['new_instance']
+                               and not startup_profile.is_active())
+            forwarded = single_instance and forward_request(request)
+        if forwarded:
+            sys.exit(0)
+
+        with startup_profile.measure("导入图形界面模块"):
+            from function.Gmsh2OpenFOAM import update_mesh_and_bc
+            from gui.qt_gui import run_jdfoam_gui
 
         # 设置应用程序图标路径
         icon_path = os.path.join(current_dir, "icons", "JDFOAM.png")
 
         # 使用网格转换函数初始化GUI，传递图标路径
-        run_jdfoam_gui(update_func=update_mesh_and_bc, app_icon_path=icon_path if os.path.exists(icon_path) else None)
\ No newline at end of file
+        run_jdfoam_gui(update_func=update_mesh_and_bc, app_icon_path=icon_path if os.path.exists(icon_path) else None,
+                       start_time=start_time, request=request, single_instance=single_instance)
\ No newline at end of file
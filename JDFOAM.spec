@@ -22,6 +22,7 @@ a = Analysis(
         'PySide6.QtCore',
         'PySide6.QtGui',
         'PySide6.QtWidgets',
+        'PySide6.QtNetwork',  # 单实例模式的本地套接字
         # Windows 相关
         'win32com.client',
         'winreg',
@@ -29,11 +30,24 @@ a = Analysis(
         'function.Gmsh2OpenFOAM',
         'function.config',
         'function.SourceCodeBinder',
+        'function.pathfilter',
+        'function.archive',
+        'function.gitdiff',
+        'function.qtpdf',
+        'function.pdfparts',
+        'function.htmlcache',
+        'function.highlight',
+        'function.pdfcompact',
         'function.md2pdf',
+        'function.cli',
+        'function.startup_profile',
         'gui.qt_gui',
         'gui.theme',
         'gui.ui_JDFOAM',
         'gui.progressbar',
+        'gui.logpanel',
+        'gui.workers',
+        'gui.single_instance',
         # pdfkit 相关
         'pdfkit',
         'pdfkit.configuration',
@@ -64,7 +78,6 @@ a = Analysis(
         'PySide6.QtLocation',
         'PySide6.QtMultimedia',
         'PySide6.QtMultimediaWidgets',
-        'PySide6.QtNetwork',
         'PySide6.QtNetworkAuth',
         'PySide6.QtNfc',
         'PySide6.QtOpenGL',
@@ -0,0 +1,116 @@
+"""PDF 渲染器吞吐量对比
+
+对同一份 HTML 分别使用 wkhtmltopdf（pdfkit）和进程内 Qt 渲染器生成 PDF，
+报告耗时、页数和吞吐量。两个渲染器读取同一个预先生成的 HTML 文件，只比较渲染本身。
+
+用法：
+    python benchmarks/pdf_renderers.py [Markdown 文件] [--repeat N] [--sections N] [--wkhtmltopdf 路径] [--workers N]
+                                       [--profile standard|compact]
+
+不指定 Markdown 文件时生成一份合成的源码文档。未找到 wkhtmltopdf 时只测试 Qt 渲染器。
+Linux 无显示服务器时 Qt 自动使用 offscreen 平台。
+指定 --workers 大于 1 时额外测试分段并行渲染（文档需大于分段阈值，并已安装 pypdf）。
+指定 --profile compact 时每个配置再用紧凑导出运行一次，对比标准与紧凑导出的 PDF 大小。
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.md2pdf import find_wkhtmltopdf, markdown_file_to_html, markdown_to_pdf, pdf_profiles  # noqa: E402
+
+
+def make_document(sections):
+    """生成合成的源码 Markdown 文档，每节约 60 行 Python 代码"""
+    lines = ["# benchmark 源代码汇总\n", "## 目录\n"]
+    lines += [f"- [{i}. src/module_{i}.py](#file-{i})" for i in range(1, sections + 1)]
+    lines.append("\n---\n")
+    body = "\n".join(f"def function_{n}(value):\n    \"\"\"示例函数 {n}\"\"\"\n    return value * {n} + len(str(value))\n"
+                     for n in range(20))
+    for i in range(1, sections + 1):
+        lines.append(f'<a name="file-{i}"></a>\n## {i}. src/module_{i}.py\n\n```python\n{body}```\n')
+        lines.append(f"**大小**: {len(body)} B | **语言**: python\n\n---\n")
+    return "\n".join(lines)
+
+
+def count_pages(pdf_path):
+    """粗略统计 PDF 页数（页对象的数量）"""
+    with open(pdf_path, 'rb') as f:
+        data = f.read()
+    return data.count(b'/Type /Page') - data.count(b'/Type /Pages') or data.count(b'/Type/Page') - data.count(b'/Type/Pages')
+
+
+def run(renderer, md_path, pdf_path, repeat, wkhtmltopdf_path, workers=1, profile='standard'):
+    """运行指定渲染器若干次，返回最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if not markdown_to_pdf(md_path, pdf_path, wkhtmltopdf_path, logger=None, renderer=renderer, workers=workers,
+                               profile=profile, strip_sections=(profile == 'compact')):
+            return None
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 渲染器吞吐量对比")
+    parser.add_argument('markdown', nargs='?', help="Markdown 文件（默认生成合成文档）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个渲染器的重复次数，取最短耗时")
+    parser.add_argument('--sections', type=int, default=200, help="合成文档的章节数")
+    parser.add_argument('--wkhtmltopdf', default=None, help="wkhtmltopdf 可执行文件路径")
+    parser.add_argument('--workers', type=int, default=1, help="并行渲染的进程数，0 表示 CPU 核心数")
+    parser.add_argument('--profile', choices=pdf_profiles, default='standard',
+                        help="compact 时额外测试紧凑导出（同时去掉完整路径行和回到目录链接）")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='jdfoam_pdf_bench_')
+    try:
+        md_path = os.path.join(work_dir, 'bench.md')
+        if args.markdown:
+            shutil.copyfile(args.markdown, md_path)
+        else:
+            with open(md_path, 'w', encoding='utf-8') as f:
+                f.write(make_document(args.sections))
+        # 预先写入同名 HTML，两个渲染器都直接读取它
+        html_path = os.path.join(work_dir, 'bench.html')
+        markdown_file_to_html(md_path, html_path)
+        html_mb = os.path.getsize(html_path) / 1024 / 1024
+
+        renderers = ['qt']
+        if find_wkhtmltopdf(args.wkhtmltopdf):
+            renderers.insert(0, 'wkhtmltopdf')
+        else:
+            print("未找到 wkhtmltopdf，跳过 pdfkit 测试")
+
+        print(f"HTML 大小: {html_mb:.2f} MB，重复 {args.repeat} 次取最短耗时")
+        print(f"{'渲染器':<24}{'耗时(s)':>10}{'页数':>8}{'页/秒':>10}{'MB/秒':>10}{'PDF(MB)':>10}")
+        runs = [(renderer, 1) for renderer in renderers]
+        if args.workers != 1:
+            runs += [(renderer, args.workers) for renderer in renderers]
+        profiles = ['standard'] if args.profile == 'standard' else ['standard', 'compact']
+        runs = [(renderer, workers, profile) for renderer, workers in runs for profile in profiles]
+        for renderer, workers, profile in runs:
+            label = renderer if workers == 1 else f"{renderer} x{workers or os.cpu_count()}"
+            if profile != 'standard':
+                label += f" {profile}"
+            pdf_path = os.path.join(work_dir, f'bench_{renderer}_{workers}_{profile}.pdf')
+            elapsed = run(renderer, md_path, pdf_path, args.repeat, args.wkhtmltopdf, workers, profile)
+            if elapsed is None:
+                print(f"{label:<24}{'失败':>10}")
+                continue
+            pages = count_pages(pdf_path)
+            pdf_mb = os.path.getsize(pdf_path) / 1024 / 1024
+            print(f"{label:<24}{elapsed:>10.2f}{pages:>8}{pages / elapsed:>10.1f}"
+                  f"{html_mb / elapsed:>10.2f}{pdf_mb:>10.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""启动耗时对比
+
+以 --profile-startup 多次启动源码程序和打包程序，汇总各次的启动性能报告，
+对比进程创建到主脚本开始、各构造阶段、首次绘制和模块导入的耗时（取中位数）。
+
+用法：
+    python benchmarks/startup.py [目标 ...] [--repeat N] [--top N] [--build]
+
+目标为 source（使用当前 Python 运行 JDFOAM.py）或打包后的 JDFOAM 可执行文件路径，不指定时只测试源码。
+指定 --build 时先用 PyInstaller 按 JDFOAM.spec 打包到临时目录（与 build_exe.py 使用同一个 spec），
+再把打包结果加入对比。Linux 无显示服务器时 Qt 自动使用 offscreen 平台。
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from function.startup_profile import option_name, pad  # noqa: E402
+
+
+def build_spec(work_dir):
+    """按 JDFOAM.spec 打包，返回打包后的可执行文件路径；失败时返回 None"""
+    dist_dir = os.path.join(work_dir, 'dist')
+    print("正在按 JDFOAM.spec 打包 ...")
+    result = subprocess.run([sys.executable, '-m', 'PyInstaller', 'JDFOAM.spec', '--noconfirm',
+                             '--distpath', dist_dir, '--workpath', os.path.join(work_dir, 'build')],
+                            cwd=root_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stdout[-2000:] + result.stderr[-2000:])
+        return None
+    name = 'JDFOAM.exe' if sys.platform == 'win32' else 'JDFOAM'
+    # spec 为单目录打包；单文件打包的可执行文件直接位于 dist 下
+    for path in (os.path.join(dist_dir, 'JDFOAM', name), os.path.join(dist_dir, name)):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def get_command(target):
+    """获取启动目标的命令"""
+    if target == 'source':
+        return [sys.executable, os.path.join(root_dir, 'JDFOAM.py')]
+    return [os.path.abspath(target)]
+
+
+def run(target, report_path, timeout):
+    """启动一次目标，返回 (启动到退出的耗时(ms), 报告内容)；未生成报告时返回 None"""
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    env = dict(os.environ)
+    if sys.platform.startswith('linux') and not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    start = time.perf_counter()
+    try:
+        # 打包程序的工作目录为可执行文件所在目录，与从资源管理器启动时相同
+        subprocess.run(get_command(target) + [f'{option_name}={report_path}'], env=env, timeout=timeout,
+                       cwd=os.path.dirname(get_command(target)[-1]),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except subprocess.TimeoutExpired:
+        pass
+    elapsed = (time.perf_counter() - start) * 1000
+    if not os.path.exists(report_path):
+        return None
+    with open(report_path, 'r', encoding='utf-8') as f:
+        return elapsed, json.load(f)
+
+
+def summarize(runs):
+    """汇总一个目标的多次运行结果，返回 (指标 -> 中位数, 模块名 -> 自身耗时中位数, 运行方式)"""
+    metrics = {}
+    modules = {}
+    for elapsed, report in runs:
+        values = {'启动到退出（外部计时）': elapsed,
+                  '进程创建 -> 主脚本开始': report['process_to_main_ms'],
+                  f"模块导入合计（{report['import_count']} 个）": report['import_total_ms']}
+        values.update(report['marks'])
+        values.update({phase['name']: phase['ms'] for phase in report['phases']})
+        for name, value in values.items():
+            if value is not None:
+                metrics.setdefault(name, []).append(value)
+        for item in report['imports']:
+            modules.setdefault(item['module'], []).append(item['self_ms'])
+    return ({name: statistics.median(values) for name, values in metrics.items()},
+            {name: statistics.median(values) for name, values in modules.items()},
+            runs[0][1]['mode'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时对比")
+    parser.add_argument('targets', nargs='*', help="source 或打包后的可执行文件路径（默认 source）")
+    parser.add_argument('--repeat', type=int, default=5, help="每个目标的启动次数，取中位数")
+    parser.add_argument('--top', type=int, default=15, help="列出的模块数（按自身耗时排序）")
+    parser.add_argument('--build', action='store_true', help="先按 JDFOAM.spec 打包并加入对比")
+    parser.add_argument('--timeout', type=float, default=60, help="每次启动的超时时间（秒）")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='jdfoam_startup_bench_')
+    try:
+        targets = list(args.targets) or ['source']
+        if args.build:
+            executable = build_spec(work_dir)
+            if executable is None:
+                print("打包失败，跳过打包程序")
+            else:
+                targets.append(executable)
+
+        summaries = []
+        for index, target in enumerate(targets):
+            report_path = os.path.join(work_dir, f'report_{index}.json')
+            runs = [result for result in (run(target, report_path, args.timeout) for _ in range(args.repeat))
+                    if result is not None]
+            if not runs:
+                print(f"{target}: 未生成启动性能报告，跳过")
+                continue
+            summaries.append((target, len(runs)) + summarize(runs))
+        if not summaries:
+            return 1
+
+        for number, (target, count, _, _, mode) in enumerate(summaries, 1):
+            print(f"[{number}] {target}（{mode}，{count} 次）")
+        print(f"\n{pad('指标（ms，中位数）', 36)}" + "".join(f"{f'[{n}]':>10}" for n in range(1, len(summaries) + 1)))
+        names = []
+        for _, _, metrics, _, _ in summaries:
+            names += [name for name in metrics if name not in names]
+        for name in names:
+            cells = "".join(f"{metrics[name]:>10.1f}" if name in metrics else f"{'-':>10}"
+                            for _, _, metrics, _, _ in summaries)
+            print(f"{pad(name, 36)}{cells}")
+
+        for number, (target, _, _, modules, _) in enumerate(summaries, 1):
+            print(f"\n[{number}] 自身耗时最多的 {args.top} 个模块（ms，中位数）:")
+            for name, ms in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+                print(f"{ms:>10.1f}  {name}")
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
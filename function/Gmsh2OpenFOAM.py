@@ -5,7 +5,10 @@
 - Windows 路径到 WSL 路径的转换
 - 边界类型自动识别和修改
 - 网格转换和边界条件更新的完整流程
+- 运行 checkMesh 并提取网格质量指标
 - 支持进度回调和日志输出
+
+该模块不依赖 Qt，命令行模式只导入它即可完成网格转换；GUI 使用的工作线程位于 gui/workers.py。
 """
 
 """MSH 文件解析模块
@@ -114,9 +117,51 @@ def generate_boundary_sed_commands(boundary_names):
 - 执行网格质量检查
 """
 
+import sys
 import subprocess
 
 
+def build_case_command(case_dir, env_source, cmd):
+    """
+    构建在算例目录中加载 OpenFOAM 环境后执行命令的 shell 命令
+
+    Windows 上通过 WSL 执行，其他平台直接使用 bash。
+
+    Args:
+        case_dir (str): 算例目录路径
+        env_source (str): OpenFOAM 环境源命令
+        cmd (str): 要执行的命令
+
+    Returns:
+        str: 完整的 shell 命令
+    """
+    # 使用双引号包裹 bash -c 的命令，并转义内部的双引号
+    escaped_cmd = cmd.replace('"', '\\"')
+    full_cmd = f"bash -c \"cd \\\"{to_wsl_path(case_dir)}\\\" && {env_source} && {escaped_cmd}\""
+    return "wsl " + full_cmd if sys.platform == 'win32' else full_cmd
+
+
+def run_case_command(case_dir, env_source, cmd, logger=print):
+    """
+    在算例目录中执行命令，逐行输出日志
+
+    Args:
+        case_dir (str): 算例目录路径
+        env_source (str): OpenFOAM 环境源命令
+        cmd (str): 要执行的命令
+        logger (callable): 日志输出函数，默认为 print
+
+    Returns:
+        int: 命令的退出码
+    """
+    process = subprocess.Popen(build_case_command(case_dir, env_source, cmd), shell=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, encoding='utf-8', errors='replace')
+    for line in process.stdout:
+        logger(line.strip())
+    return process.wait()
+
+
 def update_mesh_and_bc(msh_file, case_dir, logger=print, env_source=None, progress_callback=None):
     """
     更新网格和边界条件
@@ -140,7 +185,6 @@ def update_mesh_and_bc(msh_file, case_dir, logger=print, env_source=None, progre
         bool: 处理是否成功
     """
     wsl_msh = to_wsl_path(msh_file)
-    wsl_case = to_wsl_path(case_dir)
     if env_source is None:
         env_source = "source /usr/lib/openfoam/openfoam2506/etc/bashrc"
 
@@ -176,84 +220,79 @@ def update_mesh_and_bc(msh_file, case_dir, logger=print, env_source=None, progre
 
     # 执行命令并更新进度
     for cmd, progress_val in commands:
-        # 使用更安全的命令构建方式，确保路径被正确引用
-        # 使用双引号包裹 bash -c 的命令，并转义内部的双引号
-        escaped_cmd = cmd.replace('"', '\\"')
-        full_cmd = f"wsl bash -c \"cd \\\"{wsl_case}\\\" && {env_source} && {escaped_cmd}\""
-        process = subprocess.Popen(full_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace')
-        for line in process.stdout:
-            logger(line.strip())
-        process.wait()
+        returncode = run_case_command(case_dir, env_source, cmd, logger)
 
         # 更新进度
         if progress_callback:
             progress_callback(progress_val)
 
         # 如果命令执行失败，提前返回
-        if process.returncode != 0 and not cmd.startswith("if [ -f"):  # 忽略条件命令的返回值
+        if returncode != 0 and not cmd.startswith("if [ -f"):  # 忽略条件命令的返回值
             return False
 
     # 最终进度
     if progress_callback:
         progress_callback(100)
 
-    return process.returncode == 0
+    return returncode == 0
 
 
-"""工作线程模块，用于执行耗时操作
+"""网格检查模块
 
-提供在后台线程中执行网格转换等耗时操作的功能，避免阻塞 GUI 线程，
-同时支持日志输出、进度更新和完成状态通知。
+运行 OpenFOAM 的 checkMesh，并从输出中提取单元数、伸缩比、非正交度、偏斜度和失败的检查项数。
 """
 
-from PySide6.QtCore import QThread, Signal
 
+def run_check_mesh(case_dir, logger=print, env_source=None):
+    """
+    在算例目录中运行 checkMesh
+
+    checkMesh 在发现网格问题时也会返回非零退出码，因此不以退出码判断成败，而是返回完整输出由调用方解析。
 
-class WorkerThread(QThread):
-    """工作线程，用于执行耗时操作
+    Args:
+        case_dir (str): OpenFOAM 算例目录路径
+        logger (callable): 日志输出函数，默认为 print
+        env_source (str): OpenFOAM 环境源路径
 
-    该线程类封装了网格转换操作，提供信号机制与主线程通信：
-    - log_signal: 发送日志消息
-    - progress_signal: 发送进度更新
-    - finished_signal: 发送完成状态
+    Returns:
+        str: checkMesh 的完整输出
+    """
+    if env_source is None:
+        env_source = "source /usr/lib/openfoam/openfoam2506/etc/bashrc"
+    lines = []
+
+    def collect(line):
+        lines.append(line)
+        logger(line)
+
+    run_case_command(case_dir, env_source, "checkMesh", collect)
+    return '\n'.join(lines)
+
+
+def parse_check_mesh(output):
+    """
+    从 checkMesh 的输出中提取网格质量指标
+
+    Args:
+        output (str): checkMesh 的输出
+
+    Returns:
+        dict: cells、max_aspect_ratio、max_non_orthogonality、avg_non_orthogonality、max_skewness
+            （未找到时为 None），failed_checks（失败的检查项数）和 mesh_ok（是否输出了 "Mesh OK"）
     """
-    # 定义线程间通信的信号
-    log_signal = Signal(str)          # 日志信号，用于发送日志消息
-    progress_signal = Signal(int)     # 进度信号，用于发送进度值 (0-100)
-    finished_signal = Signal(bool, str)  # 完成信号，发送成功状态和错误信息
-
-    def __init__(self, update_func, msh_path, case_path, env_source=None):
-        """
-        初始化工作线程
-
-        Args:
-            update_func (callable): 网格更新函数
-            msh_path (str): MSH 文件路径
-            case_path (str): 算例目录路径
-            env_source (str): OpenFOAM 环境源路径
-        """
-        super().__init__()
-        self.update_func = update_func  # 网格更新函数
-        self.msh_path = msh_path        # MSH 文件路径
-        self.case_path = case_path      # 算例目录路径
-        self.env_source = env_source    # OpenFOAM 环境源路径
-
-    def run(self):
-        """执行线程主任务
-
-        在后台线程中执行网格转换操作，并通过信号与主线程通信
-        """
-        try:
-            # 执行网格更新函数，传入信号发射器作为回调
-            success = self.update_func(
-                self.msh_path,           # MSH 文件路径
-                self.case_path,          # 算例目录路径
-                logger=self.log_signal.emit,           # 日志回调
-                env_source=self.env_source,            # 环境变量
-                progress_callback=self.progress_signal.emit  # 进度回调
-            )
-            # 发送完成信号，表示操作成功
-            self.finished_signal.emit(success, "")
-        except Exception as e:
-            # 发送完成信号，表示操作失败
-            self.finished_signal.emit(False, str(e))
\ No newline at end of file
+    def find_number(pattern):
+        # 多行模式：以 ^ 开头的规则按行匹配，而不是只匹配输出开头
+        match = re.search(pattern, output, re.MULTILINE)
+        return float(match.group(1)) if match else None
+
+    cells = find_number(r'^\s*cells:\s*(\d+)')
+    failed = re.search(r'Failed (\d+) mesh checks', output)
+    return {
+        'cells': int(cells) if cells is not None else None,
+        'max_aspect_ratio': find_number(r'Max aspect ratio = ([\d.eE+-]+)'),
+        'max_non_orthogonality': find_number(r'Mesh non-orthogonality Max: ([\d.eE+-]+)'),
+        'avg_non_orthogonality': find_number(r'Mesh non-orthogonality Max: [\d.eE+-]+ average: ([\d.eE+-]+)'),
+        'max_skewness': find_number(r'Max skewness = ([\d.eE+-]+)'),
+        'failed_checks': int(failed.group(1)) if failed else 0,
+        'mesh_ok': 'Mesh OK' in output,
+    }
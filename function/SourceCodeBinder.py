@@ -6,10 +6,33 @@
 - 智能识别多种编程语言
 - 过滤二进制文件和非文本文件
 - 生成带目录的 Markdown 文档
+- 基于文件清单缓存的增量重建
+- 识别 OpenFOAM 算例结构，只收录字典文件
+- 按大小预算截断超大文件，折叠 nonuniform List 列表
+- 按目标大小拆分为多个分卷并生成索引文件
+- 按内容哈希去重，重复文件只引用首次出现的章节
+- 直接读取 zip / tar 归档，无需解压
+- 在同一次流式读取中同时输出 HTML 和 JSONL
+- 只合并 git 中变更的文件，并可附带统一差异
+- 按配置完成扫描和合并的整个流程，GUI 和命令行共用
 - 支持进度回调和日志输出
 """
 
 import os
+import io
+import re
+import html
+import json
+import queue
+import shutil
+import codecs
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from function.pathfilter import PathMatcher, ignore_file_names
+from function.archive import ArchiveSource, is_archive, get_project_name
+from function.gitdiff import list_changed_files, get_diff_hash, GitTreeSource, collect_diffs
 
 
 # --- 配置部分 ---
@@ -29,6 +52,73 @@ include_extensions = {
     '.vb': 'vbnet', '.dart': 'dart', '.scala': 'scala', '.vue': 'vue', '.jsx': 'jsx', '.tsx': 'tsx',
     '.txt': 'text', '.rst': 'rst', '.tex': 'tex'
 }
+# 扫描配置：auto 自动识别 OpenFOAM 算例，source 普通源码项目，openfoam 强制按算例处理
+scan_profiles = ('auto', 'source', 'openfoam')
+# OpenFOAM 算例的剪枝规则（gitignore 语法）：跳过并行分解目录、后处理数据和 polyMesh 中的大型列表
+openfoam_case_rules = [
+    'processor*/',
+    'postProcessing/',
+    'dynamicCode/',
+    'VTK/',
+    '**/polyMesh/*',
+    '!**/polyMesh/boundary',
+]
+# OpenFOAM 时间步目录名称（位于算例根目录，初始时间 0 除外）
+openfoam_time_dir_regex = r'(?!0$)[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+# 增量缓存清单文件后缀，清单保存在输出文件旁边，如 xxx_source_code.md.manifest.json
+manifest_suffix = '.manifest.json'
+# 清单格式版本，格式变化时递增以使旧清单失效
+manifest_version = 3
+# 读取和复制文件时使用的块大小
+chunk_size = 64 * 1024
+# 单个文件嵌入的最大字节数，超出时只保留开头和结尾片段（0 表示不限制）
+max_file_bytes = 512 * 1024
+# 整个文档嵌入的最大字节数，超出后的文件只保留占位说明（0 表示不限制）
+max_total_bytes = 64 * 1024 * 1024
+# 是否将 OpenFOAM 的 nonuniform List<...> 列表内容折叠为元素个数
+collapse_foam_lists = True
+# 分卷的目标大小（字节），0 表示输出单个文件
+max_part_bytes = 0
+# 分卷文件名格式，插入在输出文件扩展名之前
+part_name_format = '.part{:03d}'
+# 是否按内容哈希对重复文件去重
+dedup_files = True
+# 去重时并行计算哈希的线程数，None 表示按 CPU 核数
+hash_workers = None
+# 除 Markdown 外默认同时输出的格式，可选 'html'、'jsonl'
+extra_formats = ()
+# HTML 输出使用的样式，与 PDF 导出的样式保持一致
+html_style = """
+    body { font-family: 'Segoe UI', Arial, sans-serif; padding: 40px; line-height: 1.6; color: #333; }
+    pre { background: #f6f8fa; padding: 16px; border-radius: 6px; border: 1px solid #ddd; white-space: pre-wrap; font-size: 12px; }
+    code { font-family: 'Consolas', 'Courier New', monospace; color: #000; }
+    h2 { border-bottom: 2px solid #eaecef; padding-bottom: 5px; margin-top: 40px; color: #0366d6; }
+    a { color: #0366d6; text-decoration: none; }
+    ul { background: #f1f8ff; padding: 20px 40px; border-radius: 8px; }
+"""
+# 预读线程最多缓存的数据块数量，峰值内存约为 prefetch_depth * chunk_size，与文件大小无关
+prefetch_depth = 16
+
+
+def detect_language_from_head(head, ext):
+    """
+    根据扩展名和文件开头内容识别代码块语言标签
+
+    Args:
+        head (bytes): 文件开头的原始字节
+        ext (str): 文件扩展名
+
+    Returns:
+        str: 对应的 Markdown 代码块语言标识
+    """
+    if ext in include_extensions:
+        return include_extensions[ext]
+    head = head[:1000].decode('utf-8', errors='ignore').lower()
+    if "foamfile" in head or "c++" in head: return "cpp"
+    if head.startswith("#!"):
+        if "python" in head: return "python"
+        if "sh" in head: return "bash"
+    return "text"
 
 
 def detect_language(file_path, ext):
@@ -47,23 +137,43 @@ def detect_language(file_path, ext):
     if ext in include_extensions:
         return include_extensions[ext]
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            head = f.read(1000).lower()
-            if "foamfile" in head or "c++" in head: return "cpp"
-            if head.startswith("#!"):
-                if "python" in head: return "python"
-                if "sh" in head: return "bash"
-    except: pass
-    return "text"
+        with open(file_path, 'rb') as f:
+            return detect_language_from_head(f.read(1000), ext)
+    except OSError:
+        return "text"
+
+
+def is_text_chunk(chunk):
+    """
+    判断文件开头的字节块是否为文本
+
+    1. 检查是否包含空字符 \0 (二进制文件的典型特征)
+    2. 尝试进行 utf-8 解码验证，允许末尾被截断的多字节字符
+
+    Args:
+        chunk (bytes): 文件开头的字节块（通常为前 1024 字节）
+
+    Returns:
+        bool: 是否为文本
+    """
+    if not chunk:
+        return True  # 空文件视为文本
+    # 二进制文件（如 exe, pyc, jpg）通常包含 \0
+    if b'\0' in chunk:
+        return False
+    # 尝试解码确认是否为文本
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(chunk, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
 
 
 def is_text_file(file_path):
     """
     强化版文本检测（过滤乱码/二进制文件）
 
-    通过多种方法检测文件是否为文本文件，避免将二进制文件误识别为文本文件
-    1. 检查前 1024 字节是否包含空字符 \0 (二进制文件的典型特征)
-    2. 尝试进行 utf-8 解码验证
+    读取文件前 1024 字节并交给 is_text_chunk 判断，避免将二进制文件误识别为文本文件
 
     Args:
         file_path (str): 文件路径
@@ -73,37 +183,124 @@ def is_text_file(file_path):
     """
     try:
         with open(file_path, 'rb') as f:
-            chunk = f.read(1024)
-            if not chunk:
-                return True  # 空文件视为文本
-            # 二进制文件（如 exe, pyc, jpg）通常包含 \0
-            if b'\0' in chunk:
-                return False
-            # 尝试解码确认是否为文本
-            chunk.decode('utf-8')
-            return True
-    except (UnicodeDecodeError, PermissionError, OSError):
+            return is_text_chunk(f.read(1024))
+    except (PermissionError, OSError):
         return False
 
 
-def scan_directory(root_dir, exclude_dirs_param=None, progress_callback=None, log_callback=None):
+def is_openfoam_case(root_dir):
+    """
+    判断目录是否为 OpenFOAM 算例
+
+    Args:
+        root_dir (str): 目录路径
+
+    Returns:
+        bool: 目录下是否存在 system/controlDict
+    """
+    return os.path.isfile(os.path.join(root_dir, 'system', 'controlDict'))
+
+
+def open_source(full_path, source=None):
+    """
+    以二进制方式打开待合并的文件
+
+    Args:
+        full_path (str): 文件完整路径
+        source (ArchiveSource): 归档读取器，为 None 时从文件系统读取
+
+    Returns:
+        file: 二进制文件对象
+    """
+    if source is not None:
+        return source.open(full_path)
+    return open(full_path, 'rb', buffering=chunk_size)
+
+
+def stat_source(full_path, source=None):
+    """
+    获取待合并文件的状态信息
+
+    Args:
+        full_path (str): 文件完整路径
+        source (ArchiveSource): 归档读取器，为 None 时从文件系统读取
+
+    Returns:
+        os.stat_result: 文件状态（归档成员为 MemberStat）
+    """
+    if source is not None:
+        return source.stat(full_path)
+    return os.stat(full_path)
+
+
+def build_path_matcher(exclude_dirs_param=None, include_globs=None, exclude_globs=None, openfoam_case=False):
+    """
+    构建扫描使用的路径匹配器
+
+    默认规则包括排除目录、所有 .bat 文件和主目录下的 .txt 文件；
+    配置的排除通配符优先于 .gitignore，包含通配符优先级最高。
+
+    Args:
+        exclude_dirs_param (set): 要排除的目录集合（可选）
+        include_globs (list): 强制包含的通配符列表（可选）
+        exclude_globs (list): 额外排除的通配符列表（可选）
+        openfoam_case (bool): 是否加入 OpenFOAM 算例剪枝规则
+
+    Returns:
+        PathMatcher: 路径匹配器
+    """
+    if exclude_dirs_param is None:
+        exclude_dirs_param = exclude_dirs
+
+    matcher = PathMatcher()
+    for dir_name in exclude_dirs_param:
+        matcher.add_default_rule(f"{dir_name}/")
+    # 排除所有 .bat 文件
+    matcher.add_default_rule("*.bat")
+    # 排除主目录下的 .txt 文件
+    matcher.add_default_rule("/*.txt")
+
+    if openfoam_case:
+        for rule in openfoam_case_rules:
+            matcher.add_default_rule(rule)
+        matcher.add_default_regex(openfoam_time_dir_regex, dir_only=True)
+
+    for pattern in exclude_globs or []:
+        matcher.add_override_rule(pattern)
+    for pattern in include_globs or []:
+        matcher.add_override_rule(pattern if pattern.startswith('!') else '!' + pattern)
+    return matcher
+
+
+def scan_directory(root_dir, exclude_dirs_param=None, progress_callback=None, log_callback=None,
+                   include_globs=None, exclude_globs=None, use_ignore_files=True, profile='auto',
+                   cancel_callback=None, source=None):
     """
     扫描目录，收集所有符合条件的源代码文件
 
-    递归扫描指定目录下的所有文件，过滤出符合条件的源代码文件
+    递归扫描指定目录下的所有文件，按目录和扩展名过滤出候选源代码文件。
+    排除目录、.gitignore / .ignore 规则以及配置的包含/排除通配符被编译为一个匹配器，
+    在遍历时直接剪枝被排除的子目录。
+    扫描阶段不打开源文件，二进制文件由 combine_files_to_markdown 在读取时剔除。
+    root_dir 也可以是 zip / tar 归档，此时只读取成员头信息，按相同的规则过滤成员。
 
     Args:
         root_dir (str): 根目录路径
         exclude_dirs_param (set): 要排除的目录集合（可选）
         progress_callback (callable): 进度回调函数
         log_callback (callable): 日志回调函数
+        include_globs (list): 强制包含的通配符列表，命中时忽略扩展名限制（可选）
+        exclude_globs (list): 额外排除的通配符列表，gitignore 语法（可选）
+        use_ignore_files (bool): 是否读取项目中的 .gitignore / .ignore 文件
+        profile (str): 扫描配置，'auto'、'source' 或 'openfoam'。
+            OpenFOAM 算例会跳过 0 以外的时间步目录、processor* 目录、polyMesh 大型列表
+            和 postProcessing 数据，只保留 system/、0/ 和 constant/ 下的字典
+        cancel_callback (callable): 取消检查函数，返回 True 时停止扫描（可选）
+        source (ArchiveSource): 已打开的归档读取器（可选），root_dir 为归档且未提供时临时打开
 
     Returns:
-        list: 文件路径列表，格式为 [(full_path, rel_path, ext), ...]
+        list: 文件路径列表，格式为 [(full_path, rel_path, ext), ...]；取消时返回空列表
     """
-    if exclude_dirs_param is None:
-        exclude_dirs_param = exclude_dirs
-
     # 检查目录是否存在
     if not os.path.exists(root_dir):
         msg = f"错误: 目录不存在: {root_dir}"
@@ -111,41 +308,72 @@ def scan_directory(root_dir, exclude_dirs_param=None, progress_callback=None, lo
             log_callback(msg)
         return []
 
-    if not os.path.isdir(root_dir):
+    archive = source is not None or is_archive(root_dir)
+    if not archive and not os.path.isdir(root_dir):
         msg = f"错误: 路径不是目录: {root_dir}"
         if log_callback:
             log_callback(msg)
         return []
 
-    folder_name = os.path.basename(os.path.normpath(root_dir))
-    output_filename = f"{folder_name}_source_code.md"
-    output_path = os.path.join(root_dir, output_filename)
+    folder_name = get_project_name(root_dir)
+    # 输出文件、分卷、缓存清单和临时文件都以此为前缀
+    output_prefix = f"{folder_name}_source_code."
 
-    valid_files = []
-    msg = f"🔍 正在扫描并过滤乱码: {folder_name}"
+    msg = f"🔍 正在扫描: {folder_name}"
     if log_callback:
         log_callback(msg)
 
+    members = None
+    if archive:
+        own_source = source is None
+        if own_source:
+            source = ArchiveSource(root_dir)
+        try:
+            members = list_archive_files(source, use_ignore_files)
+        finally:
+            if own_source:
+                source.close()
+
+    openfoam_case = profile == 'openfoam' or (profile == 'auto' and (
+        members[2] if members is not None else is_openfoam_case(root_dir)))
+    if openfoam_case and log_callback:
+        log_callback("🧪 检测到 OpenFOAM 算例，跳过时间步、processor* 、polyMesh 列表和 postProcessing 数据")
+    matcher = build_path_matcher(exclude_dirs_param, include_globs, exclude_globs, openfoam_case)
+
     # 预扫描，计算需要处理的文件总数
     all_potential_files = []
-    for root, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if d not in exclude_dirs_param]
-        for file in files:
-            if file == output_filename: continue  # 不扫描自己
-            full_path = os.path.join(root, file)
-            ext = os.path.splitext(file)[1].lower()
-
-            # 排除主目录下的 .txt 文件
-            if ext == '.txt' and os.path.normpath(root) == os.path.normpath(root_dir):
-                continue
+    if members is not None:
+        archive_files, ignore_texts, _ = members
+        for dir_name, text in ignore_texts:
+            matcher.add_ignore_lines(text.splitlines(), dir_name)
+        archive_files = [(rel_path, full_path) for rel_path, full_path in archive_files
+                         if not is_output_path(rel_path, output_prefix)]
+        all_potential_files = filter_listed_files(archive_files, matcher)
+    else:
+        for root, dirs, files in os.walk(root_dir):
+            if cancel_callback and cancel_callback():
+                if log_callback:
+                    log_callback("⏹️ 扫描已取消")
+                return []
+            rel_root = os.path.relpath(root, root_dir).replace(os.sep, '/')
+            prefix = '' if rel_root == '.' else rel_root + '/'
+            if use_ignore_files:
+                matcher.load_ignore_files(root, prefix.rstrip('/'))
 
-            # 排除所有 .bat 文件
-            if ext == '.bat':
-                continue
+            # 剪枝被排除的子目录和导出 PDF 时生成的缓存目录，使其内容不会被列出
+            dirs[:] = sorted(d for d in dirs
+                             if not d.startswith(output_prefix) and not matcher.is_excluded(prefix + d, is_dir=True))
+            for file in sorted(files):
+                if file.startswith(output_prefix): continue  # 不扫描自己及其分卷、缓存清单、临时文件
+                verdict = matcher.match(prefix + file)
+                if verdict:
+                    continue
+                full_path = os.path.join(root, file)
+                ext = os.path.splitext(file)[1].lower()
 
-            # 后缀匹配且通过文本特征检测
-            if ext in include_extensions or (ext == ''):
-                if is_text_file(full_path):
+                # 后缀匹配即加入候选，文本特征检测推迟到合并时与读取内容共用一次打开
+                # 被包含通配符显式命中的文件不受扩展名限制
+                if verdict is False or ext in include_extensions or (ext == ''):
                     all_potential_files.append((full_path, os.path.relpath(full_path, root_dir), ext))
 
     total_files = len(all_potential_files)
@@ -157,7 +385,7 @@ def scan_directory(root_dir, exclude_dirs_param=None, progress_callback=None, lo
             progress_callback(100)
         return []
 
-    msg = f"✅ 找到 {total_files} 个有效文件"
+    msg = f"✅ 找到 {total_files} 个候选文件"
     if log_callback:
         log_callback(msg)
 
@@ -165,68 +393,1390 @@ def scan_directory(root_dir, exclude_dirs_param=None, progress_callback=None, lo
     return all_potential_files
 
 
-def combine_files_to_markdown(files, output_path, root_dir, progress_callback=None):
+def list_archive_files(source, use_ignore_files=True):
+    """
+    读取归档中的文件列表以及其中的忽略规则
+
+    Args:
+        source (ArchiveSource): 归档读取器
+        use_ignore_files (bool): 是否读取归档中的 .gitignore / .ignore 文件
+
+    Returns:
+        tuple: (文件列表 [(rel_path, full_path), ...], 忽略文件内容 [(所在目录, 文本), ...], 是否为 OpenFOAM 算例)
+    """
+    files = source.list_files()
+    ignore_texts = []
+    if use_ignore_files:
+        # 按归档中的顺序读取（压缩的 tar 不能高效地向回定位），
+        # 再按路径排序，父目录中的规则先于子目录加入，与遍历目录时的顺序一致
+        for rel_path, full_path in files:
+            dir_name, _, name = rel_path.rpartition('/')
+            if name in ignore_file_names:
+                with source.open(full_path) as f:
+                    ignore_texts.append((rel_path, dir_name, f.read().decode('utf-8', errors='ignore')))
+        ignore_texts = [(dir_name, text) for _, dir_name, text in sorted(ignore_texts)]
+    is_case = any(rel_path == 'system/controlDict' for rel_path, _ in files)
+    return files, ignore_texts, is_case
+
+
+def is_output_path(rel_path, output_prefix):
+    """
+    判断相对路径是否属于合并输出
+
+    输出文件、分卷、缓存清单、临时文件以及导出 PDF 时生成的缓存目录都以 output_prefix 开头，
+    任一级路径以它开头即视为输出，与遍历目录时剪枝的规则一致。
+
+    Args:
+        rel_path (str): 相对路径，使用 / 分隔
+        output_prefix (str): 输出文件名前缀，如 "project_source_code."
+
+    Returns:
+        bool: 是否属于合并输出
+    """
+    return any(part.startswith(output_prefix) for part in rel_path.split('/'))
+
+
+def filter_listed_files(files, matcher):
+    """
+    按扫描规则过滤已列出的文件（归档成员或 git 变更文件）
+
+    与遍历目录时的规则相同：任一上级目录被排除的文件被跳过，
+    其余文件按文件规则和扩展名过滤。文件保持列出时的顺序。
+
+    Args:
+        files (list): [(rel_path, full_path), ...]，rel_path 使用 / 分隔
+        matcher (PathMatcher): 路径匹配器
+
+    Returns:
+        list: 文件路径列表，格式为 [(full_path, rel_path, ext), ...]
+    """
+    excluded_dirs = {'': False}
+
+    def is_dir_excluded(dir_path):
+        if dir_path not in excluded_dirs:
+            parent = dir_path.rpartition('/')[0]
+            excluded_dirs[dir_path] = is_dir_excluded(parent) or matcher.is_excluded(dir_path, is_dir=True)
+        return excluded_dirs[dir_path]
+
+    result = []
+    for rel_path, full_path in files:
+        if is_dir_excluded(rel_path.rpartition('/')[0]):
+            continue
+        verdict = matcher.match(rel_path)
+        if verdict:
+            continue
+        ext = os.path.splitext(rel_path)[1].lower()
+        if verdict is False or ext in include_extensions or (ext == ''):
+            result.append((full_path, rel_path, ext))
+    return result
+
+
+def scan_git_changes(root_dir, base=None, head=None, exclude_dirs_param=None, log_callback=None,
+                     include_globs=None, exclude_globs=None, profile='auto'):
+    """
+    收集 git 中变更的文件，不遍历目录树
+
+    变更文件由 git 列出（未跟踪文件已按 .gitignore 过滤），再按与 scan_directory 相同的
+    排除目录、包含/排除通配符、OpenFOAM 配置和扩展名规则过滤。
+    head 为空时读取工作区中的文件；指定 head 时需配合 gitdiff.GitTreeSource 读取提交中的内容。
+
+    Args:
+        root_dir (str): 项目目录（git 仓库或其子目录）
+        base (str): 起始引用（可选），默认为 HEAD
+        head (str): 结束引用（可选），为空表示工作区
+        exclude_dirs_param (set): 要排除的目录集合（可选）
+        log_callback (callable): 日志回调函数
+        include_globs (list): 强制包含的通配符列表（可选）
+        exclude_globs (list): 额外排除的通配符列表（可选）
+        profile (str): 扫描配置，'auto'、'source' 或 'openfoam'
+
+    Returns:
+        list: 文件路径列表，格式为 [(full_path, rel_path, ext), ...]；git 执行失败时返回空列表
+    """
+    scope = f"{base or 'HEAD'}..{head}" if head else f"{base or 'HEAD'} 与工作区"
+    if log_callback:
+        log_callback(f"🔍 正在获取变更文件: {scope}")
+    try:
+        changed = list_changed_files(root_dir, base, head)
+    except RuntimeError as e:
+        if log_callback:
+            log_callback(f"❌ 错误：git 执行失败: {e}")
+        return []
+
+    openfoam_case = profile == 'openfoam' or (profile == 'auto' and is_openfoam_case(root_dir))
+    matcher = build_path_matcher(exclude_dirs_param, include_globs, exclude_globs, openfoam_case)
+    # 不合并输出文件本身及其分卷、缓存清单和缓存目录
+    output_prefix = f"{get_project_name(root_dir)}_source_code."
+    listed = [(rel_path, os.path.join(root_dir, *rel_path.split('/'))) for rel_path in changed
+              if not is_output_path(rel_path, output_prefix)]
+    files = filter_listed_files(listed, matcher)
+    if log_callback:
+        log_callback(f"✅ {len(changed)} 个变更文件中 {len(files)} 个符合合并条件")
+    return files
+
+
+def make_anchor(rel_path):
+    """
+    根据相对路径生成 Markdown 锚点 ID
+
+    Args:
+        rel_path (str): 文件相对路径
+
+    Returns:
+        str: 锚点 ID（不含 file- 前缀）
+    """
+    return rel_path.replace(' ', '-').replace('.', '').replace('/', '').replace('\\', '').lower()
+
+
+def hash_file(file_path, source=None):
+    """
+    分块计算文件内容的 SHA-1 哈希值
+
+    Args:
+        file_path (str): 文件路径
+        source (ArchiveSource): 归档读取器（可选）
+
+    Returns:
+        str: 十六进制哈希字符串
+    """
+    digest = hashlib.sha1()
+    with open_source(file_path, source) as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_duplicates(files, old_entries=None, max_bytes=0, workers=None, source=None):
+    """
+    按内容哈希查找重复文件
+
+    只有大小相同的文件才可能内容相同，因此先按大小分组，只对组内有多个文件的候选计算哈希；
+    清单中大小和修改时间未变的文件直接使用记录的哈希。其余哈希在线程池中分块并行计算，
+    大文件的哈希计算会释放 GIL。候选文件按列出的顺序读取，归档中的成员因此只向前定位。
+
+    Args:
+        files (list): 文件路径列表，格式为 [(full_path, rel_path, ext), ...]
+        old_entries (dict): 上次生成的清单记录，按相对路径索引（可选）
+        max_bytes (int): 参与去重的最大文件大小，0 表示不限制；超出的文件会被截断嵌入，不值得完整读取
+        workers (int): 并行线程数，默认使用 hash_workers；从归档读取时固定为单线程
+        source (ArchiveSource): 归档读取器（可选）
+
+    Returns:
+        tuple: (duplicates, hashes)。duplicates 为 {重复文件序号: 首次出现的文件序号}，
+            hashes 为 {文件序号: 内容哈希}
+    """
+    by_size = {}
+    stats = {}
+    for index, (full_path, rel_path, ext) in enumerate(files):
+        try:
+            st = stat_source(full_path, source)
+        except OSError:
+            continue
+        if st.st_size == 0 or (max_bytes and st.st_size > max_bytes):
+            continue
+        stats[index] = st
+        by_size.setdefault(st.st_size, []).append(index)
+
+    hashes = {}
+    pending = []
+    for indexes in by_size.values():
+        if len(indexes) < 2:
+            continue
+        for index in indexes:
+            entry = old_entries.get(files[index][1]) if old_entries else None
+            st = stats[index]
+            if (entry and entry.get('budget') is None and entry['size'] == st.st_size
+                    and entry['mtime'] == st.st_mtime_ns):
+                hashes[index] = entry['hash']
+            else:
+                pending.append(index)
+
+    if pending:
+        pending.sort()
+        with ThreadPoolExecutor(max_workers=1 if source is not None else workers or hash_workers) as pool:
+            for index, digest in zip(pending, pool.map(lambda i: hash_file(files[i][0], source), pending)):
+                hashes[index] = digest
+
+    duplicates = {}
+    canonical = {}
+    for index in sorted(hashes):
+        key = (stats[index].st_size, hashes[index])
+        if key in canonical:
+            duplicates[index] = canonical[key]
+        else:
+            canonical[key] = index
+    return duplicates, hashes
+
+
+def get_manifest_path(output_path):
+    """
+    获取输出文件对应的缓存清单路径
+
+    Args:
+        output_path (str): Markdown 输出文件路径
+
+    Returns:
+        str: 清单文件路径
+    """
+    return output_path + manifest_suffix
+
+
+def get_part_path(output_path, number):
+    """
+    获取分卷文件路径
+
+    Args:
+        output_path (str): Markdown 输出文件（分卷模式下为索引文件）路径
+        number (int): 分卷序号，从 1 开始
+
+    Returns:
+        str: 分卷文件路径，如 project_source_code.part001.md
+    """
+    stem, ext = os.path.splitext(output_path)
+    return stem + part_name_format.format(number) + ext
+
+
+def get_part_pattern(output_path):
+    """
+    获取匹配分卷文件名的正则表达式
+
+    Args:
+        output_path (str): Markdown 输出文件路径
+
+    Returns:
+        re.Pattern: 匹配分卷文件名（不含目录）的正则表达式
+    """
+    stem, ext = os.path.splitext(os.path.basename(output_path))
+    return re.compile(re.escape(stem) + r'\.part\d{3,}' + re.escape(ext) + '$')
+
+
+def list_part_paths(output_path):
+    """
+    列出 Markdown 输出文件的各个分卷
+
+    每次生成都会删除未再使用的分卷，存在分卷文件即说明输出文件是分卷索引。
+
+    Args:
+        output_path (str): Markdown 输出文件路径
+
+    Returns:
+        list: 按序号排列的分卷文件路径；未拆分时为空列表
+    """
+    folder = os.path.dirname(output_path) or '.'
+    pattern = get_part_pattern(output_path)
+    try:
+        names = [name for name in os.listdir(folder) if pattern.match(name)]
+    except OSError:
+        return []
+    # 序号超过三位时文件名变长，按序号而不是文件名排序
+    names.sort(key=lambda name: int(re.search(r'\.part(\d+)\.[^.]*$', name).group(1)))
+    return [os.path.join(os.path.dirname(output_path), name) for name in names]
+
+
+def remove_stale_parts(output_path, keep):
+    """
+    删除上一次生成遗留、本次未再使用的分卷文件
+
+    Args:
+        output_path (str): Markdown 输出文件路径
+        keep (set): 本次生成的分卷文件名集合
+    """
+    folder = os.path.dirname(output_path) or '.'
+    pattern = get_part_pattern(output_path)
+    for name in os.listdir(folder):
+        if pattern.match(name) and name not in keep:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+
+def load_manifest(output_path, root_dir, options=None):
+    """
+    读取并校验上一次生成时保存的文件清单
+
+    只有当清单版本、项目根目录、渲染选项以及每个输出文件（单文件或各分卷）的大小和修改时间
+    都与记录一致时，清单才被视为有效，避免复用被手动修改过的输出文件。
+
+    Args:
+        output_path (str): Markdown 输出文件路径
+        root_dir (str): 项目根目录
+        options (dict): 影响章节渲染结果的选项（可选）
+
+    Returns:
+        dict: 有效的清单内容；清单不存在或已失效时返回 None
+    """
+    manifest_path = get_manifest_path(output_path)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if (manifest.get('version') != manifest_version
+                or manifest.get('root') != os.path.normpath(root_dir)
+                or manifest.get('options') != options):
+            return None
+        folder = os.path.dirname(output_path)
+        for part in manifest['parts'] + list(manifest['extras'].values()):
+            st = os.stat(os.path.join(folder, part['name']))
+            if part['size'] != st.st_size or part['mtime'] != st.st_mtime_ns:
+                return None
+        return manifest
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_manifest(output_path, root_dir, parts, entries, options=None, extras=None):
+    """
+    保存本次生成的文件清单
+
+    Args:
+        output_path (str): Markdown 输出文件路径
+        root_dir (str): 项目根目录
+        parts (list): 保存章节内容的输出文件，格式为 [(文件路径, 正文起始字节偏移), ...]
+        entries (list): 每个文件的清单记录，'part' 为所在输出文件的序号，'offset' 相对于该文件的正文起点
+        options (dict): 影响章节渲染结果的选项（可选）
+        extras (dict): 附加输出格式的文件，格式为 {格式: (文件路径, 正文起始字节偏移)}（可选）
+    """
+    def describe(path, body_start):
+        st = os.stat(path)
+        return {
+            'name': os.path.basename(path),
+            'size': st.st_size,
+            'mtime': st.st_mtime_ns,
+            'body_start': body_start,
+        }
+
+    part_records = [describe(path, body_start) for path, body_start in parts]
+    extra_records = {fmt: describe(path, body_start) for fmt, (path, body_start) in (extras or {}).items()}
+    manifest = {
+        'version': manifest_version,
+        'root': os.path.normpath(root_dir),
+        'options': options,
+        'parts': part_records,
+        'extras': extra_records,
+        'files': entries,
+    }
+    with open(get_manifest_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+
+def plan_parts(spans, part_bytes):
+    """
+    按目标大小在文件边界处划分分卷
+
+    Args:
+        spans (list): 各文件章节在暂存文件中的字节范围 [(start, end), ...]
+        part_bytes (int): 分卷目标大小，0 表示不拆分
+
+    Returns:
+        list: 每个分卷包含的章节范围 [(first, last), ...]，last 不包含在内
+    """
+    if not part_bytes:
+        return [(0, len(spans))]
+    parts = []
+    first = 0
+    for i, (start, end) in enumerate(spans):
+        # 单个章节超过目标大小时独占一个分卷
+        if i > first and end - spans[first][0] > part_bytes:
+            parts.append((first, i))
+            first = i
+    parts.append((first, len(spans)))
+    return parts
+
+
+def write_part(spool_path, temp_path, header, start, end):
+    """
+    将标题目录和暂存文件中的一段章节写入分卷临时文件
+
+    每次调用使用独立的文件句柄，多个分卷可以在线程池中并行写入。
+
+    Args:
+        spool_path (str): 暂存文件路径
+        temp_path (str): 分卷临时文件路径
+        header (bytes): 标题和目录
+        start (int): 章节在暂存文件中的起始字节偏移
+        end (int): 章节在暂存文件中的结束字节偏移
+
+    Returns:
+        int: 正文在分卷文件中的起始字节偏移
+    """
+    with open(spool_path, 'rb') as body, open(temp_path, 'wb') as part_file:
+        part_file.write(header)
+        copy_bytes(body, part_file, start, end - start)
+    return len(header)
+
+
+def is_entry_unchanged(entry, st, full_path, source=None):
+    """
+    判断文件相对于清单记录是否未发生变化
+
+    先比较大小和修改时间，修改时间变化但大小相同时再比较内容哈希，
+    这样“触碰”过但内容未变的文件也能被复用。被截断的文件只记录了片段哈希，
+    修改时间变化时直接视为已修改，避免为比较哈希而读取整个大文件。
+
+    Args:
+        entry (dict): 清单中的文件记录
+        st (os.stat_result): 文件当前的状态
+        full_path (str): 文件完整路径
+        source (ArchiveSource): 归档读取器（可选）
+
+    Returns:
+        bool: 文件内容是否未变化
+    """
+    if entry['size'] != st.st_size:
+        return False
+    if entry['mtime'] == st.st_mtime_ns:
+        return True
+    if entry.get('budget') is not None:
+        return False
+    try:
+        if hash_file(full_path, source) != entry['hash']:
+            return False
+    except OSError:
+        return False
+    entry['mtime'] = st.st_mtime_ns
+    return True
+
+
+def copy_bytes(src, dst, offset, length):
+    """
+    从源文件的指定偏移处按块复制固定长度的字节到目标文件
+
+    Args:
+        src: 以二进制模式打开的源文件对象
+        dst: 以二进制模式打开的目标文件对象
+        offset (int): 起始偏移
+        length (int): 复制的字节数
+    """
+    src.seek(offset)
+    remaining = length
+    while remaining > 0:
+        block = src.read(min(chunk_size, remaining))
+        if not block:
+            raise IOError("缓存文档已损坏，长度与清单记录不符")
+        dst.write(block)
+        remaining -= len(block)
+
+
+def format_size(num_bytes):
+    """
+    将字节数格式化为便于阅读的字符串
+
+    Args:
+        num_bytes (int): 字节数
+
+    Returns:
+        str: 如 "12.3 MB"
+    """
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ListCollapser:
+    """OpenFOAM 列表折叠器
+
+    以流式方式处理解码后的文本，将 nonuniform List<类型> N ( ... ) 的列表内容
+    替换为一行元素个数说明。列表体可能跨越多个数据块，折叠器在块之间保存括号深度；
+    向量、张量等带括号的元素由正则一次跳过一整串，不逐个字符处理。
+    """
+
+    header_re = re.compile(r'nonuniform\s+List<(\w+)>\s*(\d+)\s*\(')
+    # 预读线程在原始字节上使用的列表头和列表元素行（标量、向量、张量、面），
+    # 用于让超出预算的文件片段避开列表内容
+    header_bytes_re = re.compile(rb'nonuniform\s+List<\w+>\s*\d+\s*\(')
+    element_line_re = re.compile(rb'[ \t]*(?:\d*\([^()\n]*\)|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)?[ \t]*\r?\n')
+    # 在括号深度为 1 时跳过一串不含嵌套的元素，如 "(1 2 3) (4 5 6) ..." 或纯数值
+    flat_re = re.compile(r'(?:[^()]*\([^()]*\))*[^()]*')
+    paren_re = re.compile(r'[()]')
+    # 块末尾保留的字符数，防止列表头被数据块边界截断
+    lookbehind = 128
+
+    def __init__(self):
+        """初始化折叠器状态"""
+        self.pending = ''    # 尚未输出、可能包含不完整列表头的文本
+        self.depth = 0       # 当前所在列表的括号深度，0 表示不在列表中
+        self.collapsed = 0   # 已折叠的列表数量
+
+    def feed(self, text):
+        """
+        处理一段文本
+
+        Args:
+            text (str): 解码后的文本块
+
+        Returns:
+            str: 可以立即输出的文本
+        """
+        buf = self.pending + text
+        self.pending = ''
+        out = []
+        pos = 0
+        n = len(buf)
+        while pos < n:
+            if self.depth == 1:
+                pos = self.flat_re.match(buf, pos).end()
+                if pos >= n:
+                    break
+                self.depth += 1 if buf[pos] == '(' else -1
+                pos += 1
+                continue
+            if self.depth > 1:
+                m = self.paren_re.search(buf, pos)
+                if not m:
+                    break
+                self.depth += 1 if m.group() == '(' else -1
+                pos = m.end()
+                continue
+            m = self.header_re.search(buf, pos)
+            if m:
+                out.append(buf[pos:m.start()])
+                out.append(f"nonuniform List<{m.group(1)}> {m.group(2)}\n(\n    // ... 已折叠 {m.group(2)} 个元素 ...\n)")
+                self.depth = 1
+                self.collapsed += 1
+                pos = m.end()
+            else:
+                keep = max(pos, n - self.lookbehind)
+                out.append(buf[pos:keep])
+                self.pending = buf[keep:]
+                break
+        return ''.join(out)
+
+    def finish(self):
+        """
+        结束当前文本流
+
+        Returns:
+            str: 剩余的待输出文本；若停在列表内部，列表剩余内容被丢弃
+        """
+        text = '' if self.depth else self.pending
+        self.pending = ''
+        self.depth = 0
+        return text
+
+
+class SectionOutput:
+    """附加输出格式的基类
+
+    与 Markdown 一样先把各文件章节写入暂存文件，全部文件处理完后再写入标题、目录并拼接暂存内容。
+    章节分为两部分：每次重新生成的标题（序号可能变化）和从 offset 开始、可以按字节复用的正文。
+    """
+
+    format = ''   # 格式名称，用于配置和清单
+    suffix = ''   # 输出文件扩展名
+
+    def __init__(self, output_path):
+        """
+        创建暂存文件
+
+        Args:
+            output_path (str): Markdown 输出文件路径，本格式的输出文件与其同名、扩展名不同
+        """
+        self.path = os.path.splitext(output_path)[0] + self.suffix
+        self.spool_path = self.path + '.body.tmp'
+        self.spool = open(self.spool_path, 'w+b')
+        self.section_start = 0  # 当前章节在暂存文件中的起点
+        self.offset = 0         # 当前章节可复用正文的起点
+
+    def write(self, text):
+        """写入一段已格式化的文本"""
+        self.spool.write(text.encode('utf-8'))
+
+    def begin(self, number, rel_path, full_path):
+        """开始一个文件章节并写入标题"""
+        self.section_start = self.spool.tell()
+        self.write(self.heading(number, rel_path, full_path))
+        self.offset = self.spool.tell()
+
+    def discard(self):
+        """丢弃当前写入一半的章节"""
+        self.spool.seek(self.section_start)
+        self.spool.truncate()
+
+    def span(self):
+        """
+        Returns:
+            list: 当前章节正文的 [偏移, 长度]，用于写入清单
+        """
+        return [self.offset, self.spool.tell() - self.offset]
+
+    def finish(self, title, timestamp, entries):
+        """
+        写入标题、目录和所有章节到临时文件
+
+        Args:
+            title (str): 文档标题
+            timestamp (str): 生成时间
+            entries (list): 清单记录
+
+        Returns:
+            int: 正文在输出文件中的起始字节偏移
+        """
+        self.spool.flush()
+        header = self.header(title, timestamp, entries).encode('utf-8')
+        with open(self.path + '.tmp', 'wb') as out:
+            out.write(header)
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, out, chunk_size)
+            out.write(self.footer().encode('utf-8'))
+        return len(header)
+
+    def commit(self):
+        """用临时文件替换输出文件"""
+        os.replace(self.path + '.tmp', self.path)
+
+    def close(self):
+        """关闭并删除暂存文件以及未提交的临时文件"""
+        self.spool.close()
+        for path in (self.spool_path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def header(self, title, timestamp, entries):
+        return ''
+
+    def footer(self):
+        return ''
+
+
+class HtmlOutput(SectionOutput):
+    """HTML 输出
+
+    代码在写入时直接转义，目录由清单生成，无需再经过 Markdown 解析。
+    """
+
+    format = 'html'
+    suffix = '.html'
+
+    def heading(self, number, rel_path, full_path):
+        return (f'<section id="file-{make_anchor(rel_path)}">\n<h2>{number}. {html.escape(rel_path)}</h2>\n'
+                f'<p><strong>完整路径</strong>: <code>{html.escape(full_path)}</code></p>\n')
+
+    def start(self, lang_tag, st):
+        self.write(f'<pre><code class="language-{lang_tag}">')
+
+    def text(self, text):
+        self.write(html.escape(text, quote=False))
+
+    def end(self, digest, note=None, diff=None):
+        self.write('</code></pre>\n')
+        if note:
+            self.write(f'<blockquote>{html.escape(note)}</blockquote>\n')
+        self.footer_section(diff)
+
+    def duplicate(self, canonical_path, lang_tag, st, digest, note, diff=None):
+        self.write(f'<blockquote>🔁 内容与 <a href="#file-{make_anchor(canonical_path)}">{html.escape(canonical_path)}</a> '
+                   f'{html.escape(note)}</blockquote>\n')
+        self.footer_section(diff)
+
+    def footer_section(self, diff):
+        if diff:
+            self.write(f'<p><strong>变更</strong>:</p>\n<pre><code class="language-diff">{html.escape(diff, quote=False)}</code></pre>\n')
+        self.write('<p><a href="#toc">回到目录</a></p>\n</section>\n<hr>\n')
+
+    def header(self, title, timestamp, entries):
+        lines = ['<!DOCTYPE html>\n<html>\n<head>\n<meta charset="UTF-8">\n',
+                 f'<title>{html.escape(title)}</title>\n<style>{html_style}</style>\n</head>\n<body>\n',
+                 f'<h1>{html.escape(title)}</h1>\n<p><strong>生成时间</strong>: {timestamp}</p>\n',
+                 '<h2 id="toc">目录</h2>\n<ul>\n']
+        for entry in entries:
+            lines.append(f'<li><a href="#file-{make_anchor(entry["path"])}">{html.escape(entry["path"])}</a></li>\n')
+        lines.append('</ul>\n<hr>\n')
+        return ''.join(lines)
+
+    def footer(self):
+        return '</body>\n</html>\n'
+
+
+class JsonlOutput(SectionOutput):
+    """JSONL 输出
+
+    每个文件一行 JSON 记录，字段为 path、language、size、content、hash 和 truncated，
+    附带差异时还有 diff；重复文件没有 content，以 duplicate_of 指向首次出现的文件。内容按块转义后流式写入。
+    """
+
+    format = 'jsonl'
+    suffix = '.jsonl'
+
+    def heading(self, number, rel_path, full_path):
+        return '{"path": ' + json.dumps(rel_path, ensure_ascii=False) + ', '
+
+    def start(self, lang_tag, st):
+        self.write(f'"language": {json.dumps(lang_tag)}, "size": {st.st_size}, "content": "')
+
+    def text(self, text):
+        self.write(json.dumps(text, ensure_ascii=False)[1:-1])
+
+    def end(self, digest, note=None, diff=None):
+        self.write(f'", "hash": "{digest}", "truncated": {"true" if note else "false"}')
+        self.close_record(diff)
+
+    def duplicate(self, canonical_path, lang_tag, st, digest, note, diff=None):
+        self.write(f'"language": {json.dumps(lang_tag)}, "size": {st.st_size}, '
+                   f'"duplicate_of": {json.dumps(canonical_path, ensure_ascii=False)}, "hash": "{digest}"')
+        self.close_record(diff)
+
+    def close_record(self, diff):
+        if diff:
+            self.write(', "diff": ' + json.dumps(diff, ensure_ascii=False))
+        self.write('}\n')
+
+
+# 可用的附加输出格式
+section_output_classes = {cls.format: cls for cls in (HtmlOutput, JsonlOutput)}
+
+
+def prefetch_files(files, old_entries=None, file_budget=0, total_budget=0, duplicates=None, source=None,
+                   collapse_lists=False):
+    """
+    在后台线程中预读文件，按顺序产出读取事件
+
+    每个文件只打开一次：读取首块后完成文本检测，随后按 chunk_size 分块读取，
+    同时累计内容哈希。事件通过有界队列传递，主线程写入当前文件时预读线程已在读取后续文件，
+    峰值内存与文件大小无关。
+
+    超出大小预算的文件只读取开头和结尾两段，中间部分通过 seek 直接跳过，不会被读取。
+    折叠列表时，OpenFOAM 文件的开头片段在第一个 nonuniform List 的 "(" 处结束，
+    结尾片段跳过开头处残留的列表元素行和列表的 ")"，列表内容既不占用预算，也不会绕过折叠器出现在输出中。
+
+    产出的事件为 (kind, index, st, data) 元组：
+    - ('reuse', i, st, entry): 文件与清单记录一致，可直接复用旧章节
+    - ('dup', i, st, j): 文件与第 j 个文件内容相同，不再读取
+    - ('file', i, st, (head, budget)): 文本文件开始，head 为首个数据块，budget 为本文件的预算（None 表示完整嵌入）
+    - ('chunk', i, None, block): 后续数据块
+    - ('elide', i, None, omitted): 开头片段结束，omitted 为跳过的字节数，其后的数据块属于结尾片段
+    - ('end', i, None, digest): 文件结束，digest 为内容哈希（截断文件为片段哈希）
+    - ('skip', i, None, reason): 二进制或无法读取的文件（可能出现在 'file' 之后）
+
+    Args:
+        files (list): 文件路径列表，格式为 [(full_path, rel_path, ext), ...]
+        old_entries (dict): 上次生成的清单记录，按相对路径索引（可选）
+        file_budget (int): 单个文件的字节预算，0 表示不限制
+        total_budget (int): 所有文件的总字节预算，0 表示不限制
+        duplicates (dict): 重复文件映射 {文件序号: 首次出现的文件序号}（可选）
+        source (ArchiveSource): 归档读取器（可选），只有被读取的成员才会解压
+        collapse_lists (bool): 是否按列表折叠调整超出预算文件的片段边界
+
+    Yields:
+        tuple: 读取事件
+    """
+    events = queue.Queue(maxsize=prefetch_depth)
+    stop = threading.Event()
+
+    def put(item):
+        # 队列满时等待，但在消费者提前结束时及时退出
+        while not stop.is_set():
+            try:
+                events.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get_budget(size, used):
+        # 返回本文件允许嵌入的字节数，None 表示完整嵌入
+        budget = None
+        if file_budget and size > file_budget:
+            budget = file_budget
+        if total_budget:
+            remaining = max(total_budget - used, 0)
+            if size > remaining and (budget is None or budget > remaining):
+                budget = remaining
+        return budget
+
+    def stream(f, index, digest, limit, until=None):
+        # 从当前位置读取至多 limit 字节（None 表示读到文件末尾），逐块放入队列；
+        # 指定 until 时在其第一次匹配的结尾处停止，块尾保留一段文本以匹配跨块的内容
+        read = 0
+        carry = b''
+        while limit is None or read < limit:
+            block = f.read(chunk_size if limit is None else min(chunk_size, limit - read))
+            if not block:
+                break
+            if until is not None:
+                m = until.search(carry + block)
+                if m:
+                    block = block[:m.end() - len(carry)]
+                    limit = read + len(block)
+                carry = block[-ListCollapser.lookbehind:]
+            read += len(block)
+            digest.update(block)
+            if not put(('chunk', index, None, block)):
+                return None
+        return read
+
+    def reader():
+        try:
+            used = 0
+            for index, (full_path, rel_path, ext) in enumerate(files):
+                if stop.is_set():
+                    return
+                try:
+                    st = stat_source(full_path, source)
+                    if duplicates and index in duplicates:
+                        put(('dup', index, st, duplicates[index]))
+                        continue
+                    budget = get_budget(st.st_size, used)
+                    entry = old_entries.get(rel_path) if old_entries else None
+                    if (entry and entry.get('budget') == budget and not entry.get('duplicate_of')
+                            and is_entry_unchanged(entry, st, full_path, source)):
+                        used += entry.get('embedded', st.st_size)
+                        put(('reuse', index, st, entry))
+                        continue
+                    with open_source(full_path, source) as f:
+                        first = f.read(chunk_size)
+                        if not is_text_chunk(first[:1024]):
+                            put(('skip', index, None, "二进制文件"))
+                            continue
+                        if budget is None:
+                            digest = hashlib.sha1(first)
+                            if not put(('file', index, st, (first, None))):
+                                return
+                            if stream(f, index, digest, None) is None:
+                                return
+                            used += st.st_size
+                        else:
+                            # 开头片段；OpenFOAM 文件在第一个列表头处结束
+                            head_limit = budget // 2
+                            head = first[:head_limit]
+                            until = ListCollapser.header_bytes_re if collapse_lists and b'FoamFile' in first else None
+                            m = until.search(head) if until else None
+                            if m:
+                                head = head[:m.end()]
+                            digest = hashlib.sha1(str(st.st_size).encode('ascii'))
+                            digest.update(head)
+                            if not put(('file', index, st, (head, budget))):
+                                return
+                            head_end = len(head)
+                            if not m:
+                                f.seek(len(head))
+                                head_read = stream(f, index, digest, head_limit - len(head), until)
+                                if head_read is None:
+                                    return
+                                head_end += head_read
+
+                            # 结尾片段：跳过中间部分，从下一个完整行开始
+                            tail_start = max(st.st_size - (budget - head_limit), head_end)
+                            if tail_start > head_end:
+                                f.seek(tail_start - 1)
+                                if f.read(1) != b'\n':
+                                    f.readline(budget - head_limit)
+                                tail_start = f.tell()
+                            if until:
+                                # 跳过列表元素行；跳过了元素时，紧随其后的 ")" 是该列表的结尾
+                                f.seek(tail_start)
+                                in_list = False
+                                while True:
+                                    line = f.readline(chunk_size)
+                                    if line and ListCollapser.element_line_re.fullmatch(line):
+                                        in_list = in_list or bool(line.strip())
+                                    elif in_list and line.strip() == b')':
+                                        tail_start += len(line)
+                                        break
+                                    else:
+                                        break
+                                    tail_start += len(line)
+                                f.seek(tail_start)
+                            if not put(('elide', index, None, tail_start - head_end)):
+                                return
+                            tail_read = stream(f, index, digest, None)
+                            if tail_read is None:
+                                return
+                            used += head_end + tail_read
+                    put(('end', index, None, digest.hexdigest()))
+                except OSError as e:
+                    put(('skip', index, None, str(e)))
+            put(('done', None, None, None))
+        except Exception as e:
+            put(('error', None, None, e))
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = events.get()
+            if item[0] == 'done':
+                return
+            if item[0] == 'error':
+                raise item[3]
+            yield item
+    finally:
+        stop.set()
+
+
+def combine_files_to_markdown(files, output_path, root_dir, progress_callback=None, log_callback=None, use_cache=True,
+                              file_budget=None, total_budget=None, collapse_lists=None,
+                              cancel_callback=None, toc_callback=None, part_bytes=None, dedup=None, source=None,
+                              formats=None, diffs=None):
     """
     将多个文件合并为一个 Markdown 文档
 
-    将扫描到的源代码文件合并为一个带目录的 Markdown 文档，便于阅读和分享
+    将扫描到的源代码文件合并为一个带目录的 Markdown 文档，便于阅读和分享。
+    每个文件只打开一次，由预读线程完成文本检测、语言识别所需的首块读取和分块读取，
+    内容按块解码后流式写入，不会整体载入内存。
+    超出单文件或总大小预算的文件只嵌入开头和结尾片段，并附上省略标记和大小说明；
+    OpenFOAM 的 nonuniform List 列表内容折叠为元素个数。
+    启用去重时，内容相同的文件只嵌入首次出现的一份，其余文件的章节只包含指向它的链接。
+    启用缓存时会在输出文件旁保存清单（路径、大小、修改时间、内容哈希、语言和章节偏移），
+    再次生成时未变化文件的代码块直接从旧文档中按字节复制，只重新渲染新增或修改的文件。
+    设置分卷大小时，章节在文件边界处拆分为多个编号分卷（并行写入），output_path 则成为
+    只包含分卷列表和跨分卷目录的索引文件。
+    附加格式（HTML、JSONL）与 Markdown 在同一次读取中生成：代码按块转义后写入各自的暂存文件，
+    不需要再次解析 Markdown。
 
     Args:
         files (list): 文件路径列表，格式为 [(full_path, rel_path, ext), ...]
         output_path (str): 输出文件路径
         root_dir (str): 项目根目录
         progress_callback (callable): 进度回调函数
+        log_callback (callable): 日志回调函数
+        use_cache (bool): 是否启用增量缓存
+        file_budget (int): 单个文件的字节预算，默认使用 max_file_bytes，0 表示不限制
+        total_budget (int): 总字节预算，默认使用 max_total_bytes，0 表示不限制
+        collapse_lists (bool): 是否折叠 nonuniform List，默认使用 collapse_foam_lists
+        cancel_callback (callable): 取消检查函数，返回 True 时停止合并并保留原有输出文件（可选）
+        toc_callback (callable): 目录回调函数，每完成一个文件章节调用一次，参数为 (序号, 相对路径)（可选）
+        part_bytes (int): 分卷目标大小，默认使用 max_part_bytes，0 表示输出单个文件
+        dedup (bool): 是否按内容哈希去重，默认使用 dedup_files
+        source (ArchiveSource): 归档读取器（可选），root_dir 为归档且未提供时临时打开
+        formats (list): 除 Markdown 外同时输出的格式，可选 'html'、'jsonl'，默认使用 extra_formats；
+            输出文件与 output_path 同名，扩展名为 .html / .jsonl
+        diffs (dict): 各文件的统一差异 {相对路径: 差异文本}（可选），附加在对应章节的代码之后
 
     Returns:
-        bool: 是否成功
+        bool: 是否成功；取消时返回 False
     """
+    if file_budget is None:
+        file_budget = max_file_bytes
+    if total_budget is None:
+        total_budget = max_total_bytes
+    if collapse_lists is None:
+        collapse_lists = collapse_foam_lists
+    if part_bytes is None:
+        part_bytes = max_part_bytes
+    if dedup is None:
+        dedup = dedup_files
+    if formats is None:
+        formats = extra_formats
+    formats = sorted(fmt for fmt in set(formats) if fmt in section_output_classes)
+    own_source = source is None and is_archive(root_dir)
+    if own_source:
+        source = ArchiveSource(root_dir)
+    options = {'collapse_lists': bool(collapse_lists), 'formats': formats}
+
+    temp_path = output_path + '.tmp'
+    spool_path = output_path + '.body.tmp'
+    part_temps = []
+    outputs = []
     try:
         total_files = len(files)
         if total_files == 0:
             return False
 
-        with open(output_path, 'w', encoding='utf-8') as md_file:
-            # 写入标题和目录
-            folder_name = os.path.basename(os.path.normpath(root_dir))
-            md_file.write(f"# {folder_name} 源代码整合文档\n\n")
-            # 使用 time 模块获取更准确的时间
-            import time
-            md_file.write(f"**生成时间**: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}\n\n")
-            md_file.write("## 目录\n\n")
-
-            for _, rel_path, _ in files:
-                anchor = rel_path.replace(' ', '-').replace('.', '').replace('/', '').replace('\\', '').lower()
-                md_file.write(f"- [{rel_path}](#file-{anchor})\n")
-            md_file.write("\n---\n\n")
-
-            # 遍历写入文件内容
-            for i, (full_path, rel_path, ext) in enumerate(files):
-                # 更新进度条
-                if progress_callback:
-                    progress = int(((i + 1) / total_files) * 100)
-                    progress_callback(progress)
-                    # 处理事件循环，让UI有机会更新
-                    try:
-                        from PySide6.QtWidgets import QApplication
-                        QApplication.processEvents()
-                    except:
-                        pass
-
-                lang_tag = detect_language(full_path, ext)
-                anchor_id = rel_path.replace(' ', '-').replace('.', '').replace('/', '').replace('\\', '').lower()
-
-                md_file.write(f'<a name="file-{anchor_id}"></a>\n## {i + 1}. {rel_path}\n\n')
-                md_file.write(f"**完整路径**: `{full_path}`\n\n")
-                md_file.write(f"```{lang_tag}\n")
-
-                # 读取时使用 errors='ignore' 兜底，防止极个别特殊字符导致崩溃
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as infile:
-                    content = infile.read()
-                    md_file.write(content)
-
-                md_file.write("\n```\n\n[回到目录](#目录)\n\n---\n\n")
+        manifest = load_manifest(output_path, root_dir, options) if use_cache else None
+        old_entries = {}
+        if manifest:
+            # 章节中的差异变化后不能复用
+            old_entries = {entry['path']: entry for entry in manifest['files']
+                           if entry.get('diff') == get_diff_hash(diffs.get(entry['path']) if diffs else None)}
+
+        duplicates, hashes = find_duplicates(files, old_entries, file_budget, source=source) if dedup else ({}, {})
+        skipped = set()
+        entry_of = {}
+        # 重复文件章节中链接目标的占位：[(暂存文件中的字节偏移, 重复文件的章节序号, 首次出现文件的清单记录), ...]
+        dup_links = []
+        # 分卷时链接目标要带上分卷文件名，为其预留的字节数（分卷数不超过文件数）
+        link_width = len(os.path.basename(get_part_path(output_path, 10 ** max(len(str(total_files)), 3) - 1))
+                         .encode('utf-8'))
+        duplicate_count = 0
+        saved_bytes = 0
+
+        entries = []
+        spans = []
+        reused_count = 0
+        skipped_count = 0
+        truncated_count = 0
+        collapsed_count = 0
+        done_count = 0
+        old_parts = {}
+
+        def get_old_part(number):
+            # 按需打开上一次生成的输出文件，供复用章节时读取；附加格式以格式名称为键
+            if number not in old_parts:
+                record = manifest['extras'][number] if isinstance(number, str) else manifest['parts'][number]
+                old_parts[number] = open(os.path.join(os.path.dirname(output_path), record['name']), 'rb')
+            return old_parts[number]
+
+        outputs = [section_output_classes[fmt](output_path) for fmt in formats]
+
+        try:
+            # 先将各文件章节写入暂存文件，目录需要在剔除二进制文件后才能确定
+            with open(spool_path, 'w+b') as body:
+                section_start = offset = 0
+                lang_tag = None
+                decoder = collapser = None
+                budget = None
+                embedded = omitted = 0
+                current_st = None
+
+                def new_decoder():
+                    # 解码时使用 errors='ignore' 兜底，防止极个别特殊字符导致崩溃，并统一换行符
+                    return io.IncrementalNewlineDecoder(
+                        codecs.getincrementaldecoder('utf-8')(errors='ignore'), translate=True)
+
+                def write_text(data, final=False):
+                    text = decoder.decode(data, final=final)
+                    if collapser:
+                        text = collapser.feed(text)
+                        if final:
+                            text += collapser.finish()
+                    body.write(text.encode('utf-8'))
+                    for out in outputs:
+                        out.text(text)
+
+                def write_diff(rel_path):
+                    # 在章节末尾写入该文件的统一差异
+                    diff = diffs.get(rel_path) if diffs else None
+                    if diff:
+                        body.write(f"**变更**:\n\n````diff\n{diff}````\n\n".encode('utf-8'))
+                    return diff
+
+                cancelled = False
+                events = prefetch_files(files, old_entries, file_budget, total_budget, duplicates, source, collapse_lists)
+                for kind, index, st, data in events:
+                    if cancel_callback and cancel_callback():
+                        cancelled = True
+                        break
+                    full_path, rel_path, ext = files[index]
+                    if kind == 'dup' and data in skipped:
+                        # 首次出现的文件是二进制或无法读取，重复文件同样跳过
+                        kind, data = 'skip', None
+
+                    if kind in ('reuse', 'file', 'dup'):
+                        section_start = body.tell()
+                        body.write((f'<a name="file-{make_anchor(rel_path)}"></a>\n## {len(entries) + 1}. {rel_path}\n\n'
+                                    f"**完整路径**: `{full_path}`\n\n").encode('utf-8'))
+                        offset = body.tell()
+                        current_st = st
+                        for out in outputs:
+                            out.begin(len(entries) + 1, rel_path, full_path)
+
+                    if kind == 'reuse':
+                        # 未变化：直接从旧文档复制代码块字节
+                        old_part = manifest['parts'][data['part']]
+                        copy_bytes(get_old_part(data['part']), body, old_part['body_start'] + data['offset'], data['length'])
+                        for out in outputs:
+                            out_offset, out_length = data['outputs'][out.format]
+                            copy_bytes(get_old_part(out.format), out.spool,
+                                       manifest['extras'][out.format]['body_start'] + out_offset, out_length)
+                        lang_tag, digest = data['language'], data['hash']
+                        budget, embedded = data.get('budget'), data.get('embedded', st.st_size)
+                        reused_count += 1
+                    elif kind == 'dup':
+                        # 重复文件：只写入指向首次出现章节的链接
+                        canonical_path = files[data][1]
+                        body.write(f"> 🔁 内容与 [{canonical_path}](".encode('utf-8'))
+                        if part_bytes:
+                            # 首次出现的章节可能在另一个分卷中，分卷要在全部章节写完后才能确定：
+                            # 先写入空格占位，确定分卷后原地写入分卷文件名（前导空格不影响链接）
+                            dup_links.append((body.tell(), len(entries), entry_of[data]))
+                            body.write(b' ' * link_width)
+                        body.write((f"#file-{make_anchor(canonical_path)}) 相同"
+                                    f"（{format_size(st.st_size)}），不再重复嵌入\n\n").encode('utf-8'))
+                        diff = write_diff(rel_path)
+                        body.write("[回到目录](#目录)\n\n---\n\n".encode('utf-8'))
+                        lang_tag, digest = entry_of[data]['language'], hashes[index]
+                        budget, embedded = None, 0
+                        for out in outputs:
+                            out.duplicate(canonical_path, lang_tag, st, digest, f"相同（{format_size(st.st_size)}），不再重复嵌入",
+                                          diff)
+                        duplicate_count += 1
+                        saved_bytes += st.st_size
+                    elif kind == 'file':
+                        head, budget = data
+                        lang_tag = detect_language_from_head(head, ext)
+                        decoder = new_decoder()
+                        collapser = ListCollapser() if collapse_lists else None
+                        embedded = len(head)
+                        omitted = 0
+                        body.write(f"```{lang_tag}\n".encode('utf-8'))
+                        for out in outputs:
+                            out.start(lang_tag, st)
+                        write_text(head)
+                        continue
+                    elif kind == 'chunk':
+                        embedded += len(data)
+                        write_text(data)
+                        continue
+                    elif kind == 'elide':
+                        # 开头片段结束，写入省略标记后以新的解码器处理结尾片段
+                        write_text(b'', final=True)
+                        omitted = data
+                        if omitted:
+                            marker = f"\n\n... [已省略 {format_size(omitted)}] ...\n\n"
+                            body.write(marker.encode('utf-8'))
+                            for out in outputs:
+                                out.text(marker)
+                        if collapser:
+                            collapsed_count += collapser.collapsed
+                        decoder = new_decoder()
+                        collapser = ListCollapser() if collapse_lists else None
+                        continue
+                    elif kind == 'end':
+                        write_text(b'', final=True)
+                        if collapser:
+                            collapsed_count += collapser.collapsed
+                        body.write("\n```\n\n".encode('utf-8'))
+                        note = None
+                        if budget is not None:
+                            note = (f"⚠️ 文件大小 {format_size(current_st.st_size)}，超出大小预算，"
+                                    f"仅嵌入开头和结尾共 {format_size(embedded)}")
+                            body.write(f"> {note}\n\n".encode('utf-8'))
+                            truncated_count += 1
+                        diff = write_diff(rel_path)
+                        body.write("[回到目录](#目录)\n\n---\n\n".encode('utf-8'))
+                        digest = data
+                        for out in outputs:
+                            out.end(digest, note, diff)
+                    elif kind == 'skip':
+                        # 丢弃可能已写入一半的章节
+                        if decoder is not None:
+                            body.seek(section_start)
+                            body.truncate()
+                            for out in outputs:
+                                out.discard()
+                        skipped.add(index)
+                        skipped_count += 1
+
+                    if kind != 'skip':
+                        spans.append((section_start, body.tell()))
+                        entries.append({
+                            'path': rel_path,
+                            'size': current_st.st_size,
+                            'mtime': current_st.st_mtime_ns,
+                            'hash': digest,
+                            'language': lang_tag,
+                            'offset': offset,
+                            'length': body.tell() - offset,
+                            'budget': budget,
+                            'embedded': embedded,
+                            'diff': get_diff_hash(diffs.get(rel_path) if diffs else None),
+                        })
+                        entry_of[index] = entries[-1]
+                        if outputs:
+                            entries[-1]['outputs'] = {out.format: out.span() for out in outputs}
+                        if kind == 'dup':
+                            entries[-1]['duplicate_of'] = canonical_path
+                        if toc_callback:
+                            toc_callback(len(entries), rel_path)
+                    decoder = collapser = None
+
+                    # 更新进度条
+                    done_count += 1
+                    if progress_callback:
+                        progress = int((done_count / total_files) * 100)
+                        progress_callback(progress)
+
+                if cancelled:
+                    if log_callback:
+                        log_callback("⏹️ 合并已取消，原有输出文件保持不变")
+                    return False
+
+                if not entries:
+                    if log_callback:
+                        log_callback("❌ 错误：未发现有效文本文件。")
+                    return False
+
+                folder_name = get_project_name(root_dir)
+                # 使用 time 模块获取更准确的时间
+                import time
+                timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+                generated = f"**生成时间**: {timestamp}\n\n"
+                ranges = plan_parts(spans, part_bytes)
+                sharded = len(ranges) > 1
+                index_name = os.path.basename(output_path)
+
+                # 写入标题和目录，分卷模式下每个分卷只列出自己包含的文件
+                jobs = []
+                for number, (first, last) in enumerate(ranges, 1):
+                    part_path = get_part_path(output_path, number) if sharded else output_path
+                    header = [f"# {folder_name} 源代码整合文档（第 {number}/{len(ranges)} 部分）\n\n" if sharded
+                              else f"# {folder_name} 源代码整合文档\n\n", generated]
+                    if sharded:
+                        header.append(f"[返回索引]({index_name})\n\n")
+                    header.append("## 目录\n\n")
+                    for entry in entries[first:last]:
+                        header.append(f"- [{entry['path']}](#file-{make_anchor(entry['path'])})\n")
+                    header.append("\n---\n\n")
+                    jobs.append((part_path, ''.join(header).encode('utf-8'), spans[first][0], spans[last - 1][1]))
+                    part_temps.append(part_path + '.tmp')
+
+                # 指向其他分卷的重复文件链接写入目标分卷的文件名
+                if sharded:
+                    part_of = {id(entry): number for number, (first, last) in enumerate(ranges, 1)
+                               for entry in entries[first:last]}
+                    for position, index, canonical in dup_links:
+                        number = part_of[id(canonical)]
+                        if number != part_of[id(entries[index])]:
+                            name = os.path.basename(get_part_path(output_path, number)).encode('utf-8')
+                            body.seek(position + link_width - len(name))
+                            body.write(name)
+                    body.seek(0, os.SEEK_END)
+
+                # 拼接暂存的章节内容，多个分卷并行写入
+                body.flush()
+                with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 4)) as pool:
+                    futures = [pool.submit(write_part, spool_path, part_path + '.tmp', header, start, end)
+                               for part_path, header, start, end in jobs]
+                    parts = [(job[0], future.result()) for job, future in zip(jobs, futures)]
+
+                # 清单中的章节偏移改为相对于所在输出文件的正文起点
+                for number, (first, last) in enumerate(ranges):
+                    for entry in entries[first:last]:
+                        entry['part'] = number
+                        entry['offset'] -= jobs[number][2]
+
+                if sharded:
+                    index = [f"# {folder_name} 源代码整合文档\n\n", generated, "## 分卷\n\n"]
+                    for number, (first, last) in enumerate(ranges, 1):
+                        part_name = os.path.basename(jobs[number - 1][0])
+                        index.append(f"- [第 {number} 部分]({part_name})：第 {first + 1}-{last} 个文件，"
+                                     f"{format_size(jobs[number - 1][3] - jobs[number - 1][2])}\n")
+                    index.append("\n## 目录\n\n")
+                    for number, (first, last) in enumerate(ranges, 1):
+                        part_name = os.path.basename(jobs[number - 1][0])
+                        for i in range(first, last):
+                            path = entries[i]['path']
+                            index.append(f"- {i + 1}. [{path}]({part_name}#file-{make_anchor(path)})\n")
+                    with open(temp_path, 'w', encoding='utf-8', newline='') as index_file:
+                        index_file.write(''.join(index))
+
+                # 附加格式各自只有一个文件，正文偏移本身就相对于暂存文件起点
+                extras = {out.format: (out.path, out.finish(f"{folder_name} 源代码整合文档", timestamp, entries))
+                          for out in outputs}
+        finally:
+            for old_part in old_parts.values():
+                old_part.close()
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+        for part_path, _ in parts:
+            os.replace(part_path + '.tmp', part_path)
+        if sharded:
+            os.replace(temp_path, output_path)
+        remove_stale_parts(output_path, {os.path.basename(path) for path, _ in parts} if sharded else set())
+        for out in outputs:
+            out.commit()
+        if use_cache:
+            save_manifest(output_path, root_dir, parts, entries, options, extras)
 
+        if log_callback:
+            if skipped_count:
+                log_callback(f"⚠️ 跳过 {skipped_count} 个二进制或无法读取的文件")
+            if truncated_count:
+                log_callback(f"✂️ {truncated_count} 个文件超出大小预算，仅嵌入开头和结尾片段")
+            if collapsed_count:
+                log_callback(f"📦 折叠了 {collapsed_count} 个 nonuniform List 列表")
+            if duplicate_count:
+                log_callback(f"🔁 {duplicate_count} 个文件与已嵌入文件内容相同，节省 {format_size(saved_bytes)}")
+            log_callback(f"♻️ 复用 {reused_count} 个未变化文件，重新渲染 {len(entries) - reused_count} 个文件")
+            if sharded:
+                log_callback(f"📚 已拆分为 {len(parts)} 个分卷，索引文件: {index_name}")
+            for out in outputs:
+                log_callback(f"📝 {out.format.upper()} 文件已生成: {os.path.basename(out.path)}")
         return True
     except Exception as e:
+        for path in [temp_path] + part_temps:
+            if os.path.exists(path):
+                os.remove(path)
         print(f"合并文件失败: {e}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        for out in outputs:
+            out.close()
+        if own_source:
+            source.close()
+
+
+def get_source_code_path(dir_path, ext):
+    """
+    获取源码合并输出文件的路径
+
+    Args:
+        dir_path (str): 项目目录或归档路径
+        ext (str): 扩展名，如 '.md'
+
+    Returns:
+        str: 输出文件路径；归档的输出文件位于归档所在目录
+    """
+    output_dir = os.path.dirname(dir_path) if is_archive(dir_path) else dir_path
+    return os.path.join(output_dir, f"{get_project_name(dir_path)}_source_code{ext}")
+
+
+def bind_project(dir_path, md_path, config, log_callback=None, progress_callback=None,
+                 cancel_callback=None, toc_callback=None):
+    """
+    按 [Binder] 配置扫描项目并合并为 Markdown
+
+    合并范围为 git 时只收集变更文件（指定结束引用时从提交中读取内容），否则扫描整个目录或归档。
+
+    Args:
+        dir_path (str): 项目根目录或 zip / tar 归档
+        md_path (str): Markdown 输出文件路径
+        config (ConfigManager): 配置管理器，用于读取 [Binder] 配置
+        log_callback (callable): 日志回调函数
+        progress_callback (callable): 进度回调函数，接收0-100的进度值
+        cancel_callback (callable): 取消检查函数，返回 True 时停止，原有输出文件保持不变
+        toc_callback (callable): 目录回调函数，参数为 (序号, 相对路径)
+
+    Returns:
+        bool: 是否成功；取消时返回 False
+    """
+    source = None
+    try:
+        diffs = None
+        if config.get_binder_scope() == 'git':
+            base, head = config.get_binder_git_range()
+            source = GitTreeSource(dir_path, head) if head else None
+            files = scan_git_changes(dir_path, base, head,
+                                     log_callback=log_callback,
+                                     include_globs=config.get_binder_include_globs(),
+                                     exclude_globs=config.get_binder_exclude_globs(),
+                                     profile=config.get_binder_profile())
+            if config.get_binder_git_diff():
+                diffs = collect_diffs(dir_path, base, head)
+        else:
+            # 归档在扫描和合并之间共用一个读取器，压缩的 tar 只需顺序解压一遍头信息
+            source = ArchiveSource(dir_path) if is_archive(dir_path) else None
+            files = scan_directory(dir_path,
+                                   log_callback=log_callback,
+                                   include_globs=config.get_binder_include_globs(),
+                                   exclude_globs=config.get_binder_exclude_globs(),
+                                   profile=config.get_binder_profile(),
+                                   cancel_callback=cancel_callback,
+                                   source=source)
+        if cancel_callback and cancel_callback():
+            return False
+
+        if log_callback:
+            log_callback(f"找到 {len(files)} 个源代码文件")
+            log_callback("正在合并为 Markdown...")
+        return combine_files_to_markdown(files, md_path, dir_path,
+                                         progress_callback=progress_callback,
+                                         log_callback=log_callback,
+                                         file_budget=config.get_binder_max_file_bytes(),
+                                         total_budget=config.get_binder_max_total_bytes(),
+                                         collapse_lists=config.get_binder_collapse_lists(),
+                                         cancel_callback=cancel_callback,
+                                         toc_callback=toc_callback,
+                                         part_bytes=config.get_binder_part_bytes(),
+                                         dedup=config.get_binder_dedup(),
+                                         formats=config.get_binder_extra_formats(),
+                                         source=source,
+                                         diffs=diffs)
+    finally:
+        if source is not None:
+            source.close()
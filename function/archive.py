@@ -0,0 +1,168 @@
+"""归档读取模块
+
+该模块让源码扫描和合并可以直接读取 zip / tar 归档中的文件，无需先解压到磁盘。
+功能包括：
+- 识别 .zip、.tar、.tar.gz、.tgz、.tar.xz、.txz 归档
+- 按流式顺序读取成员头信息（zip 使用中央目录，tar 逐个读取头块）
+- 归档内只有一个与归档同名的顶层目录（如 case.tar.gz 中的 case/）时自动将其作为项目根目录
+- 按需打开单个成员，只有被嵌入的成员才会被解压
+"""
+
+import os
+import time
+import tarfile
+import zipfile
+from collections import namedtuple
+
+
+# --- 配置部分 ---
+# 支持的归档扩展名（较长的复合扩展名在前）
+archive_suffixes = ('.tar.gz', '.tar.xz', '.tgz', '.txz', '.tar', '.zip')
+
+# 成员的状态信息，字段与 os.stat_result 中用到的部分一致
+MemberStat = namedtuple('MemberStat', ['st_size', 'st_mtime_ns'])
+
+
+def is_archive(path):
+    """
+    判断路径是否为支持的归档文件
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        bool: 是否为支持的归档文件
+    """
+    return path.lower().endswith(archive_suffixes) and os.path.isfile(path)
+
+
+def get_project_name(path):
+    """
+    获取项目名称：目录取目录名，归档取去掉扩展名后的文件名
+
+    Args:
+        path (str): 项目目录或归档路径
+
+    Returns:
+        str: 项目名称
+    """
+    name = os.path.basename(os.path.normpath(path))
+    lower = name.lower()
+    for suffix in archive_suffixes:
+        if lower.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class ArchiveSource:
+    """归档读取器
+
+    以与文件系统相同的方式向合并流程提供成员的状态和二进制读取接口。
+    成员的“完整路径”为 归档路径/成员名，合并文档中显示的也是这个路径。
+
+    tar.gz / tar.xz 是整体压缩的，读取头信息和成员内容都需要顺序解压，向回定位会从头重新解压。
+    成员按在归档中的顺序返回，扫描和合并的每一遍读取（忽略文件、去重哈希、嵌入内容）都按这个顺序进行，
+    因此每一遍只向前定位，至多从头解压一次。
+    tarfile 对象不是线程安全的，调用方应在同一时刻只从一个线程读取。
+    """
+
+    def __init__(self, archive_path):
+        """
+        打开归档
+
+        Args:
+            archive_path (str): 归档文件路径
+        """
+        self.archive_path = archive_path
+        self.is_zip = archive_path.lower().endswith('.zip')
+        if self.is_zip:
+            self.archive = zipfile.ZipFile(archive_path)
+        else:
+            self.archive = tarfile.open(archive_path, 'r:*')
+        self.members = None   # 完整路径 -> (成员信息, MemberStat)
+        self.prefix = ''      # 作为项目根目录的顶层目录（含结尾 /），没有时为空字符串
+
+    def iter_headers(self):
+        """
+        按归档中的顺序逐个读取成员头信息
+
+        Yields:
+            tuple: (成员名, 成员信息, MemberStat)，只包含普通文件
+        """
+        if self.is_zip:
+            for info in self.archive.infolist():
+                if info.is_dir():
+                    continue
+                mtime = int(time.mktime(info.date_time + (0, 0, -1))) * 1_000_000_000
+                yield info.filename, info, MemberStat(info.file_size, mtime)
+        else:
+            for info in self.archive:
+                if not info.isfile():
+                    continue
+                yield info.name, info, MemberStat(info.size, int(info.mtime) * 1_000_000_000)
+
+    def list_files(self):
+        """
+        列出归档中的所有普通文件
+
+        Returns:
+            list: [(相对路径, 完整路径), ...]，按归档中的顺序排列，相对路径使用 / 分隔，
+                并去掉与归档同名的唯一顶层目录
+        """
+        if self.members is None:
+            self.members = {}
+            names = []
+            for name, info, st in self.iter_headers():
+                # 只去掉 ./ 前缀（tar -C dir . 生成的成员名），.gitignore 等以点开头的名称保持不变
+                while name.startswith('./'):
+                    name = name[2:]
+                full_path = self.archive_path + '/' + name
+                self.members[full_path] = (info, st)
+                names.append((name, full_path))
+            self.names = names
+            # 只去掉与归档同名的顶层目录，src/ 等其他目录仍保留在相对路径中，src/** 之类的规则照常匹配
+            top = get_project_name(self.archive_path)
+            if names and all(name.startswith(top + '/') for name, _ in names):
+                self.prefix = top + '/'
+        return [(name[len(self.prefix):], full_path) for name, full_path in self.names]
+
+    def stat(self, full_path):
+        """
+        获取成员的状态信息
+
+        Args:
+            full_path (str): 成员的完整路径
+
+        Returns:
+            MemberStat: 成员大小和修改时间
+        """
+        if self.members is None:
+            self.list_files()
+        try:
+            return self.members[full_path][1]
+        except KeyError:
+            raise FileNotFoundError(full_path)
+
+    def open(self, full_path):
+        """
+        以二进制方式打开成员，只在读取时解压
+
+        Args:
+            full_path (str): 成员的完整路径
+
+        Returns:
+            file: 支持 read / seek / tell / readline 的文件对象
+        """
+        if self.members is None:
+            self.list_files()
+        try:
+            info = self.members[full_path][0]
+        except KeyError:
+            raise FileNotFoundError(full_path)
+        if self.is_zip:
+            return self.archive.open(info)
+        return self.archive.extractfile(info)
+
+    def close(self):
+        """关闭归档"""
+        self.archive.close()
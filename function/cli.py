@@ -0,0 +1,305 @@
+"""命令行模块
+
+提供不启动图形界面的命令行接口，适合脚本和集群中批量使用。
+功能包括：
+- convert：GMSH 网格转换为 OpenFOAM 网格并修正边界类型
+- check：运行 checkMesh 并提取网格质量指标
+- bind：按 [Binder] 配置合并源码为 Markdown
+- pdf：按 [PDF] 配置将 Markdown 导出为 PDF
+- batch：从任务文件中依次执行多条命令
+- --json 输出结构化结果，退出码区分成功、失败、参数错误和输入不存在
+
+该模块及其导入的模块都不依赖 Qt，各命令所需的功能模块在执行时才导入，启动只需几十毫秒。
+只有 pdf 命令在使用 Qt 渲染器时才会加载 PySide6。
+"""
+
+import os
+import sys
+import json
+import shlex
+import argparse
+import contextlib
+
+
+# --- 配置部分 ---
+# 子命令名称
+commands = ('convert', 'check', 'bind', 'pdf', 'batch')
+
+# 退出码
+EXIT_OK = 0             # 成功
+EXIT_FAILED = 1         # 命令执行失败（网格转换失败、checkMesh 发现问题等）
+EXIT_USAGE = 2          # 参数错误（与 argparse 一致）
+EXIT_NOT_FOUND = 3      # 输入文件或目录不存在
+EXIT_INTERRUPTED = 130  # 被 Ctrl+C 中断
+
+
+def is_cli_invocation(argv):
+    """
+    判断命令行参数是否应以命令行模式运行
+
+    第一个参数是子命令或帮助选项时使用命令行模式；兼容旧用法 "JDFOAM.py MSH文件 算例目录"。
+    其他情况（无参数、单个 .msh 文件或算例目录、--msh / --case / --action 等选项）启动图形界面。
+
+    Args:
+        argv (list): 不含程序名的命令行参数
+
+    Returns:
+        bool: 是否以命令行模式运行
+    """
+    if not argv:
+        return False
+    if argv[0] in commands or argv[0] in ('-h', '--help'):
+        return True
+    return len(argv) >= 2 and not argv[0].startswith('-') and not argv[1].startswith('-')
+
+
+def load_config(args):
+    """
+    读取配置文件
+
+    Args:
+        args (argparse.Namespace): 命令行参数，config 为配置文件路径（可选）
+
+    Returns:
+        ConfigManager: 配置管理器
+    """
+    from function.config import ConfigManager
+
+    config = ConfigManager(os.path.abspath(args.config)) if args.config else ConfigManager()
+    config.load_config()
+    return config
+
+
+def cmd_convert(args, log):
+    """转换网格并修正边界类型"""
+    from function.Gmsh2OpenFOAM import update_mesh_and_bc, get_boundary_names_from_msh
+
+    if not os.path.isfile(args.msh):
+        log(f"错误: MSH 文件不存在 - {args.msh}")
+        return EXIT_NOT_FOUND, {}
+    if not os.path.isdir(args.case):
+        log(f"错误: 算例目录不存在 - {args.case}")
+        return EXIT_NOT_FOUND, {}
+    env_source = args.env_source or load_config(args).get_openfoam_env_source()
+    success = update_mesh_and_bc(args.msh, args.case, logger=log, env_source=env_source)
+    return (EXIT_OK if success else EXIT_FAILED), {
+        'msh': os.path.abspath(args.msh),
+        'case': os.path.abspath(args.case),
+        'boundaries': get_boundary_names_from_msh(args.msh),
+    }
+
+
+def cmd_check(args, log):
+    """运行 checkMesh，网格检查全部通过时成功"""
+    from function.Gmsh2OpenFOAM import run_check_mesh, parse_check_mesh
+
+    if not os.path.isdir(args.case):
+        log(f"错误: 算例目录不存在 - {args.case}")
+        return EXIT_NOT_FOUND, {}
+    env_source = args.env_source or load_config(args).get_openfoam_env_source()
+    metrics = parse_check_mesh(run_check_mesh(args.case, logger=log, env_source=env_source))
+    return (EXIT_OK if metrics['mesh_ok'] else EXIT_FAILED), {'case': os.path.abspath(args.case), **metrics}
+
+
+def cmd_bind(args, log):
+    """合并源码为 Markdown"""
+    from function.archive import is_archive
+    from function.SourceCodeBinder import bind_project, get_source_code_path
+
+    if not (os.path.isdir(args.path) or is_archive(args.path)):
+        log(f"错误: 目录或归档不存在 - {args.path}")
+        return EXIT_NOT_FOUND, {}
+    config = load_config(args)
+    md_path = args.output or get_source_code_path(
+        args.path, '.diff.md' if config.get_binder_scope() == 'git' else '.md')
+    success = bind_project(args.path, md_path, config, log_callback=log)
+    result = {'output': os.path.abspath(md_path)}
+    if success:
+        result['bytes'] = os.path.getsize(md_path)
+    return (EXIT_OK if success else EXIT_FAILED), result
+
+
+def cmd_pdf(args, log):
+    """将 Markdown 导出为 PDF"""
+    from function.md2pdf import markdown_to_pdf
+
+    if not os.path.isfile(args.markdown):
+        log(f"错误: Markdown 文件不存在 - {args.markdown}")
+        return EXIT_NOT_FOUND, {}
+    config = load_config(args)
+    pdf_path = args.output or os.path.splitext(args.markdown)[0] + '.pdf'
+    success = markdown_to_pdf(args.markdown, pdf_path, config.get_wkhtmltopdf_path(),
+                              logger=log,
+                              renderer=args.renderer or config.get_pdf_renderer(),
+                              workers=config.get_pdf_workers() if args.workers is None else args.workers,
+                              cache_bytes=config.get_pdf_cache_bytes(),
+                              incremental=config.get_pdf_incremental(),
+                              use_highlight=config.get_pdf_highlight(),
+                              highlight_style=config.get_pdf_highlight_style(),
+                              profile=args.profile or config.get_pdf_profile(),
+                              strip_sections=config.get_pdf_strip_sections())
+    result = {'output': os.path.abspath(pdf_path)}
+    if success:
+        result['bytes'] = os.path.getsize(pdf_path)
+    return (EXIT_OK if success else EXIT_FAILED), result
+
+
+def read_jobs(jobs_path):
+    """
+    读取批处理任务文件
+
+    .json 文件为命令行参数列表的列表，如 [["convert", "a.msh", "caseA"], ["check", "caseA"]]；
+    其他文件每行一条命令（按 shell 规则拆分），空行和 # 开头的行被忽略。
+
+    Args:
+        jobs_path (str): 任务文件路径
+
+    Returns:
+        list: 每条任务的参数列表
+    """
+    with open(jobs_path, 'r', encoding='utf-8') as f:
+        if jobs_path.lower().endswith('.json'):
+            jobs = json.load(f)
+            if not isinstance(jobs, list) or not all(isinstance(job, list) for job in jobs):
+                raise ValueError("任务文件应为参数列表的列表")
+            return [[str(arg) for arg in job] for job in jobs]
+        return [shlex.split(line, posix=(os.name != 'nt')) for line in f
+                if line.strip() and not line.lstrip().startswith('#')]
+
+
+def cmd_batch(args, log):
+    """依次执行任务文件中的命令，有任务失败时整体失败"""
+    if not os.path.isfile(args.jobs):
+        log(f"错误: 任务文件不存在 - {args.jobs}")
+        return EXIT_NOT_FOUND, {}
+    parser = build_parser()
+    results = []
+    exit_code = EXIT_OK
+    for number, job in enumerate(read_jobs(args.jobs), 1):
+        log(f">>> [{number}] {' '.join(job)}")
+        if not job or job[0] not in commands or job[0] == 'batch':
+            log(f"错误: 无效的任务 - {' '.join(job)}")
+            result = {'command': job[0] if job else '', 'ok': False, 'exit_code': EXIT_USAGE}
+        else:
+            try:
+                job_args = parser.parse_args(job)
+            except SystemExit:
+                result = {'command': job[0], 'ok': False, 'exit_code': EXIT_USAGE}
+            else:
+                # 任务未指定配置文件时沿用批处理的配置文件
+                job_args.config = job_args.config or args.config
+                # 任务日志记录在各自的结果中，不再重复记录到批处理的日志里
+                result = run_command(job_args, args.echo)
+        results.append(result)
+        if not result['ok']:
+            exit_code = EXIT_FAILED
+            if args.stop_on_error:
+                break
+    return exit_code, {'jobs': results}
+
+
+def build_parser():
+    """
+    构建命令行参数解析器
+
+    Returns:
+        argparse.ArgumentParser: 参数解析器
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help="以 JSON 输出结果（日志包含在 log 字段中）")
+    common.add_argument('--config', help="配置文件路径，默认为程序目录下的 JDFOAM.ini")
+
+    parser = argparse.ArgumentParser(prog='JDFOAM', description="JDFOAM 命令行模式（不启动图形界面）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('convert', parents=[common], help="转换 GMSH 网格并修正边界类型")
+    p.add_argument('msh', help="MSH 文件路径")
+    p.add_argument('case', help="OpenFOAM 算例目录")
+    p.add_argument('--env-source', help="OpenFOAM 环境源命令，默认读取配置文件")
+    p.set_defaults(handler=cmd_convert)
+
+    p = subparsers.add_parser('check', parents=[common], help="运行 checkMesh，网格检查未通过时退出码为 1")
+    p.add_argument('case', help="OpenFOAM 算例目录")
+    p.add_argument('--env-source', help="OpenFOAM 环境源命令，默认读取配置文件")
+    p.set_defaults(handler=cmd_check)
+
+    p = subparsers.add_parser('bind', parents=[common], help="按 [Binder] 配置合并源码为 Markdown")
+    p.add_argument('path', help="项目目录或 zip / tar 归档")
+    p.add_argument('-o', '--output', help="输出 Markdown 路径，默认为 <项目名>_source_code.md")
+    p.set_defaults(handler=cmd_bind)
+
+    p = subparsers.add_parser('pdf', parents=[common], help="按 [PDF] 配置将 Markdown 导出为 PDF")
+    p.add_argument('markdown', help="Markdown 文件路径")
+    p.add_argument('-o', '--output', help="输出 PDF 路径，默认与 Markdown 同名")
+    p.add_argument('--renderer', choices=('auto', 'qt', 'wkhtmltopdf'), help="渲染器，默认读取配置文件")
+    p.add_argument('--workers', type=int, help="并行渲染的进程数，默认读取配置文件")
+    p.add_argument('--profile', choices=('standard', 'compact'), help="导出配置，默认读取配置文件")
+    p.set_defaults(handler=cmd_pdf)
+
+    p = subparsers.add_parser('batch', parents=[common], help="依次执行任务文件中的命令")
+    p.add_argument('jobs', help="任务文件：.json（参数列表的列表）或每行一条命令的文本文件")
+    p.add_argument('--stop-on-error', action='store_true', help="有任务失败时停止执行后续任务")
+    p.set_defaults(handler=cmd_batch)
+    return parser
+
+
+def run_command(args, log):
+    """
+    执行一条命令并汇总结果
+
+    Args:
+        args (argparse.Namespace): 已解析的命令行参数
+        log (callable): 日志输出函数
+
+    Returns:
+        dict: 结果，包含 command、ok、exit_code、log 以及各命令的附加字段
+    """
+    lines = []
+    args.echo = log  # 原始的日志输出函数，批处理执行子任务时使用
+
+    def collect(msg):
+        lines.append(str(msg))
+        log(msg)
+
+    if args.config and not os.path.isfile(args.config):
+        # 指定的配置文件不存在时不退回默认配置，以免按意料之外的设置执行
+        collect(f"错误: 配置文件不存在 - {args.config}")
+        return {'command': args.command, 'ok': False, 'exit_code': EXIT_USAGE, 'log': lines}
+    try:
+        exit_code, data = args.handler(args, collect)
+    except Exception as e:
+        collect(f"错误: {e}")
+        exit_code, data = EXIT_FAILED, {'error': str(e)}
+    return {'command': args.command, 'ok': exit_code == EXIT_OK, 'exit_code': exit_code, **data, 'log': lines}
+
+
+def main(argv=None):
+    """
+    命令行入口
+
+    Args:
+        argv (list): 不含程序名的命令行参数，默认为 sys.argv[1:]
+
+    Returns:
+        int: 退出码
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] not in commands and not argv[0].startswith('-'):
+        # 旧用法：JDFOAM.py MSH文件 算例目录
+        argv = ['convert'] + argv
+    args = build_parser().parse_args(argv)
+
+    if args.json:
+        # 日志只收集到结果中；功能模块中直接 print 的内容改写到 stderr，保证 stdout 只有 JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                result = run_command(args, lambda msg: None)
+            except KeyboardInterrupt:
+                result = {'command': args.command, 'ok': False, 'exit_code': EXIT_INTERRUPTED}
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return result['exit_code']
+
+    try:
+        return run_command(args, lambda msg: print(msg, flush=True))['exit_code']
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
@@ -5,11 +5,15 @@
 - 各种路径和参数的管理
 - 用户偏好设置的持久化
 - 配置项的统一访问接口
+- 外部工具（Gmsh、WSLg、WSL .bashrc）的路径按需检测，不阻塞程序启动
 """
 
 import os
+import threading
 import configparser
 
+from function.pathfilter import split_globs
+
 
 class ConfigManager:
     """配置管理器
@@ -38,23 +42,45 @@ class ConfigManager:
         self.config = configparser.RawConfigParser()
 
         # 设置默认值
-        # Gmsh 默认路径：优先检查 D 盘，然后检查 C 盘
-        default_gmsh_d = "D:\\gmsh-4.15.0-Windows64\\gmsh.exe"
-        default_gmsh_c = "C:\\gmsh-4.15.0-Windows64\\gmsh.exe"
-        if os.path.exists(default_gmsh_d):
-            self.gmsh_exe_path = default_gmsh_d
-        elif os.path.exists(default_gmsh_c):
-            self.gmsh_exe_path = default_gmsh_c
-        else:
-            self.gmsh_exe_path = ""
+        # Gmsh 路径为空时在 detect_tools 中检测默认安装位置
+        self.gmsh_exe_path = ""
 
         self.wkhtmltopdf_path = ""  # wkhtmltopdf 可执行文件路径
         self.theme = "light"  # 当前主题，默认为浅色
         self.openfoam_env_source = "source /usr/lib/openfoam/openfoam2506/etc/bashrc"  # OpenFOAM 环境源路径
         self.case_path = ""  # 算例目录路径
         self.msh_path = ""  # MSH 文件路径
-        self.wsl_bashrc_path = ""  # WSL .bashrc 路径，将在 load_config 中自动检测
-        self.wsl_base = ""  # WSL 基础命令，将在 load_config 中自动检测
+        self.wsl_bashrc_path = ""  # WSL .bashrc 路径，未配置时在 detect_tools 中自动检测
+        self.wsl_base = ""  # WSL 基础命令，未配置时在 detect_tools 中自动检测
+        self.single_instance = True  # 是否只运行一个图形界面实例，再次启动时把参数转交给已运行的实例
+        # 外部工具检测需要逐个探测盘符（网络盘可能很慢），推迟到第一次使用时或由 GUI 在后台执行
+        self._tools_detected = False
+        self._tools_lock = threading.Lock()
+
+        # 源码合并（[Binder] section）的默认配置
+        self.binder_include_globs = ""  # 强制包含的通配符，分号分隔
+        self.binder_exclude_globs = ""  # 额外排除的通配符，分号分隔（gitignore 语法）
+        self.binder_profile = "auto"  # 扫描配置：auto / source / openfoam
+        self.binder_max_file_kb = 512  # 单个文件嵌入的最大大小（KB），0 表示不限制
+        self.binder_max_total_mb = 64  # 整个文档嵌入的最大大小（MB），0 表示不限制
+        self.binder_collapse_lists = True  # 是否折叠 nonuniform List 列表
+        self.binder_part_mb = 0  # 分卷的目标大小（MB），0 表示输出单个文件
+        self.binder_dedup = True  # 是否按内容哈希对重复文件去重
+        self.binder_formats = "md"  # 输出格式，分号分隔：md（始终生成）、html、jsonl
+        self.binder_scope = "all"  # 合并范围：all（整个目录）/ git（只合并 git 变更文件）
+        self.binder_git_base = ""  # git 范围的起始引用，为空表示 HEAD
+        self.binder_git_head = ""  # git 范围的结束引用，为空表示工作区
+        self.binder_git_diff = True  # git 范围下是否在章节中附带统一差异
+
+        # PDF 导出（[PDF] section）的默认配置
+        self.pdf_renderer = "auto"  # 渲染器：auto / qt（进程内）/ wkhtmltopdf（外部程序）
+        self.pdf_workers = 0  # 大型文档并行渲染的进程数，0 表示使用 CPU 核心数，1 表示不拆分
+        self.pdf_cache_mb = 256  # HTML 片段缓存的最大总大小（MB），0 表示不使用缓存
+        self.pdf_incremental = True  # 是否保留各段 PDF，再次导出时只渲染变化的段
+        self.pdf_highlight = True  # 是否高亮代码块（需要 Pygments）
+        self.pdf_highlight_style = "default"  # Pygments 配色方案名称
+        self.pdf_profile = "standard"  # 导出配置：standard / compact
+        self.pdf_strip_sections = False  # 是否去掉每个文件章节的完整路径行和回到目录链接
 
         # Light 主题的默认命令（只包含后面的部分，wsl_base 会自动添加）
         self.light_wsl_treefoam_command = '-u jiedi -- bash -l -c "/usr/local/bin/start_treefoam.sh; echo \'----------------\'; echo \'Script execution completed\'; read -p \'Press Enter to close window...\'"'
@@ -117,34 +143,152 @@ class ConfigManager:
                         value = self.config.get('General', 'wsl_base')
                         if value:
                             self.wsl_base = value
-
-                # 如果配置文件中没有设置 wsl_base，则自动检测盘符
-                if not self.wsl_base:
-                    for drive_letter in ['C', 'D', 'E']:
-                        wslg_path = f"{drive_letter}:\\Program Files\\WSL\\wslg.exe"
-                        if os.path.exists(wslg_path):
-                            self.wsl_base = f'"{wslg_path}" -d DEXCS2025'
-                            break
-
-                # 如果配置文件中没有设置 wsl_bashrc_path，则自动检测盘符
-                if not self.wsl_bashrc_path:
-                    for drive_letter in ['Z', 'Y', 'X', 'W', 'V', 'U', 'T', 'S', 'R', 'Q', 'P', 'O', 'N', 'M', 'L', 'K', 'J', 'I', 'H']:
-                        bashrc_path = f"{drive_letter}:\\home\\jiedi\\.bashrc"
-                        if os.path.exists(bashrc_path):
-                            self.wsl_bashrc_path = bashrc_path
-                            break
+                    if self.config.has_option('General', 'single_instance'):
+                        try:
+                            self.single_instance = self.config.getboolean('General', 'single_instance')
+                        except ValueError:
+                            pass
+
+                if self.config.has_section('Binder'):
+                    if self.config.has_option('Binder', 'include_globs'):
+                        self.binder_include_globs = self.config.get('Binder', 'include_globs')
+                    if self.config.has_option('Binder', 'exclude_globs'):
+                        self.binder_exclude_globs = self.config.get('Binder', 'exclude_globs')
+                    if self.config.has_option('Binder', 'profile'):
+                        value = self.config.get('Binder', 'profile')
+                        if value in ('auto', 'source', 'openfoam'):
+                            self.binder_profile = value
+                        elif value:
+                            print(f"配置项 [Binder] profile 的值无效: {value}，使用 {self.binder_profile}")
+                    if self.config.has_option('Binder', 'max_file_kb'):
+                        try:
+                            self.binder_max_file_kb = max(self.config.getint('Binder', 'max_file_kb'), 0)
+                        except ValueError:
+                            pass
+                    if self.config.has_option('Binder', 'max_total_mb'):
+                        try:
+                            self.binder_max_total_mb = max(self.config.getint('Binder', 'max_total_mb'), 0)
+                        except ValueError:
+                            pass
+                    if self.config.has_option('Binder', 'part_mb'):
+                        try:
+                            self.binder_part_mb = max(self.config.getint('Binder', 'part_mb'), 0)
+                        except ValueError:
+                            pass
+                    if self.config.has_option('Binder', 'scope'):
+                        value = self.config.get('Binder', 'scope')
+                        if value in ('all', 'git'):
+                            self.binder_scope = value
+                    if self.config.has_option('Binder', 'git_base'):
+                        self.binder_git_base = self.config.get('Binder', 'git_base')
+                    if self.config.has_option('Binder', 'git_head'):
+                        self.binder_git_head = self.config.get('Binder', 'git_head')
+                    if self.config.has_option('Binder', 'git_diff'):
+                        try:
+                            self.binder_git_diff = self.config.getboolean('Binder', 'git_diff')
+                        except ValueError:
+                            pass
+                    if self.config.has_option('Binder', 'formats'):
+                        value = self.config.get('Binder', 'formats')
+                        if value:
+                            self.binder_formats = value
+                    if self.config.has_option('Binder', 'dedup'):
+                        try:
+                            self.binder_dedup = self.config.getboolean('Binder', 'dedup')
+                        except ValueError:
+                            pass
+                    if self.config.has_option('Binder', 'collapse_lists'):
+                        try:
+                            self.binder_collapse_lists = self.config.getboolean('Binder', 'collapse_lists')
+                        except ValueError:
+                            pass
+
+                if self.config.has_section('PDF'):
+                    if self.config.has_option('PDF', 'renderer'):
+                        value = self.config.get('PDF', 'renderer')
+                        if value in ('auto', 'qt', 'wkhtmltopdf'):
+                            self.pdf_renderer = value
+                    if self.config.has_option('PDF', 'incremental'):
+                        try:
+                            self.pdf_incremental = self.config.getboolean('PDF', 'incremental')
+                        except ValueError:
+                            pass
+                    if self.config.has_option('PDF', 'cache_mb'):
+                        try:
+                            self.pdf_cache_mb = max(self.config.getint('PDF', 'cache_mb'), 0)
+                        except ValueError:
+                            pass
+                    if self.config.has_option('PDF', 'workers'):
+                        try:
+                            self.pdf_workers = max(self.config.getint('PDF', 'workers'), 0)
+                        except ValueError:
+                            pass
+                    if self.config.has_option('PDF', 'highlight'):
+                        try:
+                            self.pdf_highlight = self.config.getboolean('PDF', 'highlight')
+                        except ValueError:
+                            pass
+                    if self.config.has_option('PDF', 'highlight_style'):
+                        value = self.config.get('PDF', 'highlight_style').strip()
+                        if value:
+                            self.pdf_highlight_style = value
+                    if self.config.has_option('PDF', 'profile'):
+                        value = self.config.get('PDF', 'profile')
+                        if value in ('standard', 'compact'):
+                            self.pdf_profile = value
+                    if self.config.has_option('PDF', 'strip_sections'):
+                        try:
+                            self.pdf_strip_sections = self.config.getboolean('PDF', 'strip_sections')
+                        except ValueError:
+                            pass
 
                 # 读取 [light] 和 [dark] section 的命令配置
                 # 这些配置会在 get_*_command 方法中根据主题动态获取
         except Exception as e:
             print(f"加载配置文件失败: {e}")
 
+    def detect_tools(self):
+        """检测外部工具路径
+
+        只填充配置文件中没有设置的路径：Gmsh 的默认安装位置、WSLg 所在盘符和 WSL .bashrc 所在盘符。
+        每个实例只检测一次，可以在后台线程中调用；依赖这些路径的 get_* 方法和保存配置前会自动调用。
+        """
+        with self._tools_lock:
+            if self._tools_detected:
+                return
+
+            # Gmsh 默认路径：优先检查 D 盘，然后检查 C 盘
+            if not self.gmsh_exe_path:
+                for gmsh_path in ("D:\\gmsh-4.15.0-Windows64\\gmsh.exe", "C:\\gmsh-4.15.0-Windows64\\gmsh.exe"):
+                    if os.path.exists(gmsh_path):
+                        self.gmsh_exe_path = gmsh_path
+                        break
+
+            # 如果配置文件中没有设置 wsl_base，则自动检测盘符
+            if not self.wsl_base:
+                for drive_letter in ['C', 'D', 'E']:
+                    wslg_path = f"{drive_letter}:\\Program Files\\WSL\\wslg.exe"
+                    if os.path.exists(wslg_path):
+                        self.wsl_base = f'"{wslg_path}" -d DEXCS2025'
+                        break
+
+            # 如果配置文件中没有设置 wsl_bashrc_path，则自动检测盘符
+            if not self.wsl_bashrc_path:
+                for drive_letter in ['Z', 'Y', 'X', 'W', 'V', 'U', 'T', 'S', 'R', 'Q', 'P', 'O', 'N', 'M', 'L', 'K', 'J', 'I', 'H']:
+                    bashrc_path = f"{drive_letter}:\\home\\jiedi\\.bashrc"
+                    if os.path.exists(bashrc_path):
+                        self.wsl_bashrc_path = bashrc_path
+                        break
+
+            self._tools_detected = True
+
     def save_config(self):
         """保存配置文件
 
         将当前配置项保存到配置文件中，包含 [General]、[light] 和 [dark] 三个 section
         保留用户在配置文件中已经设置的命令，只更新 [General] section 的内容
         """
+        self.detect_tools()
         try:
             # 读取现有配置文件，保留 [light] 和 [dark] section 的内容
             light_commands = {}
@@ -188,8 +332,15 @@ class ConfigManager:
                 f.write(f'openfoam_env_source = {self.openfoam_env_source}\n')
                 f.write(f'wsl_bashrc_path = {self.wsl_bashrc_path}\n')
                 f.write(f'wkhtmltopdf_path = {self.wkhtmltopdf_path}\n')
+                f.write(f'single_instance = {str(self.single_instance).lower()}\n')
                 f.write('\n')
 
+                # [Binder] section
+                self.write_binder_section(f)
+
+                # [PDF] section
+                self.write_pdf_section(f)
+
                 # [light] section - 使用保存的值或默认值
                 f.write('[light]\n')
                 f.write(f'light_wsl_treefoam_command = {light_commands.get("light_wsl_treefoam_command", self.light_wsl_treefoam_command)}\n')
@@ -214,6 +365,7 @@ class ConfigManager:
         Returns:
             str: Gmsh 可执行文件路径
         """
+        self.detect_tools()
         return self.gmsh_exe_path
 
     def set_gmsh_path(self, path):
@@ -237,6 +389,7 @@ class ConfigManager:
         Returns:
             str: TreeFOAM 命令
         """
+        self.detect_tools()
         command_suffix = ""
         try:
             if self.config.has_section(self.theme):
@@ -299,6 +452,7 @@ class ConfigManager:
         将所有配置项保存到配置文件中，包含 [General]、[light] 和 [dark] 三个 section
         保留用户在配置文件中已经设置的命令，只更新 [General] section 的内容
         """
+        self.detect_tools()
         try:
             # 读取现有配置文件，保留 [light] 和 [dark] section 的内容
             light_commands = {}
@@ -342,8 +496,15 @@ class ConfigManager:
                 f.write(f'openfoam_env_source = {self.openfoam_env_source}\n')
                 f.write(f'wsl_bashrc_path = {self.wsl_bashrc_path}\n')
                 f.write(f'wsl_base = {self.wsl_base}\n')
+                f.write(f'single_instance = {str(self.single_instance).lower()}\n')
                 f.write('\n')
 
+                # [Binder] section
+                self.write_binder_section(f)
+
+                # [PDF] section
+                self.write_pdf_section(f)
+
                 # [light] section - 使用保存的值或默认值
                 f.write('[light]\n')
                 f.write(f'light_wsl_treefoam_command = {light_commands.get("light_wsl_treefoam_command", self.light_wsl_treefoam_command)}\n')
@@ -361,6 +522,236 @@ class ConfigManager:
         except Exception as e:
             print(f"保存配置文件失败: {e}")
 
+    def write_binder_section(self, f):
+        """
+        写入 [Binder] section
+
+        Args:
+            f: 已打开的配置文件对象
+        """
+        f.write('[Binder]\n')
+        f.write(f'include_globs = {self.binder_include_globs}\n')
+        f.write(f'exclude_globs = {self.binder_exclude_globs}\n')
+        f.write(f'profile = {self.binder_profile}\n')
+        f.write(f'max_file_kb = {self.binder_max_file_kb}\n')
+        f.write(f'max_total_mb = {self.binder_max_total_mb}\n')
+        f.write(f'collapse_lists = {str(self.binder_collapse_lists).lower()}\n')
+        f.write(f'part_mb = {self.binder_part_mb}\n')
+        f.write(f'dedup = {str(self.binder_dedup).lower()}\n')
+        f.write(f'formats = {self.binder_formats}\n')
+        f.write(f'scope = {self.binder_scope}\n')
+        f.write(f'git_base = {self.binder_git_base}\n')
+        f.write(f'git_head = {self.binder_git_head}\n')
+        f.write(f'git_diff = {str(self.binder_git_diff).lower()}\n')
+        f.write('\n')
+
+    def write_pdf_section(self, f):
+        """
+        写入 [PDF] section
+
+        Args:
+            f: 已打开的配置文件对象
+        """
+        f.write('[PDF]\n')
+        f.write(f'renderer = {self.pdf_renderer}\n')
+        f.write(f'workers = {self.pdf_workers}\n')
+        f.write(f'cache_mb = {self.pdf_cache_mb}\n')
+        f.write(f'incremental = {str(self.pdf_incremental).lower()}\n')
+        f.write(f'highlight = {str(self.pdf_highlight).lower()}\n')
+        f.write(f'highlight_style = {self.pdf_highlight_style}\n')
+        f.write(f'profile = {self.pdf_profile}\n')
+        f.write(f'strip_sections = {str(self.pdf_strip_sections).lower()}\n')
+        f.write('\n')
+
+    def get_binder_include_globs(self):
+        """
+        获取源码合并时强制包含的通配符列表
+
+        Returns:
+            list: 通配符列表
+        """
+        return split_globs(self.binder_include_globs)
+
+    def get_binder_exclude_globs(self):
+        """
+        获取源码合并时额外排除的通配符列表
+
+        Returns:
+            list: 通配符列表
+        """
+        return split_globs(self.binder_exclude_globs)
+
+    def get_binder_profile(self):
+        """
+        获取源码合并的扫描配置
+
+        Returns:
+            str: "auto"、"source" 或 "openfoam"
+        """
+        return self.binder_profile
+
+    def get_binder_max_file_bytes(self):
+        """
+        获取单个文件嵌入的字节预算
+
+        Returns:
+            int: 字节数，0 表示不限制
+        """
+        return self.binder_max_file_kb * 1024
+
+    def get_binder_max_total_bytes(self):
+        """
+        获取整个文档嵌入的字节预算
+
+        Returns:
+            int: 字节数，0 表示不限制
+        """
+        return self.binder_max_total_mb * 1024 * 1024
+
+    def get_binder_collapse_lists(self):
+        """
+        获取是否折叠 OpenFOAM 的 nonuniform List 列表
+
+        Returns:
+            bool: 是否折叠
+        """
+        return self.binder_collapse_lists
+
+    def get_binder_part_bytes(self):
+        """
+        获取分卷的目标大小
+
+        Returns:
+            int: 字节数，0 表示输出单个文件
+        """
+        return self.binder_part_mb * 1024 * 1024
+
+    def get_binder_dedup(self):
+        """
+        获取是否按内容哈希对重复文件去重
+
+        Returns:
+            bool: 是否去重
+        """
+        return self.binder_dedup
+
+    def get_binder_scope(self):
+        """
+        获取合并范围
+
+        Returns:
+            str: "all"（整个目录）或 "git"（只合并 git 变更文件）
+        """
+        return self.binder_scope
+
+    def get_binder_git_range(self):
+        """
+        获取 git 范围的起止引用
+
+        Returns:
+            tuple: (base, head)，为空时分别为 None
+        """
+        return self.binder_git_base.strip() or None, self.binder_git_head.strip() or None
+
+    def get_binder_git_diff(self):
+        """
+        获取 git 范围下是否附带统一差异
+
+        Returns:
+            bool: 是否附带差异
+        """
+        return self.binder_git_diff
+
+    def get_binder_extra_formats(self):
+        """
+        获取除 Markdown 外同时输出的格式
+
+        Returns:
+            list: 格式列表，如 ['html', 'jsonl']
+        """
+        return [fmt.lower() for fmt in split_globs(self.binder_formats) if fmt.lower() != 'md']
+
+    def get_pdf_renderer(self):
+        """
+        获取 PDF 渲染器
+
+        Returns:
+            str: "auto"、"qt" 或 "wkhtmltopdf"
+        """
+        return self.pdf_renderer
+
+    def get_pdf_workers(self):
+        """
+        获取并行渲染 PDF 的进程数
+
+        Returns:
+            int: 进程数，0 表示使用 CPU 核心数
+        """
+        return self.pdf_workers
+
+    def get_pdf_cache_bytes(self):
+        """
+        获取 HTML 片段缓存的最大总大小
+
+        Returns:
+            int: 最大字节数，0 表示不使用缓存
+        """
+        return self.pdf_cache_mb * 1024 * 1024
+
+    def get_pdf_incremental(self):
+        """
+        获取是否启用增量导出 PDF
+
+        Returns:
+            bool: 是否保留各段 PDF 供下次导出复用
+        """
+        return self.pdf_incremental
+
+    def get_pdf_highlight(self):
+        """
+        获取导出 PDF 时是否高亮代码块
+
+        Returns:
+            bool: 是否高亮
+        """
+        return self.pdf_highlight
+
+    def get_pdf_highlight_style(self):
+        """
+        获取代码高亮的配色方案
+
+        Returns:
+            str: Pygments 配色方案名称
+        """
+        return self.pdf_highlight_style
+
+    def get_pdf_profile(self):
+        """
+        获取 PDF 导出配置
+
+        Returns:
+            str: standard / compact
+        """
+        return self.pdf_profile
+
+    def get_pdf_strip_sections(self):
+        """
+        获取导出 PDF 时是否去掉完整路径行和回到目录链接
+
+        Returns:
+            bool: 是否去掉
+        """
+        return self.pdf_strip_sections
+
+    def get_single_instance(self):
+        """
+        获取是否只运行一个图形界面实例
+
+        Returns:
+            bool: 是否只运行一个实例
+        """
+        return self.single_instance
+
     def get_wkhtmltopdf_path(self):
         """
         获取 wkhtmltopdf 可执行文件路径
@@ -448,6 +839,7 @@ class ConfigManager:
         Returns:
             str: WSL Files 命令
         """
+        self.detect_tools()
         command_suffix = ""
         try:
             if self.config.has_section(self.theme):
@@ -494,6 +886,7 @@ class ConfigManager:
         Returns:
             str: WSL Disk Analysis 命令
         """
+        self.detect_tools()
         command_suffix = ""
         try:
             if self.config.has_section(self.theme):
@@ -540,6 +933,7 @@ class ConfigManager:
         Returns:
             str: WSL Appearance 命令
         """
+        self.detect_tools()
         command_suffix = ""
         try:
             if self.config.has_section(self.theme):
@@ -582,6 +976,7 @@ class ConfigManager:
         Returns:
             str: WSL .bashrc 文件路径
         """
+        self.detect_tools()
         return self.wsl_bashrc_path
 
     def set_wsl_bashrc_path(self, path):
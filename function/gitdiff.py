@@ -0,0 +1,275 @@
+"""Git 变更范围模块
+
+该模块通过本地 git 获取两个提交之间（或工作区中）发生变化的文件，
+供源码合并只处理变更文件，而不遍历整个目录树。
+功能包括：
+- 列出两个引用之间、某个引用与工作区之间或工作区中的变更文件（含未跟踪文件）
+- 一次调用获取所有变更文件的统一差异并按文件拆分
+- 通过 git cat-file 直接读取指定提交中的文件内容，无需检出
+"""
+
+import io
+import os
+import re
+import hashlib
+import threading
+import subprocess
+from collections import namedtuple
+
+
+# 文件状态信息，字段与 os.stat_result 中用到的部分一致
+BlobStat = namedtuple('BlobStat', ['st_size', 'st_mtime_ns'])
+
+# git 引号路径中的转义序列：三位八进制表示一个字节，其余为 C 风格的单字符转义
+quoted_escape_pattern = re.compile(rb'\\([0-7]{3}|.)')
+quoted_escapes = {b'a': 7, b'b': 8, b't': 9, b'n': 10, b'v': 11, b'f': 12, b'r': 13, b'"': 34, b'\\': 92}
+
+
+def run_git(repo_dir, args):
+    """
+    在仓库目录中执行 git 命令
+
+    Args:
+        repo_dir (str): 仓库目录
+        args (list): git 子命令及参数
+
+    Returns:
+        bytes: 标准输出
+
+    Raises:
+        RuntimeError: git 不可用或命令执行失败
+    """
+    try:
+        result = subprocess.run(['git', '-C', repo_dir, '-c', 'core.quotePath=false'] + args,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise RuntimeError(f"无法执行 git: {e}")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode('utf-8', errors='replace').strip())
+    return result.stdout
+
+
+def get_repo_prefix(root_dir):
+    """
+    获取目录相对于仓库根目录的路径前缀
+
+    Args:
+        root_dir (str): 项目目录（可以是仓库的子目录）
+
+    Returns:
+        str: 路径前缀，如 "src/"；目录即仓库根目录时为空字符串
+    """
+    return run_git(root_dir, ['rev-parse', '--show-prefix']).decode('utf-8').strip()
+
+
+def list_changed_files(root_dir, base=None, head=None):
+    """
+    列出变更的文件
+
+    - base 和 head 都为空：工作区相对于 HEAD 的变更，以及未被忽略的未跟踪文件
+    - 只有 base：工作区相对于 base 的变更，以及未被忽略的未跟踪文件
+    - base 和 head 都有：两个提交之间的变更
+
+    删除的文件不包含在内。路径相对于 root_dir，使用 / 分隔，只包含 root_dir 下的文件。
+
+    Args:
+        root_dir (str): 项目目录
+        base (str): 起始引用（可选）
+        head (str): 结束引用（可选），为空表示工作区
+
+    Returns:
+        list: 按路径排序的相对路径列表
+    """
+    args = ['diff', '--name-only', '-z', '--diff-filter=d', '--relative', base or 'HEAD']
+    if head:
+        args.append(head)
+    names = set(run_git(root_dir, args + ['--', '.']).decode('utf-8').split('\0'))
+    if not head:
+        untracked = run_git(root_dir, ['ls-files', '--others', '--exclude-standard', '-z', '--', '.'])
+        names.update(untracked.decode('utf-8').split('\0'))
+    names.discard('')
+    return sorted(names)
+
+
+def unquote_path(name):
+    """
+    还原差异输出中的路径
+
+    路径包含双引号、反斜杠或控制字符（未设置 core.quotePath=false 时还包括非 ASCII 字符）时，
+    git 将其放在双引号中并按 C 风格转义，非 ASCII 字符转义为 UTF-8 字节的八进制形式。
+
+    Args:
+        name (str): 差异输出中的路径，可能带引号
+
+    Returns:
+        str: 原始路径
+    """
+    if len(name) < 2 or name[0] != '"' or name[-1] != '"':
+        return name
+    def unescape(match):
+        code = match.group(1)
+        return bytes([int(code, 8) if len(code) == 3 else quoted_escapes.get(code, code[0])])
+
+    return quoted_escape_pattern.sub(unescape, name[1:-1].encode('utf-8')).decode('utf-8', errors='replace')
+
+
+def get_diff_path(block):
+    """
+    获取一个文件差异块对应的新路径
+
+    优先使用 +++ 行（git 在含空格的路径后附加一个制表符），其次使用重命名、复制记录，
+    二进制文件或仅修改权限时没有这些行，从首行 "diff --git a/x b/x" 中取路径。
+
+    Args:
+        block (str): 以 "diff --git " 开头的差异块
+
+    Returns:
+        str: 相对路径
+    """
+    lines = block.split('\n', 8)
+    path = None
+    for line in lines[1:]:
+        if line.startswith('+++ '):
+            name = unquote_path(line[4:].rstrip('\t'))
+            if name.startswith('b/'):
+                return name[2:]
+            break
+        if line.startswith('rename to ') or line.startswith('copy to '):
+            path = unquote_path(line.split(' to ', 1)[1])
+        if line.startswith('@@'):
+            break
+    if path is not None:
+        return path
+    header = lines[0]
+    if header.endswith('"'):
+        return unquote_path(header[header.rindex(' "') + 1:])[2:]
+    return header.rpartition(' b/')[2]
+
+
+def collect_diffs(root_dir, base=None, head=None):
+    """
+    一次获取所有变更文件的统一差异，并按文件拆分
+
+    未跟踪文件没有差异记录。
+
+    Args:
+        root_dir (str): 项目目录
+        base (str): 起始引用（可选）
+        head (str): 结束引用（可选），为空表示工作区
+
+    Returns:
+        dict: {相对路径: 差异文本}
+    """
+    args = ['diff', '--no-color', '--no-ext-diff', '--relative', base or 'HEAD']
+    if head:
+        args.append(head)
+    output = run_git(root_dir, args + ['--', '.']).decode('utf-8', errors='replace')
+    diffs = {}
+    for block in ('\n' + output).split('\ndiff --git ')[1:]:
+        block = 'diff --git ' + block
+        diffs[get_diff_path(block)] = block.rstrip('\n') + '\n'
+    return diffs
+
+
+def get_diff_hash(diff_text):
+    """
+    计算差异文本的哈希值，用于判断缓存章节中的差异是否仍然有效
+
+    Args:
+        diff_text (str): 差异文本，可以为 None
+
+    Returns:
+        str: 十六进制哈希字符串；没有差异时为 None
+    """
+    if not diff_text:
+        return None
+    return hashlib.sha1(diff_text.encode('utf-8')).hexdigest()
+
+
+class GitTreeSource:
+    """提交内容读取器
+
+    以与文件系统相同的方式向合并流程提供某个提交中文件的状态和内容，
+    内容通过常驻的 git cat-file --batch 进程读取，不需要检出。
+    文件的修改时间统一使用提交时间。
+    """
+
+    def __init__(self, root_dir, ref):
+        """
+        初始化读取器
+
+        Args:
+            root_dir (str): 项目目录
+            ref (str): 提交引用
+        """
+        self.root_dir = root_dir
+        self.ref = ref
+        self.prefix = get_repo_prefix(root_dir)
+        commit_time = int(run_git(root_dir, ['show', '-s', '--format=%ct', ref]).decode('ascii').strip())
+        self.mtime_ns = commit_time * 1_000_000_000
+        self.sizes = {}
+        self.lock = threading.Lock()
+        # --batch 读取内容，--batch-check 只读取大小
+        self.process = subprocess.Popen(['git', '-C', root_dir, 'cat-file', '--batch'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.check_process = subprocess.Popen(['git', '-C', root_dir, 'cat-file', '--batch-check'],
+                                              stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def query(self, process, full_path):
+        # 向 cat-file 进程发送一个对象名并读取头信息，返回对象大小
+        rel_path = os.path.relpath(full_path, self.root_dir).replace(os.sep, '/')
+        process.stdin.write(f"{self.ref}:{self.prefix}{rel_path}\n".encode('utf-8'))
+        process.stdin.flush()
+        header = process.stdout.readline().decode('utf-8').split()
+        if len(header) != 3:
+            raise FileNotFoundError(full_path)
+        return int(header[2])
+
+    def read_blob(self, full_path):
+        """
+        读取文件在提交中的内容
+
+        Args:
+            full_path (str): 文件完整路径
+
+        Returns:
+            bytes: 文件内容
+        """
+        with self.lock:
+            size = self.query(self.process, full_path)
+            data = self.process.stdout.read(size)
+            self.process.stdout.read(1)  # 内容后的换行符
+        return data
+
+    def stat(self, full_path):
+        """
+        获取文件在提交中的状态
+
+        Args:
+            full_path (str): 文件完整路径
+
+        Returns:
+            BlobStat: 文件大小和提交时间
+        """
+        if full_path not in self.sizes:
+            with self.lock:
+                self.sizes[full_path] = self.query(self.check_process, full_path)
+        return BlobStat(self.sizes[full_path], self.mtime_ns)
+
+    def open(self, full_path):
+        """
+        以二进制方式打开文件在提交中的内容
+
+        Args:
+            full_path (str): 文件完整路径
+
+        Returns:
+            io.BytesIO: 文件内容
+        """
+        return io.BytesIO(self.read_blob(full_path))
+
+    def close(self):
+        """结束 cat-file 进程"""
+        for process in (self.process, self.check_process):
+            process.stdin.close()
+            process.wait()
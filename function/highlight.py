@@ -0,0 +1,161 @@
+"""代码高亮模块
+
+为导出 PDF 时的 Markdown 转换提供带缓存的 Pygments 语法高亮。
+markdown2 在安装了 Pygments 时会为每个代码块重新查找词法分析器并创建格式化器，
+该模块改为每个进程按语言只创建一次词法分析器、共用一个格式化器，
+高亮结果只使用 CSS 类名，颜色由文档头部的一份公共样式表提供，不产生内联样式。
+功能包括：
+- 按语言缓存词法分析器（每个进程一份）
+- 共用的 HTML 格式化器和公共样式表
+- 逐节转换 Markdown 的函数，可在进程池中并行执行
+- 可关闭高亮，关闭时代码块只做转义
+
+Pygments 是可选依赖，未安装时不进行高亮。
+"""
+
+import markdown2
+
+try:
+    import pygments
+    import pygments.formatters
+    import pygments.lexers
+    import pygments.util
+except ImportError:
+    pygments = None
+
+
+# --- 配置部分 ---
+# 代码块容器的 CSS 类名，与 markdown2 的默认值一致
+highlight_css_class = 'codehilite'
+
+# Markdown 转换启用的扩展：代码块、表格和换行符
+markdown_extras = ["fenced-code-blocks", "tables", "break-on-newline"]
+
+# 每个进程内的缓存
+_lexers = {}       # 语言名 -> 词法分析器（找不到时为 None）
+_formatter = None  # 共用的格式化器
+_converters = {}   # 是否高亮 -> Markdown 转换器
+
+
+def is_available():
+    """
+    判断是否可以进行语法高亮
+
+    Returns:
+        bool: 是否已安装 Pygments
+    """
+    return pygments is not None
+
+
+def get_settings(highlight):
+    """
+    获取影响转换结果的设置描述，用于 HTML 片段缓存的键
+
+    Args:
+        highlight (bool): 是否高亮
+
+    Returns:
+        str: 设置描述
+    """
+    settings = f"markdown2 {markdown2.__version__}|{','.join(markdown_extras)}"
+    if highlight and pygments is not None:
+        settings += f"|pygments {pygments.__version__}"
+    return settings
+
+
+def get_lexer(name):
+    """
+    获取语言对应的词法分析器，每个进程内每种语言只创建一次
+
+    Args:
+        name (str): 语言名（代码块围栏后的标记，如 python）
+
+    Returns:
+        Lexer: 词法分析器；不支持的语言为 None
+    """
+    if name not in _lexers:
+        try:
+            _lexers[name] = pygments.lexers.get_lexer_by_name(name)
+        except pygments.util.ClassNotFound:
+            _lexers[name] = None
+    return _lexers[name]
+
+
+def get_formatter():
+    """
+    获取共用的 HTML 格式化器
+
+    输出结构与 markdown2 相同：<div class="codehilite"><pre><code>...</code></pre></div>
+
+    Returns:
+        HtmlFormatter: 格式化器
+    """
+    global _formatter
+    if _formatter is None:
+        class CodeFormatter(pygments.formatters.HtmlFormatter):
+            def wrap(self, source):
+                # 在 <pre> 内加一层 <code>，前后换行使 markdown2 能识别为块级 HTML
+                yield 0, "\n"
+                yield from self._wrap_pre(self._wrap_code(source))
+                yield 0, "\n"
+
+            def _wrap_code(self, inner):
+                yield 0, "<code>"
+                yield from inner
+                yield 0, "</code>"
+
+        _formatter = CodeFormatter(cssclass=highlight_css_class)
+    return _formatter
+
+
+def get_stylesheet(style='default'):
+    """
+    获取高亮的公共样式表
+
+    Args:
+        style (str): Pygments 配色方案名称
+
+    Returns:
+        str: CSS 文本；未安装 Pygments 或配色方案不存在时为空字符串
+    """
+    if pygments is None:
+        return ""
+    try:
+        formatter = pygments.formatters.HtmlFormatter(style=style, cssclass=highlight_css_class)
+    except pygments.util.ClassNotFound:
+        formatter = pygments.formatters.HtmlFormatter(cssclass=highlight_css_class)
+    return formatter.get_style_defs('.' + highlight_css_class)
+
+
+class CachedMarkdown(markdown2.Markdown):
+    """带高亮缓存的 Markdown 转换器
+
+    覆盖 markdown2 查找词法分析器和着色的两个方法，改为使用本模块的缓存；
+    关闭高亮时不返回词法分析器，代码块只做转义。
+    """
+
+    def __init__(self, highlight):
+        super().__init__(extras=markdown_extras)
+        self.highlight = highlight and pygments is not None
+
+    def _get_pygments_lexer(self, lexer_name):
+        return get_lexer(lexer_name) if self.highlight else None
+
+    def _color_with_pygments(self, codeblock, lexer, **formatter_opts):
+        return pygments.highlight(codeblock, lexer, get_formatter())
+
+
+def convert_section(text, highlight=True):
+    """
+    将一节 Markdown 转换为 HTML（可在进程池中执行）
+
+    Args:
+        text (str): 章节 Markdown 文本
+        highlight (bool): 是否高亮代码块
+
+    Returns:
+        str: HTML 片段
+    """
+    if highlight not in _converters:
+        _converters[highlight] = CachedMarkdown(highlight)
+    return str(_converters[highlight].convert(text))
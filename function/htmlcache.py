@@ -0,0 +1,129 @@
+"""HTML 片段缓存模块
+
+导出 PDF 时每个文件章节都要经过 Markdown 解析和代码块格式化。该模块把每节渲染后的 HTML 保存在磁盘上，
+再次导出时未变化的章节直接读取缓存，只转换发生变化的章节。
+功能包括：
+- 以章节 Markdown 和渲染设置的哈希值为键保存 HTML 片段
+- 命中时更新修改时间，作为最近使用时间
+- 按总大小进行 LRU 淘汰，优先删除最久未使用的片段
+"""
+
+import os
+import hashlib
+
+
+# --- 配置部分 ---
+# 缓存格式版本，片段的生成方式变化时递增，使旧片段全部失效
+cache_version = 1
+
+# 片段文件的扩展名
+fragment_suffix = '.html'
+
+
+class FragmentCache:
+    """HTML 片段缓存
+
+    片段保存在 cache_dir 下，文件名为键的十六进制哈希值。
+    最近使用时间记录在文件的修改时间中，不需要额外的索引文件。
+    """
+
+    def __init__(self, cache_dir, max_bytes, settings=""):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir (str): 缓存目录，不存在时自动创建
+            max_bytes (int): 缓存的最大总大小（字节）
+            settings (str): 渲染设置（如解析器版本和扩展），参与键的计算，设置变化时旧片段不再命中
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.settings = f"{cache_version}|{settings}|".encode('utf-8')
+        self.hits = 0     # 命中次数
+        self.misses = 0   # 未命中次数
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, text):
+        """
+        计算一节 Markdown 的缓存键
+
+        Args:
+            text (str): 章节 Markdown 文本
+
+        Returns:
+            str: 十六进制哈希字符串
+        """
+        digest = hashlib.sha1(self.settings)
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        """获取片段文件路径"""
+        return os.path.join(self.cache_dir, key + fragment_suffix)
+
+    def get(self, key):
+        """
+        读取缓存的片段
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            str: HTML 片段；未命中时为 None
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        """
+        保存片段，先写临时文件再替换，中途失败不会留下不完整的片段
+
+        Args:
+            key (str): 缓存键
+            html (str): HTML 片段
+        """
+        path = self.get_path(key)
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(temp_path, path)
+        except OSError:
+            # 缓存写入失败不影响导出
+            pass
+
+    def evict(self):
+        """
+        按最近使用时间淘汰片段，直到总大小不超过上限
+
+        Returns:
+            int: 删除的片段数
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(fragment_suffix):
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        removed = 0
+        # 最久未使用的在前
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
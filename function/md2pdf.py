@@ -1,33 +1,468 @@
 """PDF 转换模块
 
-该模块提供将 Markdown 文档转换为 PDF 文件的功能，使用 wkhtmltopdf 工具，
+该模块提供将 Markdown 文档转换为 PDF 文件的功能，可使用 wkhtmltopdf 工具或进程内的 Qt 渲染器，
 支持代码高亮、表格渲染等高级格式，生成美观的 PDF 文档。
 功能包括：
-- Markdown 到 HTML 的转换
+- Markdown 按文件章节逐节转换为 HTML，流式写入临时文件
+- 分卷输出的源码合并文档按分卷顺序合并为一个 PDF，跨分卷的链接改为文档内跳转
+- 各节渲染后的 HTML 缓存在磁盘上，再次导出时只转换变化的章节
+- 直接使用源码合并时同步生成的 HTML，跳过 Markdown 解析
 - 自定义 CSS 样式注入
-- 代码块语法高亮
+- 代码块语法高亮（Pygments，多进程并行，词法分析器按语言缓存，公共样式表）
 - 表格和列表格式化
+- 渲染器选择：wkhtmltopdf（外部程序）/ qt（进程内，无需外部程序）/ auto
+- 大型文档按文件章节拆分，多进程并行渲染后合并
+- 增量导出：保留各段 PDF，再次导出时只渲染变化的段
+- 紧凑导出：更紧凑的版式和页边距，可去掉完整路径行和回到目录链接，最后合并重复字体等对象并报告前后大小
 - 支持进度回调和日志输出
 """
 
 import os
-import markdown2
-import pdfkit
+import re
+import shutil
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
+from function import pdfparts, pdfcompact, highlight
+from function.htmlcache import FragmentCache
+from function.SourceCodeBinder import format_size, list_part_paths
 
-def markdown_to_pdf(md_path, pdf_path, wkhtmltopdf_path=None, logger=None, progress_callback=None):
+
+# --- 配置部分 ---
+# 支持的渲染器
+pdf_renderers = ('auto', 'qt', 'wkhtmltopdf')
+
+# 导出配置：standard（原有版式）/ compact（紧凑版式并优化文件体积）
+pdf_profiles = ('standard', 'compact')
+
+# wkhtmltopdf 在 Windows 上的默认安装路径
+default_wkhtmltopdf_path = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
+
+# 注入精美样式，为 PDF 生成优化的 CSS
+pdf_style = """
+                    body {
+                        font-family: 'Segoe UI', Arial, sans-serif;
+                        padding: 40px;
+                        line-height: 1.6;
+                        color: #333;
+                    }
+                    pre {
+                        background: #f6f8fa;
+                        padding: 16px;
+                        border-radius: 6px;
+                        border: 1px solid #ddd;
+                        white-space: pre-wrap;
+                        font-size: 12px;
+                    }
+                    code {
+                        font-family: 'Consolas', 'Courier New', monospace;
+                        color: #000;
+                    }
+                    h2 {
+                        border-bottom: 2px solid #eaecef;
+                        padding-bottom: 5px;
+                        margin-top: 40px;
+                        color: #0366d6;
+                    }
+                    a {
+                        color: #0366d6;
+                        text-decoration: none;
+                    }
+                    ul {
+                        background: #f1f8ff;
+                        padding: 20px 40px;
+                        border-radius: 8px;
+                    }
+"""
+
+# 紧凑导出的样式：去掉正文内边距，缩小行距、代码字号和标题间距，去掉背景色块
+compact_pdf_style = """
+                    body {
+                        font-family: 'Segoe UI', Arial, sans-serif;
+                        line-height: 1.25;
+                        font-size: 12px;
+                        color: #333;
+                    }
+                    pre {
+                        padding: 4px;
+                        border: 1px solid #ddd;
+                        white-space: pre-wrap;
+                        font-size: 10px;
+                        line-height: 1.15;
+                    }
+                    code {
+                        font-family: 'Consolas', 'Courier New', monospace;
+                        color: #000;
+                    }
+                    h2 {
+                        border-bottom: 1px solid #eaecef;
+                        margin-top: 12px;
+                        margin-bottom: 4px;
+                        font-size: 15px;
+                        color: #0366d6;
+                    }
+                    p {
+                        margin-top: 2px;
+                        margin-bottom: 2px;
+                    }
+                    hr {
+                        margin: 4px 0;
+                    }
+                    a {
+                        color: #0366d6;
+                        text-decoration: none;
+                    }
+                    ul {
+                        padding: 0 20px;
+                    }
+"""
+
+# 紧凑导出的页边距（毫米），标准导出使用各渲染器的默认值
+compact_margin_mm = 10
+
+# 源码合并在每个文件章节中写入的完整路径行和回到目录链接
+path_line_prefix = "\n**完整路径**: "
+toc_link_line = "\n[回到目录](#目录)\n"
+
+
+def find_wkhtmltopdf(wkhtmltopdf_path=None):
     """
-    将 Markdown 文件转换为 PDF
+    查找 wkhtmltopdf 可执行文件
+
+    依次检查配置的路径、Windows 默认安装路径和 PATH 环境变量。
 
-    使用 wkhtmltopdf 工具将 Markdown 文件转换为高质量的 PDF 文档，
-    转换过程包括：Markdown 解析 -> HTML 生成 -> CSS 样式注入 -> PDF 生成
+    Args:
+        wkhtmltopdf_path (str): 配置的 wkhtmltopdf 路径（可选）
+
+    Returns:
+        str: 可执行文件路径；未找到时为 None
+    """
+    if wkhtmltopdf_path:
+        return wkhtmltopdf_path if os.path.exists(wkhtmltopdf_path) else None
+    if os.path.exists(default_wkhtmltopdf_path):
+        return default_wkhtmltopdf_path
+    return shutil.which('wkhtmltopdf')
+
+
+def resolve_renderer(renderer, wkhtmltopdf_path=None):
+    """
+    确定实际使用的渲染器
+
+    auto 在找到 wkhtmltopdf 时使用它（与原有输出保持一致），否则使用 Qt 渲染器。
+
+    Args:
+        renderer (str): 配置的渲染器：auto / qt / wkhtmltopdf
+        wkhtmltopdf_path (str): 配置的 wkhtmltopdf 路径（可选）
+
+    Returns:
+        tuple: (渲染器名称, wkhtmltopdf 路径)，wkhtmltopdf 不可用时路径为 None
+    """
+    if renderer == 'qt':
+        return 'qt', None
+    executable = find_wkhtmltopdf(wkhtmltopdf_path)
+    if renderer == 'wkhtmltopdf' or executable:
+        return 'wkhtmltopdf', executable
+    return 'qt', None
+
+
+# HTML 文档的开头和结尾，<body> 单独占一行，便于分段渲染时逐行拆分
+html_head = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<style>{style}</style>
+</head>
+<body>
+"""
+html_tail = "</body>\n</html>\n"
+
+# 源码合并文档中每个文件章节开头的锚点
+section_anchor = '<a name="file-'
+
+# 目录标题。它本身没有锚点，导出时在其前插入同名锚点，"回到目录"等指向 #目录 的链接才能跳转
+toc_heading_pattern = re.compile(r'^## 目录$', re.M)
+toc_anchor = '<a name="目录"></a>\n'
+
+# Markdown 文件小于该大小时在当前进程中转换，进程启动的开销大于并行带来的收益
+parallel_convert_min_bytes = 1024 * 1024
+
+# 每个转换进程最多排队的章节数，限制同时驻留在内存中的章节
+sections_in_flight_per_worker = 4
+
+# HTML 片段缓存目录后缀，缓存保存在 Markdown 文件旁边，如 xxx_source_code.md.htmlcache
+html_cache_suffix = '.htmlcache'
+
+# HTML 片段缓存的默认总大小上限
+html_cache_max_bytes = 256 * 1024 * 1024
+
+# 增量导出保留段 PDF 的目录后缀，如 xxx_source_code.md.pdfparts
+pdf_parts_suffix = '.pdfparts'
+
+
+def iter_markdown_sections(f):
+    """
+    按源码合并写入的文件锚点逐节读取 Markdown
+
+    只在代码块之外的锚点处分节，文件内容中恰好出现的锚点文本不会造成误拆分。
+    第一节是标题和目录。
+
+    Args:
+        f: 以文本方式打开的 Markdown 文件
+
+    Yields:
+        str: 一节 Markdown 文本
+    """
+    section = []
+    fence = None  # 当前所在代码块的围栏（如 ```），不在代码块中时为 None
+    for line in f:
+        stripped = line.strip()
+        if fence is None:
+            if line.startswith(section_anchor) and section:
+                yield ''.join(section)
+                section = []
+            if stripped.startswith('```') or stripped.startswith('~~~'):
+                fence = stripped[:len(stripped) - len(stripped.lstrip(stripped[0]))]
+        elif stripped.startswith(fence) and not stripped.strip(fence[0]):
+            fence = None
+        section.append(line)
+    if section:
+        yield ''.join(section)
+
+
+def get_first_anchor(md_path):
+    """
+    获取源码合并文档中第一个文件章节的锚点
 
     Args:
         md_path (str): Markdown 文件路径
+
+    Returns:
+        str: 如 "#file-srcmainpy"；没有文件章节时为 None
+    """
+    with open(md_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith(section_anchor):
+                return '#' + line[len('<a name="'):].split('"', 1)[0]
+    return None
+
+
+def get_link_rewriter(md_path, part_paths):
+    """
+    获取把指向索引文件和各分卷的链接改为文档内锚点的函数
+
+    各分卷合并到一个 PDF 后，[a.b](xxx_source_code.part002.md#file-a-b) 这样的链接应跳转到同一文档中的锚点；
+    只指向文件的链接跳转到该分卷第一个文件章节的锚点（索引文件为目录）。链接目标前的空格（重复文件链接的占位）一并去掉。
+    不另外为分卷插入锚点：Qt 渲染器会丢弃紧挨着另一个锚点或换行的空锚点。
+
+    Args:
+        md_path (str): Markdown 文件（分卷模式下为索引文件）路径
+        part_paths (list): 各分卷文件路径
+
+    Returns:
+        callable: 接收一节 Markdown 文本，返回改写后的文本
+    """
+    targets = {os.path.basename(md_path): '#目录'}
+    for path in part_paths:
+        targets[os.path.basename(path)] = get_first_anchor(path) or '#目录'
+    pattern = re.compile(r'\]\(\s*(' + '|'.join(map(re.escape, targets)) + r')(#[^)\s]*)?\)')
+
+    def rewrite(section):
+        return pattern.sub(lambda match: f"]({match.group(2) or targets[match.group(1)]})", section)
+
+    return rewrite
+
+
+def iter_document_sections(md_path):
+    """
+    逐节读取要导出的 Markdown 文档
+
+    源码合并按大小拆分为多个分卷时，md_path 是只包含分卷列表和目录的索引文件；
+    此时依次读取索引和各分卷，跳过各分卷自己的标题和目录，合并为一个文档。
+    第一节中的目录标题前插入 #目录 锚点。
+
+    Args:
+        md_path (str): Markdown 文件（分卷模式下为索引文件）路径
+
+    Yields:
+        tuple: (章节文本, 原始章节长度)，章节文本中的跨文件链接已改为文档内锚点
+    """
+    part_paths = list_part_paths(md_path)
+    rewrite = get_link_rewriter(md_path, part_paths)
+    with open(md_path, 'r', encoding='utf-8') as f:
+        for number, section in enumerate(iter_markdown_sections(f)):
+            size = len(section)
+            if number == 0:
+                section = toc_heading_pattern.sub(lambda match: toc_anchor + match.group(), section, count=1)
+            yield rewrite(section), size
+    for part_path in part_paths:
+        with open(part_path, 'r', encoding='utf-8') as f:
+            sections = iter_markdown_sections(f)
+            next(sections, None)
+            for section in sections:
+                yield rewrite(section), len(section)
+
+
+def strip_section(section):
+    """
+    去掉一节 Markdown 中源码合并写入的完整路径行和回到目录链接
+
+    完整路径行只在章节标题之后查找第一处，回到目录链接只在章节末尾查找最后一处，
+    代码中恰好出现的相同文本不受影响。
+
+    Args:
+        section (str): 一节 Markdown 文本
+
+    Returns:
+        str: 处理后的文本
+    """
+    start = section.find(path_line_prefix)
+    if start >= 0:
+        end = section.find('\n', start + 1)
+        if end >= 0:
+            # 连同其后的空行一起去掉
+            end += 1 if section.startswith('\n', end + 1) else 0
+            section = section[:start] + section[end:]
+    start = section.rfind(toc_link_line)
+    if start >= 0:
+        section = section[:start] + section[start + len(toc_link_line) - 1:]
+    return section
+
+
+def markdown_file_to_html(md_path, html_path, progress_callback=None, cache=None,
+                          use_highlight=True, highlight_style='default', workers=1,
+                          compact=False, strip_sections=False):
+    """
+    将 Markdown 文件逐节转换为带样式的 HTML 文件
+
+    逐节读取、转换和写出，内存占用与同时排队的章节成正比，而不是整个文档。
+    分卷输出的源码合并文档按分卷顺序合并为一个 HTML 文件。
+    提供缓存时，内容和设置都未变化的章节直接使用缓存的 HTML，不再解析。
+    文件较大且 workers 大于 1 时，未命中缓存的章节在进程池中并行转换（高亮是主要耗时），
+    输出顺序与原文一致。高亮只输出 CSS 类名，配色由文档头部的公共样式表提供。
+
+    Args:
+        md_path (str): Markdown 文件（分卷模式下为索引文件）路径
+        html_path (str): 输出 HTML 文件路径
+        progress_callback (callable): 进度回调函数，接收0-100的进度值
+        cache (FragmentCache): HTML 片段缓存（可选）
+        use_highlight (bool): 是否高亮代码块（需要 Pygments）
+        highlight_style (str): Pygments 配色方案名称
+        workers (int): 并行转换的进程数
+        compact (bool): 是否使用紧凑版式的样式
+        strip_sections (bool): 是否去掉每个文件章节的完整路径行和回到目录链接
+    """
+    use_highlight = use_highlight and highlight.is_available()
+    style = ((compact_pdf_style if compact else pdf_style)
+             + (highlight.get_stylesheet(highlight_style) if use_highlight else ""))
+    total = max(sum(os.path.getsize(path) for path in [md_path] + list_part_paths(md_path)), 1)
+    done = 0
+    executor = None
+    if workers > 1 and total >= parallel_convert_min_bytes:
+        # 使用 spawn 启动子进程，避免 fork 复制 GUI 进程中 Qt 的线程和状态
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    # 按原文顺序排队的章节：(章节长度, 缓存键, HTML 片段或 Future)
+    pending = deque()
+
+    def write_next():
+        nonlocal done
+        length, key, fragment = pending.popleft()
+        if not isinstance(fragment, str):
+            fragment = fragment.result()
+            if cache is not None:
+                cache.put(key, fragment)
+        out.write(fragment)
+        out.write('\n')
+        if progress_callback:
+            # 按字符数估算进度，多字节字符会使估算偏小，只用于显示
+            done += length
+            progress_callback(min(done * 100 // total, 100))
+
+    try:
+        with open(html_path, 'w', encoding='utf-8') as out:
+            out.write(html_head.format(style=style))
+            for section, length in iter_document_sections(md_path):
+                if strip_sections:
+                    section = strip_section(section)
+                key = cache.get_key(section) if cache is not None else None
+                fragment = cache.get(key) if cache is not None else None
+                if fragment is None:
+                    if executor is not None:
+                        fragment = executor.submit(highlight.convert_section, section, use_highlight)
+                    else:
+                        fragment = highlight.convert_section(section, use_highlight)
+                        if cache is not None:
+                            cache.put(key, fragment)
+                pending.append((length, key, fragment))
+                while len(pending) > (workers * sections_in_flight_per_worker if executor else 0):
+                    write_next()
+            while pending:
+                write_next()
+            out.write(html_tail)
+    finally:
+        if executor is not None:
+            # 出错时取消尚未开始的转换
+            for _, _, fragment in pending:
+                if not isinstance(fragment, str):
+                    fragment.cancel()
+            executor.shutdown()
+
+
+def get_html_cache(md_path, max_bytes=html_cache_max_bytes, use_highlight=True):
+    """
+    获取 Markdown 文件对应的 HTML 片段缓存
+
+    缓存键包含 markdown2、Pygments 的版本、启用的扩展和是否高亮，升级解析器或修改设置后旧片段自动失效。
+    配色方案只影响公共样式表，不参与缓存键。
+
+    Args:
+        md_path (str): Markdown 文件路径
+        max_bytes (int): 缓存的最大总大小（字节），0 表示不使用缓存
+        use_highlight (bool): 是否高亮代码块
+
+    Returns:
+        FragmentCache: 缓存对象；不使用缓存或无法创建缓存目录时为 None
+    """
+    if max_bytes <= 0:
+        return None
+    settings = highlight.get_settings(use_highlight)
+    try:
+        return FragmentCache(md_path + html_cache_suffix, max_bytes, settings)
+    except OSError:
+        return None
+
+
+def markdown_to_pdf(md_path, pdf_path, wkhtmltopdf_path=None, logger=None, progress_callback=None,
+                    renderer='auto', workers=1, cache_bytes=html_cache_max_bytes, incremental=False,
+                    use_highlight=True, highlight_style='default', profile='standard', strip_sections=False):
+    """
+    将 Markdown 文件转换为 PDF
+
+    将 Markdown 文件转换为高质量的 PDF 文档，
+    转换过程包括：Markdown 逐节解析 -> 带样式的 HTML 流式写入临时文件 -> PDF 生成。
+    源码合并按大小拆分为多个分卷时，md_path 为分卷索引，各分卷按顺序合并导出为一个 PDF。
+    如果使用标准版式、不高亮代码块，且同目录下存在源码合并时同步生成、不早于 Markdown 的同名 .html 文件，
+    则直接转换该文件（该文件的代码块没有高亮）。
+    使用 Qt 渲染器时，若 workers 大于 1 或启用增量导出且文档足够大，按文件章节拆分后分段渲染（workers 大于 1 时在进程池中并行），
+    合并时写入连续页码和书签。增量导出时各段 PDF 保存在 Markdown 旁边，再次导出只渲染变化的段。
+    紧凑导出使用更紧凑的样式和页边距，最后合并各段重复嵌入的字体子集等相同对象（安装了 pikepdf 时还会生成对象流），
+    并在日志中报告优化前后的大小。
+
+    Args:
+        md_path (str): Markdown 文件（分卷模式下为索引文件）路径
         pdf_path (str): 输出 PDF 文件路径
         wkhtmltopdf_path (str): wkhtmltopdf 可执行文件路径
         logger (callable): 日志输出函数
         progress_callback (callable): 进度回调函数，接收0-100的进度值
+        renderer (str): 渲染器：auto / qt / wkhtmltopdf
+        workers (int): 并行渲染的进程数，0 表示使用 CPU 核心数，1 表示不拆分
+        cache_bytes (int): HTML 片段缓存的最大总大小（字节），0 表示不使用缓存
+        incremental (bool): 是否保留各段 PDF 供下次导出复用
+        use_highlight (bool): 是否高亮代码块（需要 Pygments）
+        highlight_style (str): Pygments 配色方案名称
+        profile (str): 导出配置：standard / compact
+        strip_sections (bool): 是否去掉每个文件章节的完整路径行和回到目录链接
 
     Returns:
         bool: 是否成功
@@ -42,113 +477,119 @@ def markdown_to_pdf(md_path, pdf_path, wkhtmltopdf_path=None, logger=None, progr
     if not pdf_path:
         pdf_path = md_path.replace(".md", ".pdf")
 
-    # 如果没有指定 wkhtmltopdf 路径，使用默认路径
-    if not wkhtmltopdf_path:
-        wkhtmltopdf_path = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
+    renderer, executable = resolve_renderer(renderer, wkhtmltopdf_path)
 
     # 检查 wkhtmltopdf 是否存在
-    if not os.path.exists(wkhtmltopdf_path):
+    if renderer == 'wkhtmltopdf' and not executable:
         if logger:
-            logger(f"错误：未找到 wkhtmltopdf，路径：{wkhtmltopdf_path}")
+            logger(f"错误：未找到 wkhtmltopdf，路径：{wkhtmltopdf_path or default_wkhtmltopdf_path}")
         return False
 
     if logger:
-        logger(f"正在转换 PDF，请稍候...")
+        logger(f"正在转换 PDF（{renderer}），请稍候...")
+        part_count = len(list_part_paths(md_path))
+        if part_count:
+            logger(f"Markdown 已拆分为 {part_count} 个分卷，按顺序合并导出为一个 PDF")
 
     # 更新进度：初始化
     if progress_callback:
         progress_callback(10)
 
-    # 指定 wkhtmltopdf 的安装路径
-    config = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf_path)
+    workers = pdfparts.get_worker_count(workers)
+    use_highlight = use_highlight and highlight.is_available()
+    compact = profile == 'compact'
+    margin_mm = compact_margin_mm if compact else None
 
     try:
-        # 更新进度：开始读取文件
-        if progress_callback:
-            progress_callback(20)
-
-        with open(md_path, 'r', encoding='utf-8') as f:
-            md_content = f.read()
+        with tempfile.TemporaryDirectory(prefix='jdfoam_pdf_') as work_dir:
+            # 源码合并已直接生成 HTML 时无需再解析 Markdown（该 HTML 使用标准版式且不含高亮）
+            html_path = os.path.splitext(md_path)[0] + '.html'
+            if (not (use_highlight or compact or strip_sections) and os.path.exists(html_path)
+                    and os.path.getmtime(html_path) >= os.path.getmtime(md_path)):
+                if logger:
+                    logger(f"使用已生成的 HTML: {os.path.basename(html_path)}")
+            else:
+                # 逐节解析 Markdown 并写入临时 HTML 文件，占 10%-50% 的进度
+                html_path = os.path.join(work_dir, 'document.html')
+                cache = get_html_cache(md_path, cache_bytes, use_highlight)
+                markdown_file_to_html(md_path, html_path,
+                                      progress_callback=(lambda p: progress_callback(10 + p * 40 // 100))
+                                      if progress_callback else None,
+                                      cache=cache, use_highlight=use_highlight,
+                                      highlight_style=highlight_style, workers=workers,
+                                      compact=compact, strip_sections=strip_sections)
+                if cache is not None:
+                    cache.evict()
+                    if logger:
+                        logger(f"HTML 片段缓存: 复用 {cache.hits} 节，转换 {cache.misses} 节")
 
-            # 更新进度：解析 Markdown
+            # 更新进度：开始转换
             if progress_callback:
-                progress_callback(30)
+                progress_callback(50)
 
-            # 将 Markdown 转换为带有扩展功能的 HTML
-            # 启用代码块、表格和换行符扩展
-            html_body = markdown2.markdown(md_content, extras=["fenced-code-blocks", "tables", "break-on-newline"])
+            split = (workers > 1 or incremental) and os.path.getsize(html_path) >= pdfparts.split_min_bytes
+            if split and not pdfparts.is_available():
+                if logger:
+                    logger("未安装 pypdf，无法合并分段 PDF，使用单进程完整渲染")
+                split = False
+            if split and not pdfparts.keeps_links(renderer):
+                if logger:
+                    logger(f"{renderer} 分段渲染后目录中的跨段链接会失效，使用单进程完整渲染")
+                split = False
 
-            # 更新进度：生成样式
-            if progress_callback:
-                progress_callback(50)
+            # 渲染占 50%-95% 的进度
+            render_progress = (lambda p: progress_callback(50 + p * 45 // 100)) if progress_callback else None
 
-            # 注入精美样式，为 PDF 生成优化的 CSS
-            full_html = f"""
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{
-                        font-family: 'Segoe UI', Arial, sans-serif;
-                        padding: 40px;
-                        line-height: 1.6;
-                        color: #333;
-                    }}
-                    pre {{
-                        background: #f6f8fa;
-                        padding: 16px;
-                        border-radius: 6px;
-                        border: 1px solid #ddd;
-                        white-space: pre-wrap;
-                        font-size: 12px;
-                    }}
-                    code {{
-                        font-family: 'Consolas', 'Courier New', monospace;
-                        color: #000;
-                    }}
-                    h2 {{
-                        border-bottom: 2px solid #eaecef;
-                        padding-bottom: 5px;
-                        margin-top: 40px;
-                        color: #0366d6;
-                    }}
-                    a {{
-                        color: #0366d6;
-                        text-decoration: none;
-                    }}
-                    ul {{
-                        background: #f1f8ff;
-                        padding: 20px 40px;
-                        border-radius: 8px;
-                    }}
-                </style>
-            </head>
-            <body>{html_body}</body>
-            </html>
-            """
+            if split:
+                pages = pdfparts.render_parts(html_path, pdf_path, renderer, executable, workers, work_dir,
+                                              cache_dir=md_path + pdf_parts_suffix if incremental else None,
+                                              logger=logger, progress_callback=render_progress, margin_mm=margin_mm)
+                if logger:
+                    logger(f"共 {pages} 页")
+            elif renderer == 'wkhtmltopdf':
+                import pdfkit
 
-            # 更新进度：开始转换
-            if progress_callback:
-                progress_callback(70)
+                # 指定 wkhtmltopdf 的安装路径，让 wkhtmltopdf 直接读取 HTML 文件，不经过管道
+                options = {}
+                if margin_mm is not None:
+                    for side in ('top', 'bottom', 'left', 'right'):
+                        options[f'margin-{side}'] = f'{margin_mm}mm'
+                config = pdfkit.configuration(wkhtmltopdf=executable)
+                pdfkit.from_file(html_path, pdf_path, configuration=config, options=options)
+            else:
+                from function.qtpdf import html_file_to_pdf, page_margin_mm
 
-            # 使用指定配置执行转换
-            # 将 HTML 内容转换为 PDF 文件
-            pdfkit.from_string(full_html, pdf_path, configuration=config)
+                # 按文件章节分批排版，不把整个 HTML 读入内存
+                pages = html_file_to_pdf(html_path, pdf_path,
+                                         title=os.path.splitext(os.path.basename(md_path))[0],
+                                         progress_callback=render_progress,
+                                         margin_mm=page_margin_mm if margin_mm is None else margin_mm)
+                if logger:
+                    logger(f"共 {pages} 页")
 
-            # 更新进度：转换完成
-            if progress_callback:
-                progress_callback(95)
+        # 更新进度：转换完成
+        if progress_callback:
+            progress_callback(95)
 
-            if logger:
-                logger(f"成功！PDF 已生成在源目录：\n{pdf_path}")
+        if compact:
+            if pdfcompact.is_available():
+                before, after = pdfcompact.compact_pdf(pdf_path)
+                if logger:
+                    logger(f"PDF 体积优化: {format_size(before)} -> {format_size(after)}"
+                           f"（减少 {(before - after) * 100 // max(before, 1)}%）")
+            elif logger:
+                logger("未安装 pypdf 或 pikepdf，跳过 PDF 体积优化")
 
-            # 完成：更新进度到100%
-            if progress_callback:
-                progress_callback(100)
+        if logger:
+            logger(f"成功！PDF 已生成在源目录：\n{pdf_path}")
 
-            return True
+        # 完成：更新进度到100%
+        if progress_callback:
+            progress_callback(100)
+
+        return True
 
     except Exception as e:
         if logger:
             logger(f"PDF 转换失败: {str(e)}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,269 @@
+"""路径过滤模块
+
+该模块将 .gitignore / .ignore 规则、默认排除规则以及 INI 中配置的包含/排除通配符
+编译为一个统一的正则匹配器，供源码扫描在遍历目录时使用，
+被排除的子目录在列出其内容之前就会被剪枝。
+功能包括：
+- gitignore 语法解析（否定、目录限定、锚定、** 通配）
+- 子目录中嵌套的忽略文件按所在目录生效
+- 多组规则按优先级合并为单个正则，一次匹配得到结论
+"""
+
+import os
+import re
+
+
+# --- 配置部分 ---
+# 遍历时自动读取的忽略规则文件
+ignore_file_names = ('.gitignore', '.ignore')
+
+
+def glob_to_regex(pattern):
+    """
+    将 gitignore 风格的通配符转换为正则表达式片段
+
+    * 和 ? 不跨越目录分隔符，** 可匹配任意层级目录，[...] 为字符集合。
+
+    Args:
+        pattern (str): 通配符模式（已去除首尾的 / 和否定前缀）
+
+    Returns:
+        str: 正则表达式片段
+    """
+    regex = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                regex.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                regex.append('.*')
+                i += 2
+                continue
+            regex.append('[^/]*')
+        elif c == '?':
+            regex.append('[^/]')
+        elif c == '[':
+            j = i + 1
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                regex.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace('\\', '\\\\')
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                regex.append(f'[{body}]')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return ''.join(regex)
+
+
+def compile_rule(line, base=''):
+    """
+    将一行 gitignore 规则编译为 (正则字符串, 是否否定) 元组
+
+    Args:
+        line (str): 规则文本
+        base (str): 规则文件所在目录相对于扫描根目录的路径（使用 / 分隔，根目录为空字符串）
+
+    Returns:
+        tuple: (regex, negate)；空行和注释返回 None
+    """
+    line = line.rstrip('\r\n')
+    # 去除未转义的行尾空格
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+    if not line or line.startswith('#'):
+        return None
+
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # 包含 / 的模式相对于规则文件所在目录锚定，否则匹配任意层级的名称
+    anchored = '/' in line
+    line = line.lstrip('/')
+    prefix = re.escape(base + '/') if base else ''
+    body = glob_to_regex(line)
+    if not anchored:
+        body = '(?:.*/)?' + body
+    # 被匹配的路径带有类型前缀：目录为 D，文件为 F
+    regex = ('D' if dir_only else '[DF]') + prefix + body + '$'
+    return regex, negate
+
+
+class PathMatcher:
+    """路径匹配器
+
+    按优先级从低到高维护三组规则：默认规则、忽略文件中的规则、INI 配置的覆盖规则，
+    与 git 一致，后出现的规则优先。所有规则被编译进一个正则表达式，
+    每条路径只需匹配一次即可得到结论。
+    """
+
+    def __init__(self, case_sensitive=None):
+        """
+        初始化路径匹配器
+
+        Args:
+            case_sensitive (bool): 是否区分大小写，默认在 Windows 上不区分
+        """
+        if case_sensitive is None:
+            case_sensitive = os.name != 'nt'
+        self.flags = 0 if case_sensitive else re.IGNORECASE
+        self.default_rules = []    # 默认排除规则（排除目录、.bat 等）
+        self.file_rules = []       # 从 .gitignore / .ignore 读取的规则
+        self.override_rules = []   # INI 配置的排除与包含规则
+        self._rules = []
+        self._regex = None
+
+    def add_default_rule(self, line, base=''):
+        """添加一条默认规则"""
+        self._add(self.default_rules, line, base)
+
+    def add_default_regex(self, regex, dir_only=False, negate=False, base=''):
+        """
+        添加一条以正则表达式描述的默认规则，用于通配符无法准确表达的名称（如数值时间目录）
+
+        Args:
+            regex (str): 匹配相对路径（去掉 base 前缀后）的正则表达式
+            dir_only (bool): 是否只匹配目录
+            negate (bool): 是否为否定（包含）规则
+            base (str): 规则生效的目录
+        """
+        prefix = re.escape(base + '/') if base else ''
+        self.default_rules.append((('D' if dir_only else '[DF]') + prefix + f'(?:{regex})$', negate))
+        self._regex = None
+
+    def add_override_rule(self, line, base=''):
+        """添加一条覆盖规则（优先级最高）"""
+        self._add(self.override_rules, line, base)
+
+    def _add(self, group, line, base):
+        rule = compile_rule(line, base)
+        if rule:
+            group.append(rule)
+            self._regex = None
+
+    def load_ignore_files(self, dir_path, base=''):
+        """
+        读取目录下的 .gitignore / .ignore 文件并加入规则
+
+        Args:
+            dir_path (str): 目录的完整路径
+            base (str): 目录相对于扫描根目录的路径
+
+        Returns:
+            int: 新增的规则数量
+        """
+        count = 0
+        for name in ignore_file_names:
+            path = os.path.join(dir_path, name)
+            if not os.path.isfile(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    count += self.add_ignore_lines(f, base)
+            except OSError:
+                continue
+        return count
+
+    def add_ignore_lines(self, lines, base=''):
+        """
+        添加忽略文件中的规则行（用于归档等不在磁盘上的忽略文件）
+
+        Args:
+            lines (iterable): 规则文本行
+            base (str): 忽略文件所在目录相对于扫描根目录的路径
+
+        Returns:
+            int: 新增的规则数量
+        """
+        count = 0
+        for line in lines:
+            rule = compile_rule(line, base)
+            if rule:
+                self.file_rules.append(rule)
+                count += 1
+        if count:
+            self._regex = None
+        return count
+
+    def compile(self):
+        """将所有规则编译为单个正则表达式
+
+        规则按优先级倒序排列为分支，正则从左到右尝试分支，
+        因此第一个命中的分支就是 gitignore 语义下最后一条匹配的规则。
+        """
+        self._rules = self.default_rules + self.file_rules + self.override_rules
+        if not self._rules:
+            self._regex = re.compile(r'(?!)')
+            return
+        branches = [f'(?P<r{i}>{regex})' for i, (regex, _) in reversed(list(enumerate(self._rules)))]
+        self._regex = re.compile('|'.join(branches), self.flags)
+
+    def match(self, rel_path, is_dir=False):
+        """
+        匹配一条路径
+
+        Args:
+            rel_path (str): 相对于扫描根目录的路径（使用 / 分隔）
+            is_dir (bool): 路径是否为目录
+
+        Returns:
+            bool: True 表示排除，False 表示被否定规则显式包含，None 表示没有规则命中
+        """
+        if self._regex is None:
+            self.compile()
+        m = self._regex.match(('D' if is_dir else 'F') + rel_path)
+        if not m:
+            return None
+        _, negate = self._rules[int(m.lastgroup[1:])]
+        return not negate
+
+    def is_excluded(self, rel_path, is_dir=False):
+        """
+        判断路径是否被排除
+
+        Args:
+            rel_path (str): 相对于扫描根目录的路径（使用 / 分隔）
+            is_dir (bool): 路径是否为目录
+
+        Returns:
+            bool: 是否被排除
+        """
+        return self.match(rel_path, is_dir) is True
+
+
+def split_globs(value):
+    """
+    将 INI 中以分号分隔的通配符字符串拆分为列表
+
+    Args:
+        value (str): 配置值，如 "*.log; build/; !keep.txt"
+
+    Returns:
+        list: 通配符列表
+    """
+    if not value:
+        return []
+    return [item.strip() for item in value.split(';') if item.strip()]
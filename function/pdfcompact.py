@@ -0,0 +1,96 @@
+"""PDF 体积优化模块
+
+紧凑导出的最后一步，在不改变页面内容的前提下缩小已生成的 PDF。
+分段渲染的各段各自嵌入一份字体子集，合并后同一字体会重复出现几十次，这是大型源码 PDF 体积的主要来源之一。
+功能包括：
+- 合并内容完全相同的对象（重复的字体子集、ToUnicode 表、图片等），删除不再被引用的对象
+- 重新压缩未压缩的页面内容流
+- 安装了 pikepdf 时把普通对象打包进压缩的对象流（PDF 1.5），进一步缩小交叉引用和对象字典的体积
+- 返回优化前后的文件大小，由调用方写入日志
+
+pypdf 和 pikepdf 都是可选依赖：都未安装时不做任何处理；只安装 pypdf 时不生成对象流。
+"""
+
+import os
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+
+def is_available():
+    """
+    判断是否可以优化 PDF 体积
+
+    Returns:
+        bool: 是否已安装 pypdf 或 pikepdf
+    """
+    return pypdf is not None or pikepdf is not None
+
+
+def dedup_objects(pdf_path, temp_path):
+    """
+    使用 pypdf 合并相同对象并重新压缩内容流
+
+    Args:
+        pdf_path (str): 输入 PDF 文件路径
+        temp_path (str): 输出 PDF 文件路径
+    """
+    writer = pypdf.PdfWriter(clone_from=pdf_path)
+    for page in writer.pages:
+        page.compress_content_streams()
+    # pypdf 4.3 起提供，两个参数的默认值即为合并相同对象和删除无引用对象
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects()
+    with open(temp_path, 'wb') as f:
+        writer.write(f)
+
+
+def pack_object_streams(pdf_path, temp_path):
+    """
+    使用 pikepdf 把对象打包进压缩的对象流
+
+    Args:
+        pdf_path (str): 输入 PDF 文件路径
+        temp_path (str): 输出 PDF 文件路径
+    """
+    with pikepdf.open(pdf_path) as pdf:
+        pdf.remove_unreferenced_resources()
+        pdf.save(temp_path, compress_streams=True,
+                 object_stream_mode=pikepdf.ObjectStreamMode.generate)
+
+
+def compact_pdf(pdf_path):
+    """
+    优化 PDF 文件体积，结果原地替换输入文件
+
+    每一步都先写临时文件再替换，中途失败时保留上一步的结果；某一步没有使文件变小时丢弃它的结果。
+
+    Args:
+        pdf_path (str): PDF 文件路径
+
+    Returns:
+        tuple: (优化前字节数, 优化后字节数)
+    """
+    before = os.path.getsize(pdf_path)
+    temp_path = pdf_path + '.tmp'
+    steps = []
+    if pypdf is not None:
+        steps.append(dedup_objects)
+    if pikepdf is not None:
+        steps.append(pack_object_streams)
+    try:
+        for step in steps:
+            step(pdf_path, temp_path)
+            if os.path.getsize(temp_path) < os.path.getsize(pdf_path):
+                os.replace(temp_path, pdf_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return before, os.path.getsize(pdf_path)
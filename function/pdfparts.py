@@ -0,0 +1,554 @@
+"""PDF 分段渲染模块
+
+大型源码文档整体交给 wkhtmltopdf 渲染需要数分钟和数 GB 内存，修改一个文件后也要全部重新渲染。
+该模块在文件章节边界处拆分 HTML，在进程池中并行渲染各段，再合并为一个 PDF；
+各段的 PDF 按内容哈希保留下来，再次导出时只渲染发生变化的段。
+功能包括：
+- 在文件章节锚点处流式拆分 HTML 文件，分段边界由章节路径决定，修改文件内容不会移动其他段的边界
+- 在进程池（spawn 方式启动，与 GUI 进程互不影响）中并行渲染各段
+- 按"渲染器 + 段 HTML"的哈希值保留各段 PDF，增量导出时复用未变化的段
+- Qt 渲染器的段 HTML 不含文件章节的编号，编号在合并时写入书签并标注在标题旁，增删文件不会使后续各段失效
+- 合并各段 PDF，写入连续页码和书签（wkhtmltopdf 的书签从各段导入，Qt 渲染器的书签按标题所在页生成）
+
+合并使用可选依赖 pypdf，未安装时调用方应退回单进程渲染。
+各段的命名目标（章节锚点）和链接注释在合并后统一复制，目录、回到目录等跨段的页内链接仍然有效；
+wkhtmltopdf 只为本段内存在的锚点生成链接，跨段链接无法恢复，调用方只应对 Qt 渲染器分段（见 keeps_links）。
+"""
+
+import os
+import re
+import json
+import zlib
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+
+# --- 配置部分 ---
+# HTML 小于该大小时不拆分，进程启动和合并的开销大于分段带来的收益
+split_min_bytes = 2 * 1024 * 1024
+
+# 平均每段包含的文件章节数。章节路径的哈希值能被它整除时在该章节前分段，
+# 这样分段边界只取决于路径，修改某个文件只会使它所在的段失效
+sections_per_part = 8
+
+# 单段的最大大小，超过后在下一个章节前强制分段，避免少数大文件集中在同一段中
+part_max_bytes = 1024 * 1024
+
+# 增量导出保留的段 PDF 清单文件名
+part_manifest_name = 'parts.json'
+
+# 段清单格式版本，段的渲染方式变化时递增
+part_manifest_version = 2
+
+# 页码的字号（磅）和到页面底边的距离（磅）
+page_number_font_size = 9
+page_number_margin = 20
+
+# 文件章节标题中的编号，如 <h2>12. src/main.py</h2>。增删文件会改变后续所有章节的编号，
+# 因此 Qt 渲染器分段时编号不写入段 HTML（不计入段哈希），合并时再写入书签并标注在标题左侧的页边距中
+heading_number_pattern = re.compile(r'^(<h2[^>]*>)(\d+)\. ')
+
+# 标题编号的字号（磅）和到正文左边缘的距离（磅）
+heading_number_font_size = 9
+heading_number_gap = 4
+
+# 文件章节的开始位置：源码合并生成的 HTML 使用 <section id="file-...">，
+# 由 Markdown 转换的 HTML 使用 <a name="file-...">（markdown2 会包在 <p> 中）
+section_pattern = re.compile(r'^(?:<section id="file-|<p><a name="file-|<a name="file-)', re.M)
+body_pattern = re.compile(r'<body[^>]*>', re.I)
+
+
+def is_available():
+    """
+    判断是否可以分段渲染
+
+    Returns:
+        bool: 是否已安装 pypdf
+    """
+    return pypdf is not None
+
+
+def keeps_links(renderer):
+    """
+    判断渲染器分段渲染后能否保留跨段的页内链接
+
+    Qt 渲染器为每个 href="#..." 都写入指向命名目标的链接注释，目标在其他段中时合并后仍可解析；
+    wkhtmltopdf 会丢弃目标不在本段中的链接。
+
+    Args:
+        renderer (str): 渲染器：qt / wkhtmltopdf
+
+    Returns:
+        bool: 是否保留链接
+    """
+    return renderer == 'qt'
+
+
+def get_worker_count(workers):
+    """
+    获取实际使用的进程数
+
+    Args:
+        workers (int): 配置的进程数，0 表示使用 CPU 核心数
+
+    Returns:
+        int: 进程数
+    """
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def is_part_boundary(line, part_size):
+    """
+    判断是否在某个章节开始处分段
+
+    Args:
+        line (str): 章节的第一行（包含文件锚点）
+        part_size (int): 当前段已写入的大小
+
+    Returns:
+        bool: 是否开始新的一段
+    """
+    if part_size >= part_max_bytes:
+        return True
+    return zlib.crc32(line.encode('utf-8')) % sections_per_part == 0
+
+
+class PartWriter:
+    """段 HTML 写入器
+
+    写入段文件的同时计算内容哈希，关闭时补上 </body></html>。
+    """
+
+    def __init__(self, path, prefix, salt):
+        """
+        创建段文件并写入公共的 <head> 部分
+
+        Args:
+            path (str): 段 HTML 文件路径
+            prefix (list): 原文档 <body> 之前（含 <body>）的各行
+            salt (str): 参与哈希计算的附加内容
+        """
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+        self.digest = hashlib.sha1(salt.encode('utf-8'))
+        self.numbers = []  # 各二级标题去掉的章节编号，不计入哈希
+        for text in prefix:
+            self.write(text)
+
+    def write(self, text):
+        """写入文本并更新哈希"""
+        self.file.write(text)
+        self.digest.update(text.encode('utf-8'))
+
+    def close(self):
+        """
+        结束并关闭段文件
+
+        Returns:
+            tuple: (段 HTML 路径, 段哈希, 各二级标题去掉的章节编号列表)
+        """
+        self.write('</body>\n</html>\n')
+        self.file.close()
+        return self.path, self.digest.hexdigest(), self.numbers
+
+
+def read_html_head(f):
+    """
+    读取 HTML 文件中 <body> 之前（含 <body>）的部分
+
+    Args:
+        f: 以文本方式打开的 HTML 文件
+
+    Returns:
+        tuple: (<body> 之前的各行（含 <body>）, <body> 之后的第一行；已到文件末尾时为空字符串)
+    """
+    prefix = []
+    for line in f:
+        match = body_pattern.search(line)
+        if match:
+            prefix.append(line[:match.end()] + '\n')
+            return prefix, line[match.end():] or f.readline()
+        prefix.append(line)
+    return prefix, ''
+
+
+def iter_html_chunks(html_path, max_bytes):
+    """
+    在文件章节边界处把 HTML 文件依次拆成若干完整的 HTML 文档
+
+    每个文档共用原文档的 <head>，大小超过 max_bytes 后在下一个章节前开始新的文档，
+    内存占用只与 max_bytes 和单个章节的大小有关。
+
+    Args:
+        html_path (str): HTML 文件路径
+        max_bytes (int): 单个文档的目标大小
+
+    Yields:
+        tuple: (HTML 文本, 已读取的比例 0-100)
+    """
+    total = max(os.path.getsize(html_path), 1)
+    with open(html_path, 'r', encoding='utf-8') as f:
+        prefix, line = read_html_head(f)
+        head = ''.join(prefix)
+        read = len(head)
+        chunk = []
+        size = 0
+        while line:
+            end = line.lower().find('</body>')
+            if end >= 0:
+                chunk.append(line[:end])
+                break
+            if size >= max_bytes and section_pattern.match(line):
+                yield head + ''.join(chunk) + '</body>\n</html>\n', min(read * 100 // total, 99)
+                chunk = []
+                size = 0
+            chunk.append(line)
+            size += len(line)
+            read += len(line)
+            line = f.readline()
+    yield head + ''.join(chunk) + '</body>\n</html>\n', 100
+
+
+def split_html_file(html_path, work_dir, salt="", strip_numbers=False):
+    """
+    在文件章节边界处将 HTML 文件拆分为若干段
+
+    逐行读取并直接写出各段，内存占用只与单个章节的大小有关。
+    每段都是完整的 HTML 文档（共用原文档的 <head>），章节之前的标题和目录单独作为第一段。
+
+    Args:
+        html_path (str): HTML 文件路径
+        work_dir (str): 写出各段的目录
+        salt (str): 参与段哈希计算的附加内容（如渲染器名称）
+        strip_numbers (bool): 是否去掉文件章节标题中的编号，各二级标题的编号（无编号时为 None）按顺序记录在结果中
+
+    Returns:
+        list: [(段 HTML 路径, 段哈希, 各二级标题去掉的章节编号列表), ...]
+    """
+    parts = []
+    part_size = 0
+    in_sections = False  # 是否已经过了标题和目录
+
+    def open_part():
+        return PartWriter(os.path.join(work_dir, f'part{len(parts):03d}.html'), prefix, salt)
+
+    with open(html_path, 'r', encoding='utf-8') as f:
+        # <head> 和 <body> 标签，每段都需要
+        prefix, line = read_html_head(f)
+        out = open_part()
+        try:
+            while line:
+                end = line.lower().find('</body>')
+                if end >= 0:
+                    out.write(line[:end])
+                    break
+                if section_pattern.match(line):
+                    # 标题和目录（含生成时间，每次都会变化）单独成段，不拖累后面的章节
+                    if part_size and (not in_sections or is_part_boundary(line, part_size)):
+                        parts.append(out.close())
+                        out = open_part()
+                        part_size = 0
+                    in_sections = True
+                if strip_numbers and line.startswith('<h2'):
+                    # 每个二级标题记录一项，目录等不带编号的标题记为 None，合并时按顺序与书签对应
+                    match = heading_number_pattern.match(line) if in_sections else None
+                    out.numbers.append(int(match.group(2)) if match else None)
+                    if match:
+                        line = match.group(1) + line[match.end():]
+                out.write(line)
+                part_size += len(line)
+                line = f.readline()
+        finally:
+            parts.append(out.close())
+    return parts
+
+
+def load_part_manifest(cache_dir):
+    """
+    读取上次导出保留的段清单
+
+    Args:
+        cache_dir (str): 段 PDF 保存目录
+
+    Returns:
+        dict: {段哈希: {"outline": [...]}}；清单不存在或版本不符时为空字典
+    """
+    try:
+        with open(os.path.join(cache_dir, part_manifest_name), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != part_manifest_version:
+        return {}
+    return manifest.get('parts', {})
+
+
+def save_part_manifest(cache_dir, parts):
+    """
+    保存段清单，并删除清单之外的段 PDF
+
+    Args:
+        cache_dir (str): 段 PDF 保存目录
+        parts (dict): {段哈希: {"outline": [...]}}
+    """
+    with open(os.path.join(cache_dir, part_manifest_name), 'w', encoding='utf-8') as f:
+        json.dump({'version': part_manifest_version, 'parts': parts}, f, ensure_ascii=False)
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pdf') and name[:-4] not in parts:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def render_part(renderer, executable, html_path, pdf_path, margin_mm=None):
+    """
+    渲染一段 HTML（在子进程中执行）
+
+    Args:
+        renderer (str): 渲染器：qt / wkhtmltopdf
+        executable (str): wkhtmltopdf 可执行文件路径（仅 wkhtmltopdf）
+        html_path (str): 该段 HTML 文件路径
+        pdf_path (str): 该段 PDF 输出路径
+        margin_mm (float): 页边距（毫米），为 None 时使用渲染器的默认值
+
+    Returns:
+        list: Qt 渲染器收集的 (级别, 标题, 页码, 基线位置) 列表；wkhtmltopdf 为空列表（书签在 PDF 中）
+    """
+    outline = []
+    # 先写入临时文件，渲染中断时不会留下被误认为可复用的段 PDF
+    temp_path = pdf_path + '.tmp'
+    if renderer == 'wkhtmltopdf':
+        import pdfkit
+
+        options = {'quiet': ''}
+        if margin_mm is not None:
+            for side in ('top', 'bottom', 'left', 'right'):
+                options[f'margin-{side}'] = f'{margin_mm}mm'
+        config = pdfkit.configuration(wkhtmltopdf=executable)
+        pdfkit.from_file(html_path, temp_path, configuration=config, options=options)
+    else:
+        from function.qtpdf import html_file_to_pdf, page_margin_mm
+
+        html_file_to_pdf(html_path, temp_path, outline=outline,
+                         margin_mm=page_margin_mm if margin_mm is None else margin_mm)
+    os.replace(temp_path, pdf_path)
+    return outline
+
+
+def get_text_width(text, font_size):
+    """
+    估算页码、编号等文本在 Helvetica 中的宽度
+
+    Helvetica 数字宽度为 0.556 em，空格、斜杠和句点为 0.278 em。
+
+    Args:
+        text (str): 只含数字、空格、斜杠和句点的文本
+        font_size (float): 字号（磅）
+
+    Returns:
+        float: 宽度（磅）
+    """
+    return sum(0.278 if c in ' /.' else 0.556 for c in text) * font_size
+
+
+def add_page_numbers(writer, labels=None, label_right=0):
+    """
+    在每页底部居中写入 "页码 / 总页数"，并在标题左侧写入章节编号
+
+    使用 PDF 标准字体 Helvetica 直接写入内容流，不需要其他字体或绘图库。
+
+    Args:
+        writer (pypdf.PdfWriter): 已合并的 PDF
+        labels (dict): 章节编号 {页号: [(基线到页面上边缘的距离, 编号文本), ...]}（可选）
+        label_right (float): 编号右端到页面左边缘的距离（磅）
+    """
+    from pypdf.generic import DictionaryObject, NameObject, StreamObject
+
+    font = DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    })
+    labels = labels or {}
+    total = len(writer.pages)
+    for index, page in enumerate(writer.pages):
+        box = page.mediabox
+        text = f"{index + 1} / {total}"
+        x = float(box.left) + (float(box.width) - get_text_width(text, page_number_font_size)) / 2
+        y = float(box.bottom) + page_number_margin
+        commands = [f"BT /JDPageNo {page_number_font_size} Tf 0.4 g {x:.2f} {y:.2f} Td ({text}) Tj ET"]
+        for top, label in labels.get(index, ()):
+            x = float(box.left) + label_right - get_text_width(label, heading_number_font_size)
+            y = float(box.top) - top
+            commands.append(f"BT /JDPageNo {heading_number_font_size} Tf 0.4 g {x:.2f} {y:.2f} Td ({label}) Tj ET")
+        stamp = pypdf.PageObject.create_blank_page(width=box.width, height=box.height)
+        stream = StreamObject()
+        stream.set_data('\n'.join(commands).encode('ascii'))
+        stamp[NameObject('/Contents')] = stream
+        stamp[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/JDPageNo'): font}),
+        })
+        page.merge_page(stamp)
+        # merge_page 会把原内容流解压后重写，需要重新压缩，否则文件会膨胀十几倍
+        page.compress_content_streams()
+
+
+def copy_links(writer, reader, offset):
+    """
+    将一段 PDF 中的链接注释复制到合并后的对应页
+
+    pypdf 合并时会丢弃指向尚未合并的命名目标的链接（如目录指向后面各段的章节），
+    因此合并时不导入注释，在全部段合并、命名目标齐全后再统一复制；显式目标中的页换成合并后的页。
+
+    Args:
+        writer (pypdf.PdfWriter): 合并后的 PDF
+        reader (pypdf.PdfReader): 段 PDF
+        offset (int): 该段第一页在合并后 PDF 中的页号
+    """
+    from pypdf.generic import ArrayObject, NameObject
+
+    page_numbers = {page.indirect_reference.idnum: number for number, page in enumerate(reader.pages)}
+
+    def remap(dest):
+        # 命名目标保持不变，显式目标 [页, 位置...] 的页换成合并后的页；目标页不在本段时返回 None
+        if not isinstance(dest, ArrayObject):
+            return dest
+        number = page_numbers.get(getattr(dest[0], 'idnum', None)) if dest else None
+        if number is None:
+            return None
+        return ArrayObject([writer.pages[offset + number].indirect_reference, *dest[1:]])
+
+    for number, page in enumerate(reader.pages):
+        target = writer.pages[offset + number]
+        for annot in page.get('/Annots') or ():
+            annot = annot.get_object()
+            if annot.get('/Subtype') != '/Link':
+                continue
+            link = annot.clone(writer, ignore_fields=('/P', '/Dest', '/A'))
+            if '/Dest' in annot:
+                dest = remap(annot['/Dest'])
+                if dest is None:
+                    continue
+                link[NameObject('/Dest')] = dest
+            if '/A' in annot:
+                action = annot['/A'].get_object()
+                link[NameObject('/A')] = action.clone(writer, ignore_fields=('/D', '/Next'))
+                if '/D' in action:
+                    dest = remap(action['/D'])
+                    if dest is None:
+                        continue
+                    link['/A'][NameObject('/D')] = dest
+            link[NameObject('/P')] = target.indirect_reference
+            if '/Annots' not in target:
+                target[NameObject('/Annots')] = ArrayObject()
+            target['/Annots'].append(link.indirect_reference or writer._add_object(link))
+
+
+def render_parts(html_path, pdf_path, renderer, executable, workers, work_dir, cache_dir=None,
+                 logger=None, progress_callback=None, margin_mm=None):
+    """
+    分段渲染 HTML 文件并合并为一个 PDF
+
+    指定 cache_dir 时各段 PDF 保存在该目录中，下次导出时哈希相同的段直接复用，
+    只渲染发生变化的段，再重新合并并刷新页码和书签。
+
+    Args:
+        html_path (str): HTML 文件路径
+        pdf_path (str): 输出 PDF 文件路径
+        renderer (str): 渲染器：qt / wkhtmltopdf
+        executable (str): wkhtmltopdf 可执行文件路径（仅 wkhtmltopdf）
+        workers (int): 进程数，1 表示在当前进程中依次渲染
+        work_dir (str): 存放各段 HTML（以及不保留时的段 PDF）的临时目录
+        cache_dir (str): 保留段 PDF 的目录（可选），为 None 时不复用
+        logger (callable): 日志输出函数
+        progress_callback (callable): 进度回调函数，接收0-100的进度值
+        margin_mm (float): 页边距（毫米），为 None 时使用渲染器的默认值
+
+    Returns:
+        int: 合并后的总页数
+    """
+    # 渲染器和页边距都会改变段 PDF，计入段哈希
+    salt = renderer if margin_mm is None else f"{renderer}|{margin_mm}mm"
+    # 只有 Qt 渲染器报告标题位置，能在合并时补上章节编号
+    numbered = renderer == 'qt'
+    parts = split_html_file(html_path, work_dir, salt=salt, strip_numbers=numbered)
+    store_dir = cache_dir or work_dir
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    old_parts = load_part_manifest(cache_dir) if cache_dir else {}
+
+    # 需要渲染的段：{段哈希: 段 HTML 路径}，内容相同的段只渲染一次
+    outlines = {}
+    todo = {}
+    for part_html, key, numbers in parts:
+        if key in old_parts and os.path.exists(os.path.join(store_dir, key + '.pdf')):
+            outlines[key] = old_parts[key]['outline']
+        else:
+            todo.setdefault(key, part_html)
+    if logger:
+        logger(f"共 {len(parts)} 段：复用 {len(parts) - len(todo)} 段，渲染 {len(todo)} 段"
+               + (f"（{min(workers, len(todo))} 个进程）" if len(todo) > 1 and workers > 1 else ""))
+
+    jobs = [(key, part_html, os.path.join(store_dir, key + '.pdf')) for key, part_html in todo.items()]
+    if len(jobs) > 1 and workers > 1:
+        # 使用 spawn 启动子进程，避免 fork 复制 GUI 进程中 Qt 的线程和状态
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as executor:
+            futures = {executor.submit(render_part, renderer, executable, part_html, part_pdf, margin_mm): key
+                       for key, part_html, part_pdf in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                outlines[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(done * 100 // len(jobs))
+    else:
+        for done, (key, part_html, part_pdf) in enumerate(jobs, 1):
+            outlines[key] = render_part(renderer, executable, part_html, part_pdf, margin_mm)
+            if progress_callback:
+                progress_callback(done * 100 // len(jobs))
+
+    # 合并各段，页码偏移按前面各段的页数累加；链接注释在全部段合并后再复制
+    writer = pypdf.PdfWriter()
+    readers = []
+    labels = {}  # 章节编号 {合并后的页号: [(基线位置, 编号文本), ...]}
+    parent = None  # 一级标题（文档标题）只在第一段中，后续各段的章节都挂在它下面
+    for part_html, key, numbers in parts:
+        offset = len(writer.pages)
+        reader = pypdf.PdfReader(os.path.join(store_dir, key + '.pdf'))
+        writer.append(reader, import_outline=(renderer == 'wkhtmltopdf'), excluded_fields=('/Annots',))
+        readers.append((reader, offset))
+        # 记录的编号按顺序对应本段的二级标题书签；数量不一致时不补编号
+        if sum(1 for item in outlines[key] if item[0] == 2) != len(numbers):
+            numbers = ()
+        numbers = iter(numbers)
+        for level, text, page, top in outlines[key]:
+            if level == 1:
+                parent = writer.add_outline_item(text, offset + page)
+                continue
+            number = next(numbers, None)
+            if number is not None:
+                text = f"{number}. {text}"
+                labels.setdefault(offset + page, []).append((top, f"{number}."))
+            writer.add_outline_item(text, offset + page, parent=parent)
+    for reader, offset in readers:
+        copy_links(writer, reader, offset)
+    label_right = 0
+    if labels:
+        from function.qtpdf import page_margin_mm
+
+        # 编号右对齐到正文左边缘之前
+        label_right = (page_margin_mm if margin_mm is None else margin_mm) * 72 / 25.4 - heading_number_gap
+    add_page_numbers(writer, labels, label_right)
+    writer.page_mode = '/UseOutlines'
+    with open(pdf_path, 'wb') as f:
+        writer.write(f)
+
+    if cache_dir:
+        save_part_manifest(cache_dir, {key: {'outline': outlines[key]} for _, key, _ in parts})
+    return len(writer.pages)
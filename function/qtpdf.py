@@ -0,0 +1,178 @@
+"""Qt PDF 渲染模块
+
+该模块在当前进程内使用 Qt 的文本排版引擎将 HTML 渲染为 PDF，
+不需要 wkhtmltopdf 等外部可执行文件。
+功能包括：
+- 在没有 GUI 应用的环境中自动创建 QGuiApplication（Linux 无显示时使用 offscreen 平台）
+- 使用 QTextDocument 排版 HTML，按页写入 QPdfWriter
+- 大型 HTML 文件在文件章节边界处分批排版，每批使用一个 QTextDocument，内存占用与文档总大小无关
+- 按页报告进度
+- 收集一、二级标题所在的页码和位置，用于生成书签和在合并时标注章节编号
+
+QTextDocument 只支持 CSS 的一个子集（不支持圆角、阴影等），代码块、表格、标题和链接都可以正常渲染。
+PySide6 在函数内部导入，只导入本模块不会加载 Qt。
+"""
+
+import os
+import sys
+import atexit
+
+
+# --- 配置部分 ---
+# 页边距（毫米）
+page_margin_mm = 15
+
+# 从文件渲染时每个 QTextDocument 排版的 HTML 大小，超过后在下一个文件章节处换用新的文档（从新的一页开始）。
+# QTextDocument 的内存占用约为 HTML 大小的近百倍，整个文档一次排版时大型源码文档需要数 GB 内存
+document_max_bytes = 1024 * 1024
+
+# PDF 的逻辑分辨率（DPI）。QTextDocument 把 CSS 的 px 当作设备像素，
+# 使用 96 DPI 才能让 px 与浏览器（wkhtmltopdf）中的尺寸一致；文字和矢量图形不受影响
+pdf_resolution = 96
+
+
+def ensure_gui_application():
+    """
+    确保存在 QGuiApplication 实例
+
+    QTextDocument 的排版依赖字体数据库，必须先创建 QGuiApplication。
+    GUI 中已存在应用实例时直接使用；命令行或子进程中在 Linux 没有显示服务器时使用 offscreen 平台。
+
+    Returns:
+        QGuiApplication: 当前应用实例
+    """
+    from PySide6.QtGui import QGuiApplication
+
+    app = QGuiApplication.instance()
+    if app is None:
+        if sys.platform.startswith('linux') and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app = QGuiApplication([sys.argv[0] if sys.argv else 'JDFOAM'])
+        # 解释器退出时先销毁应用实例，否则 Qt 对象在垃圾回收阶段析构会导致进程崩溃
+        atexit.register(app.shutdown)
+    return app
+
+
+def html_to_pdf(html, pdf_path, title="", progress_callback=None, outline=None, margin_mm=page_margin_mm):
+    """
+    将 HTML 渲染为 PDF
+
+    Args:
+        html (str): 完整的 HTML 文本
+        pdf_path (str): 输出 PDF 文件路径
+        title (str): PDF 文档标题
+        progress_callback (callable): 进度回调函数，接收0-100的进度值
+        outline (list): 可选，用于接收标题和所在页的列表，追加 (级别, 标题, 页码, 基线位置) 元组，
+            页码从 0 开始，基线位置为标题第一行的基线到页面上边缘的距离（磅）
+        margin_mm (float): 页边距（毫米）
+
+    Returns:
+        int: 生成的页数
+    """
+    return render_documents([(html, 100)], pdf_path, title, progress_callback, outline, margin_mm)
+
+
+def html_file_to_pdf(html_path, pdf_path, title="", progress_callback=None, outline=None, margin_mm=page_margin_mm):
+    """
+    将 HTML 文件渲染为 PDF
+
+    在文件章节边界处分批读取和排版，每批不超过 document_max_bytes（单个章节更大时除外），
+    排版完一批即写出并释放，不会把整个文档读入内存。章节之间的页内链接跨批仍然有效。
+
+    Args:
+        html_path (str): HTML 文件路径
+        pdf_path (str): 输出 PDF 文件路径
+        title (str): PDF 文档标题
+        progress_callback (callable): 进度回调函数，接收0-100的进度值
+        outline (list): 可选，用于接收标题和所在页的列表，追加 (级别, 标题, 页码, 基线位置) 元组，
+            页码从 0 开始，基线位置为标题第一行的基线到页面上边缘的距离（磅）
+        margin_mm (float): 页边距（毫米）
+
+    Returns:
+        int: 生成的页数
+    """
+    from function.pdfparts import iter_html_chunks
+
+    return render_documents(iter_html_chunks(html_path, document_max_bytes), pdf_path, title,
+                            progress_callback, outline, margin_mm)
+
+
+def render_documents(documents, pdf_path, title="", progress_callback=None, outline=None, margin_mm=page_margin_mm):
+    """
+    依次排版若干 HTML 文档并写入同一个 PDF
+
+    每个文档从新的一页开始，排版并写出后即释放。
+
+    Args:
+        documents (iterable): [(HTML 文本, 写完该文档时的进度 0-100), ...]，可以是生成器
+        pdf_path (str): 输出 PDF 文件路径
+        title (str): PDF 文档标题
+        progress_callback (callable): 进度回调函数，接收0-100的进度值
+        outline (list): 可选，用于接收标题和所在页的列表，追加 (级别, 标题, 页码, 基线位置) 元组，
+            页码从 0 开始，基线位置为标题第一行的基线到页面上边缘的距离（磅）
+        margin_mm (float): 页边距（毫米）
+
+    Returns:
+        int: 生成的页数
+    """
+    ensure_gui_application()
+
+    from PySide6.QtCore import QMarginsF, QRectF, QSizeF
+    from PySide6.QtGui import QPageLayout, QPageSize, QPainter, QPdfWriter, QTextDocument, QTransform
+
+    writer = QPdfWriter(pdf_path)
+    writer.setResolution(pdf_resolution)
+    writer.setTitle(title)
+    writer.setCreator("JDFOAM")
+    writer.setPageLayout(QPageLayout(QPageSize(QPageSize.A4), QPageLayout.Portrait,
+                                     QMarginsF(margin_mm, margin_mm, margin_mm, margin_mm),
+                                     QPageLayout.Millimeter))
+    paint_rect = writer.pageLayout().paintRectPixels(writer.resolution())
+    page_width, page_height = paint_rect.width(), paint_rect.height()
+    points_per_pixel = 72 / pdf_resolution
+
+    painter = QPainter()
+    if not painter.begin(writer):
+        raise RuntimeError(f"无法写入 PDF 文件: {pdf_path}")
+    total_pages = 0
+    done = 0  # 已写完的文档对应的进度
+    try:
+        for html, progress in documents:
+            # 在 PDF 设备上排版，字号按 PDF 分辨率换算
+            document = QTextDocument()
+            document.documentLayout().setPaintDevice(writer)
+            document.setHtml(html)
+            del html
+            document.setPageSize(QSizeF(page_width, page_height))
+            page_count = document.pageCount()
+
+            if outline is not None:
+                # QPdfWriter 不能写入书签，这里只记录标题所在页，由调用方合并时写入
+                layout = document.documentLayout()
+                block = document.begin()
+                while block.isValid():
+                    level = block.blockFormat().headingLevel()
+                    if level in (1, 2):
+                        line = block.layout().lineAt(0)
+                        baseline = layout.blockBoundingRect(block).top() + line.y() + line.ascent()
+                        page = min(int(baseline // page_height), page_count - 1)
+                        top = (paint_rect.top() + baseline - page * page_height) * points_per_pixel
+                        outline.append((level, block.text(), total_pages + page, round(top, 2)))
+                    block = block.next()
+
+            # 排版时已经按页高断行，逐页平移并裁剪即可
+            for page in range(page_count):
+                if total_pages + page > 0:
+                    writer.newPage()
+                # 直接设置整页的平移变换，不要改回 save/translate/restore：
+                # PySide6 中每页调用这几个方法，数百页后进程退出时会崩溃（none_dealloc）
+                painter.setTransform(QTransform.fromTranslate(0, -page * page_height))
+                document.drawContents(painter, QRectF(0, page * page_height, page_width, page_height))
+                if progress_callback:
+                    progress_callback(done + (progress - done) * (page + 1) // page_count)
+            total_pages += page_count
+            done = progress
+            del document
+    finally:
+        painter.end()
+    return total_pages
@@ -0,0 +1,426 @@
+"""启动性能分析模块
+
+以 --profile-startup 启动程序时记录启动过程的耗时并写入报告，用于分析打包程序启动慢的原因。
+功能包括：
+- 记录每个模块的导入耗时（自身耗时和包含子模块的累计耗时），源码运行和打包运行均可用
+- 记录主要构造阶段的耗时（ConfigManager、ThemeManager、界面构建等）和首次绘制时间
+- 记录从进程创建到主脚本开始执行的时间；单文件打包程序从解压程序（父进程）创建时算起，包含解压耗时
+- 报告扩展名为 .json 时写入 JSON（供 benchmarks/startup.py 汇总），否则写入文本报告
+
+导入耗时通过插在 sys.meta_path 最前面的查找器记录：它把其他查找器返回的加载器包装一层计时，
+模块执行完后恢复原来的加载器。未启用分析时各接口不做任何事，该模块只依赖标准库。
+"""
+
+import os
+import sys
+import time
+import atexit
+import contextlib
+import unicodedata
+
+
+# --- 配置部分 ---
+# 命令行选项，可写作 --profile-startup 或 --profile-startup=报告路径
+option_name = '--profile-startup'
+
+# 未指定报告路径时的文件名，位于程序目录（与 JDFOAM.ini 相同）
+default_report_name = 'JDFOAM_startup_profile.txt'
+
+# 文本报告中列出的模块数（按自身耗时排序）
+report_top_modules = 40
+
+# 当前的分析器，未启用分析时为 None
+_profiler = None
+
+
+def get_default_report_path():
+    """
+    获取默认的报告路径
+
+    Returns:
+        str: 程序目录下的报告文件路径；打包后为可执行文件所在目录
+    """
+    if getattr(sys, 'frozen', False):
+        root_dir = os.path.dirname(sys.executable)
+    else:
+        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(root_dir, default_report_name)
+
+
+def parse_option(argv):
+    """
+    从命令行参数中取出启动分析选项
+
+    Args:
+        argv (list): 不含程序名的命令行参数
+
+    Returns:
+        tuple: (报告路径，未启用时为 None, 去掉该选项后的命令行参数)
+    """
+    report_path = None
+    remaining = []
+    for arg in argv:
+        if arg == option_name:
+            report_path = get_default_report_path()
+        elif arg.startswith(option_name + '='):
+            path = arg.split('=', 1)[1]
+            report_path = os.path.abspath(path) if path else get_default_report_path()
+        else:
+            remaining.append(arg)
+    return report_path, remaining
+
+
+def get_run_mode():
+    """
+    获取程序的运行方式
+
+    Returns:
+        str: 'source'（源码运行）、'onedir'（单目录打包）或 'onefile'（单文件打包）
+    """
+    if not getattr(sys, 'frozen', False):
+        return 'source'
+    # 单文件程序运行时解压到临时目录，单目录程序的资源就在可执行文件旁边
+    bundle_dir = getattr(sys, '_MEIPASS', os.path.dirname(sys.executable))
+    same_dir = os.path.normcase(os.path.abspath(bundle_dir)).startswith(
+        os.path.normcase(os.path.dirname(os.path.abspath(sys.executable))))
+    return 'onedir' if same_dir else 'onefile'
+
+
+def get_process_start_time(pid):
+    """
+    获取进程的创建时间
+
+    Args:
+        pid (int): 进程 ID
+
+    Returns:
+        float: 进程创建时间（time.time() 时间戳）；不支持的平台或读取失败时为 None
+    """
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+            if not handle:
+                return None
+            try:
+                times = [wintypes.FILETIME() for _ in range(4)]
+                if not kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+                    return None
+            finally:
+                kernel32.CloseHandle(handle)
+            # FILETIME 为 1601 年起的 100 纳秒数
+            created = (times[0].dwHighDateTime << 32) | times[0].dwLowDateTime
+            return created / 1e7 - 11644473600
+        if os.path.exists(f'/proc/{pid}/stat'):
+            with open(f'/proc/{pid}/stat', 'r') as f:
+                # 进程名可能包含空格，从最后一个右括号之后开始拆分；启动时刻为第 22 个字段（开机后的时钟节拍数）
+                start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+            # 用开机时长换算，不用 /proc/stat 的 btime：虚拟机中 btime 可能与系统时钟相差数百毫秒
+            with open('/proc/uptime', 'r') as f:
+                uptime = float(f.read().split()[0])
+            return time.time() - (uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return None
+
+
+def pad(text, width):
+    """
+    按显示宽度在右侧补齐空格，中文字符按两个字符宽度计算
+
+    Args:
+        text (str): 文本
+        width (int): 显示宽度
+
+    Returns:
+        str: 补齐后的文本
+    """
+    display_width = sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text)
+    return text + ' ' * max(0, width - display_width)
+
+
+class TimedLoader:
+    """计时加载器
+
+    包装其他查找器返回的加载器，记录模块创建和执行的耗时；模块执行完后把 __loader__ 恢复为原来的加载器。
+    """
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        # get_resource_reader、is_package 等其他接口直接交给原来的加载器
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        # 扩展模块在这一步加载动态库并初始化，计入该模块的耗时
+        self.profiler.begin_import(spec.name)
+        try:
+            return self.loader.create_module(spec)
+        finally:
+            self.profiler.end_import(spec.name)
+
+    def exec_module(self, module):
+        self.profiler.begin_import(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler.end_import(module.__name__)
+            if getattr(module, '__loader__', None) is self:
+                module.__loader__ = self.loader
+            spec = getattr(module, '__spec__', None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self.loader
+
+
+class ImportTimer:
+    """导入计时查找器
+
+    插在 sys.meta_path 最前面，依次询问其余的查找器，为找到的模块包装计时加载器。
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = TimedLoader(spec.loader, self.profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """启动性能分析器
+
+    记录模块导入耗时、各阶段耗时和时间点，并生成报告。
+    """
+
+    def __init__(self, report_path, start_time):
+        """
+        初始化分析器
+
+        Args:
+            report_path (str): 报告文件路径
+            start_time (float): 主脚本开始执行时的 time.perf_counter() 值
+        """
+        self.report_path = report_path
+        self.start_time = start_time
+        # 主脚本开始执行的时间戳，用于与进程创建时间比较
+        self.start_wall_time = time.time() - (time.perf_counter() - start_time)
+        self.finder = ImportTimer(self)
+        self.imports = {}    # 模块名 -> [自身耗时, 累计耗时, 开始顺序]
+        self.stack = []      # 正在导入的模块：[模块名, 本段开始时间, 子模块耗时]
+        self.phases = []     # (阶段名, 开始时间(ms), 耗时(ms))
+        self.marks = {}      # 时间点名称 -> 距主脚本开始的毫秒数
+        self.written = False
+
+    def start(self):
+        """开始记录模块导入"""
+        sys.meta_path.insert(0, self.finder)
+
+    def stop(self):
+        """停止记录模块导入"""
+        if self.finder in sys.meta_path:
+            sys.meta_path.remove(self.finder)
+
+    def elapsed_ms(self):
+        """距主脚本开始执行的毫秒数"""
+        return (time.perf_counter() - self.start_time) * 1000
+
+    def begin_import(self, name):
+        """模块开始创建或执行"""
+        self.imports.setdefault(name, [0.0, 0.0, len(self.imports)])
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def end_import(self, name):
+        """模块创建或执行完成，耗时累加到该模块的记录中"""
+        if not self.stack or self.stack[-1][0] != name:
+            return
+        _, begin, children = self.stack.pop()
+        total = time.perf_counter() - begin
+        record = self.imports[name]
+        record[0] += total - children
+        record[1] += total
+        if self.stack:
+            self.stack[-1][2] += total
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        """记录一个阶段的耗时"""
+        begin = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            self.phases.append((name, begin, self.elapsed_ms() - begin))
+
+    def mark(self, name, elapsed_ms=None):
+        """记录一个时间点，默认为当前时间"""
+        self.marks[name] = self.elapsed_ms() if elapsed_ms is None else elapsed_ms
+
+    def get_process_to_main_ms(self):
+        """
+        获取从进程创建到主脚本开始执行的毫秒数
+
+        单文件打包程序由解压程序（父进程）创建运行 Python 的子进程，从父进程创建时算起
+
+        Returns:
+            float: 毫秒数；无法获取进程创建时间时为 None
+        """
+        pid = os.getppid() if get_run_mode() == 'onefile' else os.getpid()
+        created = get_process_start_time(pid)
+        if created is None:
+            return None
+        return max(0.0, (self.start_wall_time - created) * 1000)
+
+    def get_result(self):
+        """
+        汇总分析结果
+
+        Returns:
+            dict: 运行环境、各时间点、各阶段和模块导入耗时
+        """
+        imports = sorted(self.imports.items(), key=lambda item: item[1][2])
+        return {
+            'mode': get_run_mode(),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'executable': sys.executable,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'process_to_main_ms': self.get_process_to_main_ms(),
+            'marks': dict(self.marks),
+            'phases': [{'name': name, 'start_ms': begin, 'ms': ms} for name, begin, ms in self.phases],
+            'import_count': len(imports),
+            'import_total_ms': sum(record[0] for _, record in imports) * 1000,
+            'imports': [{'module': name, 'self_ms': record[0] * 1000, 'total_ms': record[1] * 1000}
+                        for name, record in imports],
+        }
+
+    def format_report(self, result):
+        """
+        生成文本报告
+
+        Args:
+            result (dict): get_result 的返回值
+
+        Returns:
+            str: 报告文本
+        """
+        mode_names = {'source': '源码', 'onedir': '打包（单目录）', 'onefile': '打包（单文件）'}
+        lines = [
+            "JDFOAM 启动性能报告",
+            f"生成时间: {result['created']}",
+            f"运行方式: {mode_names[result['mode']]}    Python {result['python']}    {result['platform']}",
+            f"可执行文件: {result['executable']}",
+            "",
+        ]
+        if result['process_to_main_ms'] is not None:
+            note = "，包含解压耗时" if result['mode'] == 'onefile' else ""
+            lines.append(f"进程创建 -> 主脚本开始: {result['process_to_main_ms']:.0f} ms"
+                         f"（解释器初始化{note}）")
+        for name, ms in result['marks'].items():
+            lines.append(f"{name}: {ms:.0f} ms（从主脚本开始计）")
+
+        if result['phases']:
+            lines += ["", f"{pad('阶段', 28)}{'开始(ms)':>10}{'耗时(ms)':>10}"]
+        for phase in result['phases']:
+            lines.append(f"{pad(phase['name'], 28)}{phase['start_ms']:>10.1f}{phase['ms']:>10.1f}")
+
+        lines += ["", f"模块导入: 共 {result['import_count']} 个模块，合计 {result['import_total_ms']:.0f} ms",
+                  f"按自身耗时排序的前 {report_top_modules} 个模块:",
+                  f"{'自身(ms)':>10}{'累计(ms)':>10}  模块"]
+        top = sorted(result['imports'], key=lambda item: item['self_ms'], reverse=True)[:report_top_modules]
+        for item in top:
+            lines.append(f"{item['self_ms']:>10.1f}{item['total_ms']:>10.1f}  {item['module']}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self):
+        """
+        停止记录并写入报告，多次调用时只写入一次
+
+        Returns:
+            str: 报告文件路径；已写入过时为 None
+        """
+        if self.written:
+            return None
+        self.written = True
+        self.stop()
+        result = self.get_result()
+        os.makedirs(os.path.dirname(self.report_path) or '.', exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            if self.report_path.lower().endswith('.json'):
+                import json
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            else:
+                f.write(self.format_report(result))
+        return self.report_path
+
+
+def start(report_path, start_time):
+    """
+    启用启动性能分析，应在导入其他模块之前调用
+
+    程序未主动写入报告（例如命令行模式或启动失败）时，退出前自动写入
+
+    Args:
+        report_path (str): 报告文件路径
+        start_time (float): 主脚本开始执行时的 time.perf_counter() 值
+    """
+    global _profiler
+    _profiler = StartupProfiler(report_path, start_time)
+    _profiler.start()
+    atexit.register(_profiler.write_report)
+
+
+def is_active():
+    """
+    判断是否启用了启动性能分析
+
+    Returns:
+        bool: 是否启用
+    """
+    return _profiler is not None
+
+
+def measure(name):
+    """
+    记录一个阶段的耗时，用法为 with measure('阶段名'): ...
+
+    Args:
+        name (str): 阶段名
+
+    Returns:
+        上下文管理器；未启用分析时不做任何事
+    """
+    return _profiler.measure(name) if _profiler is not None else contextlib.nullcontext()
+
+
+def mark(name, elapsed_ms=None):
+    """
+    记录一个时间点
+
+    Args:
+        name (str): 时间点名称
+        elapsed_ms (float): 距主脚本开始的毫秒数，默认为当前时间
+    """
+    if _profiler is not None:
+        _profiler.mark(name, elapsed_ms)
+
+
+def write_report():
+    """
+    写入报告
+
+    Returns:
+        str: 报告文件路径；未启用分析或已写入过时为 None
+    """
+    return _profiler.write_report() if _profiler is not None else None
@@ -0,0 +1,511 @@
+"""日志面板模块
+
+为主窗口的日志框提供搜索栏、级别过滤和批量写入，在几十万行的 checkMesh / gmshToFoam 输出中也能即时查找。
+功能包括：
+- 日志消息按帧合并后一次写入日志框，调用方可以任意频繁地写日志
+- 行索引随日志写入增量建立：原始行、小写行和每行的级别
+- 级别（警告、错误、FOAM FATAL）按批分类，每批只对全文做一次正则匹配
+- 增量搜索：新查询包含上一次的查询时只在上次的结果中筛选，新写入的行只扫描新增部分
+- 级别过滤：在单独的只读视图中只显示指定级别及以上的行
+- 只为可见的行设置级别颜色和搜索高亮，滚动时重新计算
+
+搜索不区分大小写，按行匹配；Enter 跳到下一处，Shift+Enter 跳到上一处，Ctrl+F 聚焦搜索框，Esc 清空。
+"""
+
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, compress, count, islice, repeat
+from operator import add, contains
+
+from PySide6.QtCore import Qt, QTimer, QPoint, QEvent, QObject
+from PySide6.QtGui import QColor, QFont, QIcon, QKeySequence, QShortcut, QTextCursor
+from PySide6.QtWidgets import (QHBoxLayout, QLineEdit, QComboBox, QPushButton, QLabel, QPlainTextEdit,
+                               QTextEdit)
+
+
+# --- 配置部分 ---
+# 日志级别
+LEVEL_NONE = 0
+LEVEL_WARNING = 1
+LEVEL_ERROR = 2
+LEVEL_FATAL = 3
+
+# 级别的匹配规则（对小写文本按行匹配），一行同时匹配多个规则时取最高级别
+# 规则以字面文本开头，正则引擎可以快速跳过不相关的位置
+severity_patterns = (
+    (LEVEL_FATAL, r'foam fatal'),
+    (LEVEL_ERROR, r'error|failed|traceback|exception|错误|失败'),
+    (LEVEL_WARNING, r'warning|警告|^[ \t]*\*\*\*'),  # checkMesh 用 *** 标出未通过的检查项
+)
+
+# 过滤选项：(显示名称, 最低级别)
+filter_options = (
+    ("全部", LEVEL_NONE),
+    ("警告及以上", LEVEL_WARNING),
+    ("错误及以上", LEVEL_ERROR),
+    ("FOAM FATAL", LEVEL_FATAL),
+)
+
+# 级别颜色（前景色），深浅主题下都清晰可读
+severity_colors = {
+    LEVEL_WARNING: '#F57C00',
+    LEVEL_ERROR: '#E53935',
+    LEVEL_FATAL: '#D50000',
+}
+
+# 搜索匹配的背景色：普通匹配和当前匹配
+match_color = '#FFEB3B'
+current_match_color = '#FF9800'
+
+# 两次写入日志框的最小间隔（毫秒），约为 60 Hz 显示器的一帧
+flush_interval_ms = 16
+
+
+class LogIndex:
+    """日志行索引
+
+    随日志写入增量建立，不依赖 Qt：
+    - lines：原始行
+    - lower：小写行，用于不区分大小写的搜索
+    - severity：每行的级别
+    - at_least：级别 -> 该级别及以上的行号列表（有序）
+    """
+
+    def __init__(self):
+        self.patterns = [(level, re.compile(pattern, re.MULTILINE)) for level, pattern in severity_patterns]
+        self.clear()
+
+    def clear(self):
+        """清空索引"""
+        self.lines = []
+        self.lower = []
+        self.severity = bytearray()
+        self.at_least = {level: [] for level in (LEVEL_WARNING, LEVEL_ERROR, LEVEL_FATAL)}
+        self._search = ('', 0, [])   # 上一次搜索：(查询, 搜索时的行数, 结果行号)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def append(self, text):
+        """
+        追加一批日志
+
+        Args:
+            text (str): 一条或多条日志，行之间以换行分隔
+
+        Returns:
+            int: 这批日志第一行的行号
+        """
+        first = len(self.lines)
+        lower = text.lower()
+        new_lines = text.split('\n')
+        lower_lines = lower.split('\n')
+        self.lines.extend(new_lines)
+        self.lower.extend(lower_lines)
+        self.severity.extend(bytes(len(new_lines)))
+
+        # 每批对整批文本各做一次匹配，只为匹配到的行执行 Python 代码
+        starts = None
+        levels = {}
+        for level, pattern in self.patterns:
+            for match in pattern.finditer(lower):
+                if starts is None:
+                    # 本批各行在小写文本中的起始偏移：累加各行长度和换行（转为小写后长度可能变化，如 'İ'）
+                    starts = list(map(add, accumulate(map(len, lower_lines), initial=0), range(len(lower_lines) + 1)))
+                number = first + bisect_right(starts, match.start()) - 1
+                if levels.get(number, LEVEL_NONE) < level:
+                    levels[number] = level
+        for number in sorted(levels):
+            level = levels[number]
+            self.severity[number] = level
+            for threshold in range(LEVEL_WARNING, level + 1):
+                self.at_least[threshold].append(number)
+        return first
+
+    def scan(self, query, first_line):
+        """
+        从指定行开始逐行查找，返回包含查询的行号
+
+        Args:
+            query (str): 小写查询
+            first_line (int): 起始行号
+
+        Returns:
+            list: 行号列表（有序）
+        """
+        lines = islice(self.lower, first_line, None)
+        return list(compress(count(first_line), map(contains, lines, repeat(query))))
+
+    def search(self, query):
+        """
+        搜索包含查询的行（不区分大小写）
+
+        新查询包含上一次的查询时只在上次的结果中筛选；上次搜索之后写入的行只扫描新增部分。
+
+        Args:
+            query (str): 查询文本
+
+        Returns:
+            list: 行号列表（有序）
+        """
+        query = query.lower()
+        if not query:
+            return []
+        last_query, last_count, last_result = self._search
+        line_count = len(self.lines)
+        if last_query and last_query in query and last_count <= line_count:
+            if query == last_query:
+                result = list(last_result)
+            else:
+                lower = self.lower
+                result = [number for number in last_result if query in lower[number]]
+            result += self.scan(query, last_count)
+        else:
+            result = self.scan(query, 0)
+        self._search = (query, line_count, result)
+        return list(result)
+
+
+class LogPanel(QObject):
+    """日志面板管理器
+
+    管理主窗口的日志框（Log）：批量写入日志、维护行索引，提供搜索栏和级别过滤视图。
+    日志框只读，所有写入和清空都应通过本管理器进行，以保持索引与日志框的行一一对应。
+    """
+
+    def __init__(self, parent_window):
+        """
+        初始化日志面板管理器
+
+        Args:
+            parent_window: 父窗口对象，包含日志框组件
+        """
+        super().__init__(parent_window)
+        self.parent = parent_window          # 父窗口引用
+        self.index = LogIndex()              # 行索引
+        self._pending = []                   # 尚未写入日志框的消息
+        self._last_flush = 0.0               # 上次写入日志框的时间（time.monotonic）
+        self.min_level = LEVEL_NONE          # 过滤的最低级别
+        self.view_lines = None               # 过滤视图中各行对应的行号，未过滤时为 None
+        self.query = ''                      # 当前查询
+        self.matches = []                    # 当前视图中的匹配行号
+        self.current = -1                    # 当前匹配在 matches 中的位置
+        self.filter_view = None              # 级别过滤视图
+
+        # 帧末写入日志的定时器
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush)
+        # 合并多次高亮请求（滚动、写入、搜索）为一次
+        self._highlight_timer = QTimer(self)
+        self._highlight_timer.setSingleShot(True)
+        self._highlight_timer.timeout.connect(self.highlight_visible)
+
+    def init_search_bar(self):
+        """初始化搜索栏和级别过滤视图
+
+        在日志框上方插入搜索栏，在日志框所在位置放置（默认隐藏的）过滤视图
+        """
+        log = self.parent.Log
+        layout = self.parent.verticalLayout
+        position = layout.indexOf(log)
+
+        bar = QHBoxLayout()
+        bar.setSpacing(6)
+        self.search_edit = QLineEdit(self.parent.centralwidget)
+        self.search_edit.setPlaceholderText("搜索日志（Enter 下一个，Shift+Enter 上一个）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setStyleSheet("border-radius: 6px;")
+        icon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "icons", "search.png")
+        if os.path.exists(icon_path):
+            self.search_edit.addAction(QIcon(icon_path), QLineEdit.ActionPosition.LeadingPosition)
+        self.filter_combo = QComboBox(self.parent.centralwidget)
+        for name, _ in filter_options:
+            self.filter_combo.addItem(name)
+        self.prev_btn = QPushButton("▲", self.parent.centralwidget)
+        self.next_btn = QPushButton("▼", self.parent.centralwidget)
+        for btn, tip in ((self.prev_btn, "上一个 (Shift+Enter)"), (self.next_btn, "下一个 (Enter)")):
+            btn.setFixedSize(30, 26)
+            btn.setToolTip(tip)
+        self.count_label = QLabel("", self.parent.centralwidget)
+        self.count_label.setMinimumWidth(90)
+        bar.addWidget(self.search_edit, 1)
+        bar.addWidget(self.count_label)
+        bar.addWidget(self.prev_btn)
+        bar.addWidget(self.next_btn)
+        bar.addWidget(self.filter_combo)
+        layout.insertLayout(position, bar)
+
+        # 过滤视图与日志框外观相同，过滤时替换日志框显示
+        self.filter_view = QPlainTextEdit(self.parent.centralwidget)
+        self.filter_view.setObjectName("LogFilterView")
+        self.filter_view.setReadOnly(True)
+        self.filter_view.setStyleSheet(log.styleSheet())
+        self.filter_view.setFont(log.font())
+        self.filter_view.hide()
+        layout.insertWidget(position + 2, self.filter_view, layout.stretch(position + 1))
+
+        self.search_edit.textChanged.connect(self.set_query)
+        self.search_edit.returnPressed.connect(self.find_next)
+        self.search_edit.installEventFilter(self)
+        self.prev_btn.clicked.connect(self.find_previous)
+        self.next_btn.clicked.connect(self.find_next)
+        self.filter_combo.currentIndexChanged.connect(self.set_filter)
+        QShortcut(QKeySequence.StandardKey.Find, self.parent, activated=self.focus_search)
+        for view in (log, self.filter_view):
+            view.verticalScrollBar().valueChanged.connect(self.schedule_highlight)
+            view.viewport().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        """处理搜索框的 Shift+Enter / Esc 和视图大小变化"""
+        if obj is getattr(self, 'search_edit', None) and event.type() == QEvent.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter) and \
+                    event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+                self.find_previous()
+                return True
+            if event.key() == Qt.Key.Key_Escape:
+                self.search_edit.clear()
+                return True
+        elif event.type() == QEvent.Type.Resize:
+            self.schedule_highlight()
+        return False
+
+    def current_view(self):
+        """当前显示的视图：过滤时为过滤视图，否则为日志框"""
+        return self.filter_view if self.view_lines is not None else self.parent.Log
+
+    def append(self, msg):
+        """
+        写入一条日志
+
+        消息先缓存，每帧最多写入日志框一次；在 GUI 线程中同步执行的任务阻塞事件循环时，
+        距上次写入超过一帧的调用直接写入。
+
+        Args:
+            msg: 日志消息
+        """
+        self._pending.append(str(msg))
+        remaining_ms = flush_interval_ms - (time.monotonic() - self._last_flush) * 1000
+        if remaining_ms <= 0:
+            self._flush_timer.stop()
+            self.flush()
+        elif not self._flush_timer.isActive():
+            self._flush_timer.start(int(remaining_ms) + 1)
+
+    def flush(self):
+        """把缓存的日志一次写入日志框和索引"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        text = "\n".join(self._pending)
+        self._pending = []
+        first = self.index.append(text)
+
+        log = self.parent.Log
+        scrollbar = log.verticalScrollBar()
+        # 用户向上翻看（例如查看搜索结果）时不跳到底部
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 1
+        log.appendPlainText(text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+        if self.view_lines is not None:
+            new_rows = [number for number in range(first, len(self.index))
+                        if self.index.severity[number] >= self.min_level]
+            if new_rows:
+                self.view_lines.extend(new_rows)
+                view_scrollbar = self.filter_view.verticalScrollBar()
+                view_at_bottom = view_scrollbar.value() >= view_scrollbar.maximum() - 1
+                self.filter_view.appendPlainText("\n".join(self.index.lines[number] for number in new_rows))
+                if view_at_bottom:
+                    view_scrollbar.setValue(view_scrollbar.maximum())
+        if self.query:
+            self.update_matches(keep_current=True)
+        self.schedule_highlight()
+
+    def clear(self):
+        """清空日志框、过滤视图和索引"""
+        self._flush_timer.stop()
+        self._pending = []
+        self.index.clear()
+        self.parent.Log.clear()
+        if self.view_lines is not None:
+            self.view_lines = []
+            self.filter_view.clear()
+        self.matches = []
+        self.current = -1
+        self.update_count_label()
+
+    def focus_search(self):
+        """聚焦搜索框并选中已有文本"""
+        self.search_edit.setFocus()
+        self.search_edit.selectAll()
+
+    def set_query(self, text):
+        """
+        设置搜索查询，跳到视口第一行及之后的第一个匹配
+
+        Args:
+            text (str): 查询文本
+        """
+        self.flush()
+        self.query = text
+        self.update_matches(keep_current=False)
+        if self.matches:
+            row = self.current_view().cursorForPosition(QPoint(0, 0)).blockNumber()
+            self.current = min(bisect_left(self.matches, self.row_to_line(row)), len(self.matches) - 1)
+            self.go_to_current()
+        self.update_count_label()
+        self.schedule_highlight()
+
+    def set_filter(self, option):
+        """
+        设置级别过滤
+
+        Args:
+            option (int): filter_options 中的序号
+        """
+        self.flush()
+        self.min_level = filter_options[option][1]
+        log = self.parent.Log
+        if self.min_level == LEVEL_NONE:
+            self.view_lines = None
+            self.filter_view.clear()
+            self.filter_view.hide()
+            log.show()
+        else:
+            self.view_lines = list(self.index.at_least[self.min_level])
+            self.filter_view.setPlainText("\n".join(self.index.lines[number] for number in self.view_lines))
+            log.hide()
+            self.filter_view.show()
+        if self.query:
+            self.update_matches(keep_current=False)
+            self.current = 0 if self.matches else -1
+            self.go_to_current()
+        self.update_count_label()
+        self.schedule_highlight()
+
+    def update_matches(self, keep_current):
+        """
+        重新计算当前视图中的匹配行
+
+        Args:
+            keep_current (bool): 是否保持当前匹配的行不变（新日志写入时）
+        """
+        current_line = self.matches[self.current] if keep_current and 0 <= self.current < len(self.matches) else None
+        matches = self.index.search(self.query) if self.query else []
+        if self.view_lines is not None:
+            severity = self.index.severity
+            matches = [number for number in matches if severity[number] >= self.min_level]
+        self.matches = matches
+        if current_line is not None:
+            self.current = bisect_left(matches, current_line)
+        elif not keep_current:
+            self.current = -1
+        self.update_count_label()
+
+    def update_count_label(self):
+        """更新匹配数显示"""
+        if not self.query:
+            self.count_label.setText("")
+        elif not self.matches:
+            self.count_label.setText("无匹配")
+        else:
+            self.count_label.setText(f"{max(self.current, 0) + 1} / {len(self.matches)} 行")
+
+    def line_to_row(self, number):
+        """行号对应的当前视图中的行"""
+        if self.view_lines is None:
+            return number
+        return bisect_left(self.view_lines, number)
+
+    def row_to_line(self, row):
+        """当前视图中的行对应的行号"""
+        if self.view_lines is None:
+            return row
+        return self.view_lines[row] if row < len(self.view_lines) else len(self.index)
+
+    def find_next(self):
+        """跳到下一个匹配（循环）"""
+        if self.matches:
+            self.current = (self.current + 1) % len(self.matches)
+            self.go_to_current()
+
+    def find_previous(self):
+        """跳到上一个匹配（循环）"""
+        if self.matches:
+            self.current = (self.current - 1) % len(self.matches)
+            self.go_to_current()
+
+    def go_to_current(self):
+        """滚动到当前匹配并选中该行中的第一处匹配"""
+        self.update_count_label()
+        if not 0 <= self.current < len(self.matches):
+            return
+        view = self.current_view()
+        number = self.matches[self.current]
+        block = view.document().findBlockByNumber(self.line_to_row(number))
+        cursor = QTextCursor(block)
+        column = self.index.lower[number].find(self.query.lower())
+        if column >= 0:
+            cursor.setPosition(block.position() + column)
+            cursor.setPosition(block.position() + column + len(self.query), QTextCursor.MoveMode.KeepAnchor)
+        view.setTextCursor(cursor)
+        view.centerCursor()
+        self.schedule_highlight()
+
+    def schedule_highlight(self, *args):
+        """安排在下一次事件循环中重新高亮可见的行"""
+        if not self._highlight_timer.isActive():
+            self._highlight_timer.start(0)
+
+    def highlight_visible(self):
+        """为可见的行设置级别颜色和搜索高亮
+
+        只处理视口内的几十行，与日志总行数无关
+        """
+        view = self.current_view()
+        document = view.document()
+        viewport = view.viewport()
+        first_row = view.cursorForPosition(QPoint(0, 0)).blockNumber()
+        last_row = view.cursorForPosition(QPoint(0, viewport.height() - 1)).blockNumber()
+        query = self.query.lower()
+        current_line = self.matches[self.current] if 0 <= self.current < len(self.matches) else None
+
+        selections = []
+        for row in range(first_row, last_row + 1):
+            number = self.row_to_line(row)
+            if number >= len(self.index):
+                break
+            block = document.findBlockByNumber(row)
+            level = self.index.severity[number]
+            if level:
+                selection = QTextEdit.ExtraSelection()
+                selection.cursor = QTextCursor(block)
+                selection.cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock,
+                                              QTextCursor.MoveMode.KeepAnchor)
+                selection.format.setForeground(QColor(severity_colors[level]))
+                if level == LEVEL_FATAL:
+                    selection.format.setFontWeight(QFont.Weight.Bold)
+                selections.append(selection)
+            if query:
+                text = self.index.lower[number]
+                color = QColor(current_match_color if number == current_line else match_color)
+                column = text.find(query)
+                while column != -1:
+                    selection = QTextEdit.ExtraSelection()
+                    selection.cursor = QTextCursor(block)
+                    selection.cursor.setPosition(block.position() + column)
+                    selection.cursor.setPosition(block.position() + column + len(query),
+                                                 QTextCursor.MoveMode.KeepAnchor)
+                    selection.format.setBackground(color)
+                    selection.format.setForeground(QColor('black'))
+                    selections.append(selection)
+                    column = text.find(query, column + len(query))
+        view.setExtraSelections(selections)
+        # 另一个视图隐藏时清除它的高亮
+        other = self.parent.Log if view is self.filter_view else self.filter_view
+        if other is not None and other.extraSelections():
+            other.setExtraSelections([])
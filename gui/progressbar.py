@@ -4,11 +4,14 @@
 显示/隐藏控制等，确保用户界面的进度反馈一致性和可用性。
 功能包括：
 - 进度条样式统一管理
-- 进度值更新
+- 进度值更新：合并到显示刷新频率，调用方可以任意频繁地报告进度
 - 进度条显示/隐藏控制
 - UI 事件循环处理
 """
 
+import time
+
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QFont
 
@@ -18,8 +21,15 @@ class ProgressBarManager:
 
     管理 GUI 界面中的进度条组件，提供统一的接口进行样式设置、
     进度更新和显示控制，确保在各种操作中为用户提供清晰的进度反馈。
+
+    update_progress 只记录最新的进度值，每帧最多向进度条写入一次：
+    距上次写入不足一帧时由定时器在帧末写入最新值，中间的值被合并掉。
+    进度条只在显示的百分比变化时重绘，由 Qt 在 setValue 中处理。
     """
 
+    # 两次写入进度条的最小间隔（毫秒），约为 60 Hz 显示器的一帧
+    FRAME_INTERVAL_MS = 16
+
     # 进度条样式定义
     # 使用青蓝色渐变设计，提供现代化的视觉效果
     PROGRESS_BAR_STYLE = """
@@ -45,6 +55,12 @@ class ProgressBarManager:
             parent_window: 父窗口对象，包含进度条组件
         """
         self.parent = parent_window  # 父窗口引用
+        self._pending_value = None   # 尚未写入进度条的最新进度值
+        self._last_flush = 0.0       # 上次写入进度条的时间（time.monotonic）
+        # 帧末写入最新进度值的定时器
+        self._flush_timer = QTimer(parent_window)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush_progress)
 
     def init_progress_bar(self):
         """初始化进度条
@@ -53,31 +69,23 @@ class ProgressBarManager:
         """
         if hasattr(self.parent, 'progress_bar'):
             self.parent.progress_bar.setValue(0)  # 设置初始进度为0
-            # 应用进度条样式
+            # 应用进度条样式，不隐藏进度条，让它始终可见
             self.apply_progress_bar_style()
-            # 不隐藏进度条，让它始终可见
-            print("进度条已初始化")
-            print("进度条可见性:", self.parent.progress_bar.isVisible())
-            print("进度条大小:", self.parent.progress_bar.size())
-            print("进度条位置:", self.parent.progress_bar.pos())
         else:
             print("警告: progress_bar 未创建")
 
     def show_progress_bar(self):
         """显示进度条并重置
 
-        显示进度条组件并将进度值重置为0，准备开始新的进度跟踪
+        显示进度条组件并将进度值重置为0，准备开始新的进度跟踪。
+        样式已在初始化和切换主题时设置，这里不再重复设置
         """
         if hasattr(self.parent, 'progress_bar'):
+            # 丢弃上一个任务尚未写入的进度值
+            self._flush_timer.stop()
+            self._pending_value = None
             self.parent.progress_bar.show()  # 显示进度条
             self.parent.progress_bar.setValue(0)  # 重置进度值
-            self.parent.progress_bar.update()  # 更新界面
-            self.parent.progress_bar.repaint()  # 重绘界面
-            # 强制应用样式
-            self.apply_progress_bar_style()
-            print("进度条已显示，当前值:", self.parent.progress_bar.value())
-            print("进度条可见性:", self.parent.progress_bar.isVisible())
-            print("进度条大小:", self.parent.progress_bar.size())
 
     def hide_progress_bar(self):
         """隐藏进度条
@@ -90,27 +98,43 @@ class ProgressBarManager:
     def update_progress(self, value):
         """更新进度条值
 
-        更新进度条的显示值，提供实时的进度反馈
+        记录最新的进度值，每帧最多写入进度条一次，可以任意频繁地调用（须在 GUI 线程中调用，
+        后台线程通过信号转发）。在 GUI 线程中同步执行的任务（如 PDF 导出）阻塞事件循环时定时器不会触发，
+        此时由距上次写入超过一帧的调用直接写入，进度条仍按帧率刷新。
 
         Args:
             value (int): 进度值，范围 0-100
         """
-        if hasattr(self.parent, 'progress_bar'):
-            print(f"更新进度: {value}%")
-            self.parent.progress_bar.setValue(value)  # 设置进度值
-            self.parent.progress_bar.update()  # 更新界面
-            self.parent.progress_bar.repaint()  # 重绘界面
-        else:
-            print("警告: progress_bar 不存在，无法更新进度")
+        self._pending_value = value
+        remaining_ms = self.FRAME_INTERVAL_MS - (time.monotonic() - self._last_flush) * 1000
+        if remaining_ms <= 0:
+            self._flush_timer.stop()
+            self.flush_progress()
+        elif not self._flush_timer.isActive():
+            self._flush_timer.start(int(remaining_ms) + 1)
+
+    def flush_progress(self):
+        """将最新的进度值写入进度条
+
+        值与当前显示的不同时才调用 setValue；Qt 只在显示的百分比变化时重绘进度条
+        """
+        value = self._pending_value
+        self._pending_value = None
+        self._last_flush = time.monotonic()
+        if value is None or not hasattr(self.parent, 'progress_bar'):
+            return
+        if self.parent.progress_bar.value() != value:
+            self.parent.progress_bar.setValue(value)
 
     def apply_progress_bar_style(self):
         """应用进度条样式
 
-        为进度条组件应用预定义的样式，确保视觉效果的一致性
+        为进度条组件应用预定义的样式，确保视觉效果的一致性；
+        样式未变化时不重新设置，避免重新计算样式
         """
         if hasattr(self.parent, 'progress_bar'):
-            self.parent.progress_bar.setStyleSheet(self.PROGRESS_BAR_STYLE)
-            self.parent.progress_bar.update()
+            if self.parent.progress_bar.styleSheet() != self.PROGRESS_BAR_STYLE:
+                self.parent.progress_bar.setStyleSheet(self.PROGRESS_BAR_STYLE)
 
     def process_events(self):
         """处理事件循环，让UI有机会更新
@@ -6,22 +6,32 @@
 - Markdown 转 PDF 功能
 - 主题切换功能
 - 日志输出和进度显示
+
+启动时只创建窗口和应用主题，首次绘制之后再在后台检测外部工具路径；
+源码合并和 PDF 导出模块在第一次使用时才导入。
 """
 
 import os
+import time
+import threading
 import subprocess
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QPlainTextEdit, QFileDialog,
                              QGroupBox, QProgressBar, QMessageBox, QMenu)
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QIcon, QFont, QAction
-from function.Gmsh2OpenFOAM import WorkerThread
+from function import startup_profile
 from function.config import ConfigManager
 from .theme import ThemeManager
 from .progressbar import ProgressBarManager
+from .logpanel import LogPanel
+from .workers import BinderThread, WorkerThread
 from .ui_JDFOAM import Ui_JDFOAM_GUI
-from function.SourceCodeBinder import scan_directory, combine_files_to_markdown
-from function.md2pdf import markdown_to_pdf
+
+
+# --- 配置部分 ---
+# 从进程启动到窗口首次绘制的目标时间（毫秒），以 --profile-startup 启动时超过该时间会给出提示
+first_paint_target_ms = 500
 
 
 class PySide6GmshConverterGUI(QMainWindow, Ui_JDFOAM_GUI):
@@ -31,24 +41,32 @@ class PySide6GmshConverterGUI(QMainWindow, Ui_JDFOAM_GUI):
     提供用户友好的图形界面进行 GMSH 网格转换和源代码管理。
     """
 
-    def __init__(self, update_func, app_icon_path=None):
+    def __init__(self, update_func, app_icon_path=None, start_time=None):
         """
         初始化主窗口
 
         Args:
             update_func: 网格更新函数，用于执行 GMSH 到 OpenFOAM 的转换
             app_icon_path: 应用程序图标文件路径（可选）
+            start_time (float): 进程启动时的 time.perf_counter() 值，用于统计首次绘制耗时（可选）
         """
         super().__init__()
         self.update_func = update_func          # 网格更新函数
         self.worker_thread = None               # 工作线程对象
-        self.config_manager = ConfigManager()   # 配置管理器
-        self.theme_manager = ThemeManager(self) # 主题管理器
+        self.binder_thread = None               # 源码合并线程对象
+        self.start_time = start_time            # 进程启动时间
+        self.first_paint_ms = None              # 首次绘制耗时（毫秒），首次绘制前为 None
+        with startup_profile.measure("ConfigManager 构造"):
+            self.config_manager = ConfigManager()   # 配置管理器
+        with startup_profile.measure("ThemeManager 构造"):
+            self.theme_manager = ThemeManager(self) # 主题管理器
         self.progressbar_manager = ProgressBarManager(self)  # 进度条管理器
+        self.log_panel = LogPanel(self)         # 日志面板管理器
         self.app_icon_path = app_icon_path      # 应用程序图标路径
 
         # 设置 UI
-        self.setupUi(self)
+        with startup_profile.measure("界面构建 setupUi"):
+            self.setupUi(self)
 
         # 修复按钮图标路径（使用绝对路径）
         self.fix_button_icons()
@@ -69,11 +87,15 @@ class PySide6GmshConverterGUI(QMainWindow, Ui_JDFOAM_GUI):
         # 初始时显示进度条，值为0
         self.progressbar_manager.show_progress_bar()
 
+        # 初始化日志搜索栏
+        self.log_panel.init_search_bar()
+
         # 连接信号
         self.connect_signals()
 
         # 初始化配置和主题
-        self.config_manager.load_config()
+        with startup_profile.measure("读取配置文件"):
+            self.config_manager.load_config()
 
         # 从配置文件加载路径
         saved_case_path = self.config_manager.get_case_path()
@@ -91,22 +113,103 @@ class PySide6GmshConverterGUI(QMainWindow, Ui_JDFOAM_GUI):
         # 初始化主题菜单
         self.theme_manager.init_menu()
 
-        # 应用主题
-        self.theme_manager.apply_theme(saved_theme)
+        # 应用主题：只设置一次应用程序级的调色板和样式表，控件在首次显示时完成样式计算
+        with startup_profile.measure("应用主题"):
+            self.theme_manager.apply_theme(saved_theme)
 
         # 为日志框设置上下文菜单
         self.Log.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.Log.customContextMenuRequested.connect(self.show_log_context_menu)
+        self.log_panel.filter_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.log_panel.filter_view.customContextMenuRequested.connect(self.show_log_context_menu)
     
+    def paintEvent(self, event):
+        """
+        窗口绘制事件处理
+
+        首次绘制后安排剩余的启动工作，使窗口先于耗时的初始化显示出来
+
+        Args:
+            event: 绘制事件对象
+        """
+        super().paintEvent(event)
+        if self.first_paint_ms is None:
+            self.first_paint_ms = ((time.perf_counter() - self.start_time) * 1000
+                                   if self.start_time is not None else 0.0)
+            from PySide6.QtCore import QTimer
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """完成启动
+
+        在首次绘制之后执行：在后台线程中检测外部工具路径；
+        以 --profile-startup 启动时记录并报告首次绘制耗时，写入启动性能报告后退出
+        """
+        if startup_profile.is_active():
+            if self.start_time is not None:
+                note = "" if self.first_paint_ms <= first_paint_target_ms else "，超过目标"
+                print(f"首次绘制耗时: {self.first_paint_ms:.0f} ms（目标 {first_paint_target_ms} ms{note}）")
+            startup_profile.mark("首次绘制", self.first_paint_ms)
+            print(f"启动性能报告已写入: {startup_profile.write_report()}")
+            QApplication.instance().quit()
+            return
+        # 探测盘符只调用 os.path.exists，不访问 Qt 对象，可以安全地放在后台线程中
+        threading.Thread(target=self.config_manager.detect_tools, daemon=True).start()
+
+    def handle_request(self, request):
+        """
+        处理启动参数
+
+        首次启动时处理自身的参数；单实例模式下再次启动的程序把参数转交过来后也由此处理。
+        填入 MSH 文件和算例目录，把窗口切换到前台，并执行指定的操作。
+
+        Args:
+            request (dict): 启动参数，包含 msh、case、action（可为空）
+        """
+        msh_path = request.get('msh') or ''
+        case_path = request.get('case') or ''
+        action = request.get('action') or ''
+        if msh_path:
+            self.msh_path_edit.setText(msh_path)
+            self.config_manager.set_msh_path(msh_path)
+        if case_path:
+            self.case_path_edit.setText(case_path)
+            self.config_manager.set_case_path(case_path)
+
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+        if not action:
+            return
+        if ((self.worker_thread is not None and self.worker_thread.isRunning())
+                or (self.binder_thread is not None and self.binder_thread.isRunning())):
+            self.log_msg(f"已有任务正在运行，忽略启动参数中的操作: {action}")
+            return
+        handlers = {
+            'convert': self.start,
+            'check': self.check_mesh,
+            'bind': self.combine_to_markdown,
+            'pdf': self.export_to_pdf,
+        }
+        if action in handlers:
+            # 在下一次事件循环中执行，先让转交参数的程序收到回复后退出
+            from PySide6.QtCore import QTimer
+            QTimer.singleShot(0, handlers[action])
+
     def closeEvent(self, event):
         """
         窗口关闭事件处理
 
-        在窗口关闭时保存当前主题设置到配置文件
+        在窗口关闭时保存当前主题设置到配置文件，并取消正在运行的源码合并
 
         Args:
             event: 关闭事件对象
         """
+        if self.binder_thread is not None and self.binder_thread.isRunning():
+            self.binder_thread.cancel()
+            self.binder_thread.wait()
         self.config_manager.set_theme(self.theme_manager.current_theme)
         super().closeEvent(event)
 
@@ -260,6 +363,7 @@ class PySide6GmshConverterGUI(QMainWindow, Ui_JDFOAM_GUI):
         Args:
             pos: 鼠标点击位置
         """
+        view = self.log_panel.current_view()  # 日志框或级别过滤视图
         menu = QMenu(self)
 
         # 设置菜单样式，确保分隔线在 Dark 模式下可见
@@ -293,17 +397,17 @@ QMenu::separator {
 
         # 复制选项
         copy_action = QAction("复制", self)
-        copy_action.triggered.connect(self.Log.copy)
+        copy_action.triggered.connect(view.copy)
         menu.addAction(copy_action)
 
         # 粘贴选项
         paste_action = QAction("粘贴", self)
-        paste_action.triggered.connect(self.Log.paste)
+        paste_action.triggered.connect(view.paste)
         menu.addAction(paste_action)
 
         # 全选选项
         select_all_action = QAction("全选", self)
-        select_all_action.triggered.connect(self.Log.selectAll)
+        select_all_action.triggered.connect(view.selectAll)
         menu.addAction(select_all_action)
 
         # 添加分隔线
@@ -323,14 +427,15 @@ QMenu::separator {
         menu.addAction(save_action)
 
         # 在鼠标位置显示菜单
-        menu.exec(self.Log.mapToGlobal(pos))
+        menu.exec(view.mapToGlobal(pos))
 
     def clear_log(self):
         """清除日志框内容"""
-        self.Log.clear()
+        self.log_panel.clear()
 
     def save_log_to_file(self):
         """保存日志内容到文件"""
+        self.log_panel.flush()
         log_content = self.Log.toPlainText()
 
         if not log_content:
@@ -647,74 +752,128 @@ QMenu::separator {
         """
         添加日志消息
 
-        将消息添加到日志显示区域，并自动滚动到底部
+        将消息交给日志面板，按帧合并写入日志显示区域并建立搜索索引；
+        日志框位于底部时自动滚动到底部
 
         Args:
             msg (str): 要添加的日志消息
         """
-        self.Log.appendPlainText(msg)
-        scrollbar = self.Log.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self.log_panel.append(msg)
+
+    def get_source_code_path(self, dir_path, ext):
+        """
+        获取源码合并输出文件的路径
+
+        Args:
+            dir_path (str): 算例目录或归档路径
+            ext (str): 扩展名，如 '.md'
+
+        Returns:
+            str: 输出文件路径；归档的输出文件位于归档所在目录
+        """
+        from function.SourceCodeBinder import get_source_code_path
+
+        return get_source_code_path(dir_path, ext)
+
+    def get_markdown_path(self, dir_path):
+        """
+        获取当前合并范围对应的 Markdown 输出文件路径
+
+        git 变更范围单独输出为 .diff.md，不覆盖完整文档；合并和导出 PDF 都按此选择文件
+
+        Args:
+            dir_path (str): 算例目录或归档路径
+
+        Returns:
+            str: Markdown 文件路径
+        """
+        git_scope = self.config_manager.get_binder_scope() == 'git'
+        return self.get_source_code_path(dir_path, '.diff.md' if git_scope else '.md')
 
     def combine_to_markdown(self):
         """合并源码为 Markdown
 
-        扫描指定目录下的所有源代码文件，将它们合并为一个带目录的 Markdown 文档
+        扫描指定目录下的所有源代码文件，将它们合并为一个带目录的 Markdown 文档。
+        合并在后台线程中执行；任务运行时按钮变为“取消合并”，再次点击即取消。
         """
+        if self.binder_thread is not None and self.binder_thread.isRunning():
+            self.binder_thread.cancel()
+            self.combine_md_btn.setEnabled(False)
+            self.log_msg("正在取消合并...")
+            return
+
+        from function.archive import is_archive
+
         dir_path = self.case_path_edit.text()
 
-        if not dir_path or not os.path.isdir(dir_path):
-            QMessageBox.warning(self, "提示", "请选择有效的算例目录")
+        if not dir_path or not (os.path.isdir(dir_path) or is_archive(dir_path)):
+            QMessageBox.warning(self, "提示", "请选择有效的算例目录或 zip / tar 归档")
             return
 
-        # 禁用按钮，显示进度条
-        self.combine_md_btn.setEnabled(False)
+        # 生成输出文件名，归档的输出文件放在归档所在目录；git 变更范围单独输出，不覆盖完整文档
+        md_path = self.get_markdown_path(dir_path)
+
+        # 按钮切换为取消按钮，显示进度条
+        self.combine_md_btn_text = self.combine_md_btn.text()
+        self.combine_md_btn.setText("取消合并")
         self.progressbar_manager.show_progress_bar()
-        self.Log.clear()
+        self.log_panel.clear()
         self.log_msg("开始扫描项目文件...")
 
-        # 处理事件循环，让UI有机会更新
-        self.progressbar_manager.process_events()
+        self.binder_thread = BinderThread(dir_path, md_path, self.config_manager)
+        self.binder_thread.log_signal.connect(self.log_msg)
+        self.binder_thread.progress_signal.connect(self.progressbar_manager.update_progress)
+        self.binder_thread.toc_signal.connect(self.on_toc_entries)
+        self.binder_thread.finished_signal.connect(self.on_combine_finished)
+        self.binder_thread.start()
 
-        # 扫描文件
-        files = scan_directory(dir_path,
-                              progress_callback=lambda p: self.progressbar_manager.update_progress(p),
-                              log_callback=lambda msg: self.log_msg(msg))
+    def on_toc_entries(self, entries):
+        """
+        显示合并线程实时推送的目录条目
 
-        self.log_msg(f"找到 {len(files)} 个源代码文件")
-        self.log_msg("正在合并为 Markdown...")
+        Args:
+            entries (list): 目录条目列表 [(序号, 相对路径), ...]
+        """
+        self.log_msg("\n".join(f"  📄 {number}. {rel_path}" for number, rel_path in entries))
 
-        # 生成输出文件名
-        project_name = os.path.basename(dir_path)
-        md_path = os.path.join(dir_path, f"{project_name}_source_code.md")
+    def on_combine_finished(self, success, result):
+        """
+        源码合并线程完成回调
 
-        # 合并文件
-        success = combine_files_to_markdown(files, md_path, dir_path,
-                                           progress_callback=lambda p: self.progressbar_manager.update_progress(p))
+        Args:
+            success (bool): 是否成功
+            result (str): 成功时为输出文件路径，失败时为错误信息（取消时为空）
+        """
+        cancelled = self.binder_thread.isInterruptionRequested()
+        self.binder_thread = None
 
         # 任务完成后将进度条重置为0
         from PySide6.QtCore import QTimer
         QTimer.singleShot(1000, lambda: self.progressbar_manager.update_progress(0))
 
+        self.combine_md_btn.setText(self.combine_md_btn_text)
         self.combine_md_btn.setEnabled(True)
 
         if success:
-            self.log_msg(f"Markdown 文件已生成: {md_path}")
-            self.log_msg(f"Markdown 文件已生成: {os.path.basename(md_path)}")
+            self.log_msg(f"Markdown 文件已生成: {result}")
+            self.log_msg(f"Markdown 文件已生成: {os.path.basename(result)}")
             QMessageBox.information(self, "完成", "源码合并成功！")
+        elif cancelled:
+            self.log_msg("源码合并已取消")
         else:
+            if result:
+                self.log_msg(f"错误: {result}")
             self.log_msg("源码合并失败")
             QMessageBox.critical(self, "错误", "源码合并失败，请查看日志输出。")
 
     def export_to_pdf(self):
         """导出为 PDF
 
-        将之前生成的 Markdown 文档转换为 PDF 文件
+        将之前生成的 Markdown 文档转换为 PDF 文件；git 变更范围的文档（.diff.md）导出为 .diff.pdf
         """
         dir_path = self.case_path_edit.text()
-        project_name = os.path.basename(dir_path)
-        md_path = os.path.join(dir_path, f"{project_name}_source_code.md")
-        pdf_path = os.path.join(dir_path, f"{project_name}_source_code.pdf")
+        md_path = self.get_markdown_path(dir_path)
+        pdf_path = os.path.splitext(md_path)[0] + '.pdf'
 
         if not os.path.exists(md_path):
             QMessageBox.warning(self, "提示", "请先合并源码为 Markdown")
@@ -729,10 +888,20 @@ QMenu::separator {
         # 获取 wkhtmltopdf 路径
         wkhtmltopdf_path = self.config_manager.get_wkhtmltopdf_path()
 
-        # 转换为 PDF
+        # 转换为 PDF（PDF 模块依赖 pypdf、Pygments 等，第一次导出时才导入）
+        from function.md2pdf import markdown_to_pdf
+
         success = markdown_to_pdf(md_path, pdf_path, wkhtmltopdf_path,
                                   logger=self.log_msg,
-                                  progress_callback=lambda p: self.progressbar_manager.update_progress(p))
+                                  progress_callback=lambda p: self.progressbar_manager.update_progress(p),
+                                  renderer=self.config_manager.get_pdf_renderer(),
+                                  workers=self.config_manager.get_pdf_workers(),
+                                  cache_bytes=self.config_manager.get_pdf_cache_bytes(),
+                                  incremental=self.config_manager.get_pdf_incremental(),
+                                  use_highlight=self.config_manager.get_pdf_highlight(),
+                                  highlight_style=self.config_manager.get_pdf_highlight_style(),
+                                  profile=self.config_manager.get_pdf_profile(),
+                                  strip_sections=self.config_manager.get_pdf_strip_sections())
 
         # 任务完成后将进度条重置为0
         from PySide6.QtCore import QTimer
@@ -765,7 +934,7 @@ QMenu::separator {
         self.start_mesh_btn.setEnabled(False)
         self.start_mesh_btn.setText("正在处理...")
         self.progressbar_manager.show_progress_bar()
-        self.Log.clear()
+        self.log_panel.clear()
 
         env_source = self.config_manager.get_openfoam_env_source()
         self.worker_thread = WorkerThread(self.update_func, msh_path, case_path, env_source)
@@ -805,7 +974,7 @@ QMenu::separator {
         self.progressbar_manager.update_progress(0)
 
 
-def run_jdfoam_gui(update_func, app_icon_path=None):
+def run_jdfoam_gui(update_func, app_icon_path=None, start_time=None, request=None, single_instance=False):
     """
     运行 JDFOAM GUI
 
@@ -814,15 +983,36 @@ def run_jdfoam_gui(update_func, app_icon_path=None):
     Args:
         update_func: 网格更新函数
         app_icon_path: 应用程序图标文件路径（可选）
+        start_time (float): 进程启动时的 time.perf_counter() 值，用于统计首次绘制耗时（可选）
+        request (dict): 启动参数（MSH 文件、算例目录、要执行的操作），见 single_instance.parse_gui_args（可选）
+        single_instance (bool): 是否监听本地套接字，接收再次启动的程序转交的参数
     """
-    app = QApplication([])
+    with startup_profile.measure("QApplication 创建"):
+        app = QApplication([])
+
+    instance_server = None
+    if single_instance:
+        from .single_instance import InstanceServer, forward_request
+
+        instance_server = InstanceServer(app)
+        if not instance_server.listen():
+            # 另一个实例在本程序检测之后抢先启动：把参数转交给它后退出
+            if forward_request(request or {}):
+                return
+            instance_server.listen(replace=True)
 
     # 设置应用程序图标
     if app_icon_path and os.path.exists(app_icon_path):
         app.setWindowIcon(QIcon(app_icon_path))
 
-    gui = PySide6GmshConverterGUI(update_func, app_icon_path)
-    gui.show()
+    with startup_profile.measure("主窗口构造"):
+        gui = PySide6GmshConverterGUI(update_func, app_icon_path, start_time)
+    with startup_profile.measure("主窗口显示 show"):
+        gui.show()
+    if instance_server is not None:
+        instance_server.request_received.connect(gui.handle_request)
+    if request and (request.get('msh') or request.get('case') or request.get('action')):
+        gui.handle_request(request)
     app.exec()
 
 
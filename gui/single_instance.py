@@ -0,0 +1,185 @@
+"""单实例模块
+
+图形界面只保留一个实例：再次启动（例如双击 .msh 文件或快捷方式）时，通过本地套接字把启动参数
+转交给已运行的实例后立即退出，已运行实例中的配置、已检测到的外部工具路径、HTML 缓存和 WSL 会话都可以直接复用。
+功能包括：
+- 解析图形界面模式的启动参数（MSH 文件、算例目录、要执行的操作）
+- 把启动参数转交给已运行的实例（QLocalSocket）
+- 在已运行的实例中监听本地套接字（QLocalServer），收到参数后通知主窗口
+
+转交参数时只加载 QtCore 和 QtNetwork，不创建 QApplication，也不加载 QtWidgets。
+通信格式为一行 UTF-8 编码的 JSON，已运行的实例收到后回复一行 "ok"。
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+# --- 配置部分 ---
+# 启动后可以自动执行的操作
+actions = ('convert', 'check', 'bind', 'pdf')
+
+# 连接已运行实例的超时时间（毫秒），超时视为没有实例在运行
+connect_timeout_ms = 300
+
+# 等待已运行实例回复的超时时间（毫秒）
+reply_timeout_ms = 2000
+
+# 已运行实例收到参数后的回复
+reply_ok = b'ok\n'
+
+
+def get_server_name():
+    """
+    获取本地套接字的名称
+
+    每个用户的每个程序目录对应一个名称，源码运行和打包后的程序互不影响
+
+    Returns:
+        str: 本地套接字名称
+    """
+    if getattr(sys, 'frozen', False):
+        root_dir = os.path.dirname(sys.executable)
+    else:
+        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    user = os.environ.get('USERNAME') or os.environ.get('USER') or ''
+    digest = hashlib.sha1(f"{user}|{os.path.normcase(root_dir)}".encode('utf-8')).hexdigest()[:12]
+    return f"JDFOAM-{digest}"
+
+
+def parse_gui_args(argv):
+    """
+    解析图形界面模式的启动参数
+
+    位置参数可以是 .msh 文件或算例目录（双击文件、拖放到程序图标上时传入）；
+    路径转换为绝对路径，转交给工作目录不同的已运行实例后仍然有效。
+
+    Args:
+        argv (list): 不含程序名的命令行参数
+
+    Returns:
+        dict: 启动参数，包含 msh、case、action（未指定时为空字符串）和 new_instance
+    """
+    parser = argparse.ArgumentParser(prog='JDFOAM', description="JDFOAM 图形界面")
+    parser.add_argument('paths', nargs='*', help=".msh 文件或算例目录")
+    parser.add_argument('--msh', default='', help="MSH 文件路径")
+    parser.add_argument('--case', default='', help="算例目录")
+    parser.add_argument('--action', choices=actions, help="启动后执行的操作")
+    parser.add_argument('--new-instance', action='store_true', help="启动新实例，不转交给已运行的实例")
+    args = parser.parse_args(argv)
+
+    msh, case = args.msh, args.case
+    for path in args.paths:
+        if os.path.isdir(path):
+            case = path
+        else:
+            msh = path
+    return {
+        'msh': os.path.abspath(msh) if msh else '',
+        'case': os.path.abspath(case) if case else '',
+        'action': args.action or '',
+        'new_instance': args.new_instance,
+    }
+
+
+def forward_request(request):
+    """
+    把启动参数转交给已运行的实例
+
+    Args:
+        request (dict): parse_gui_args 返回的启动参数
+
+    Returns:
+        bool: 是否已由运行中的实例接收；没有实例在运行时为 False
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(get_server_name())
+    if not socket.waitForConnected(connect_timeout_ms):
+        return False
+    if sys.platform == 'win32':
+        # 允许已运行的实例把窗口切换到前台（Windows 只允许前台进程转让该权限）
+        import ctypes
+        ctypes.windll.user32.AllowSetForegroundWindow(-1)  # ASFW_ANY
+    data = {key: value for key, value in request.items() if key != 'new_instance'}
+    socket.write(json.dumps(data, ensure_ascii=False).encode('utf-8') + b'\n')
+    socket.waitForBytesWritten(reply_timeout_ms)
+    received = b''
+    while not received.endswith(b'\n') and socket.waitForReadyRead(reply_timeout_ms):
+        received += bytes(socket.readAll().data())
+    socket.disconnectFromServer()
+    return received == reply_ok
+
+
+class InstanceServer(QObject):
+    """单实例服务端
+
+    在已运行的实例中监听本地套接字，每收到一份启动参数就发出 request_received 信号。
+    """
+    request_received = Signal(dict)  # 收到的启动参数
+
+    def __init__(self, parent=None):
+        """
+        初始化单实例服务端
+
+        Args:
+            parent (QObject): 父对象（可选）
+        """
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        # 只允许当前用户连接
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self, replace=False):
+        """
+        开始监听
+
+        Args:
+            replace (bool): 名称已被占用时是否删除残留的套接字后重试；
+                调用方应先确认没有实例在运行（转交参数失败）
+
+        Returns:
+            bool: 是否监听成功
+        """
+        name = get_server_name()
+        if self.server.listen(name):
+            return True
+        if not replace:
+            return False
+        # 上次异常退出时残留的套接字文件（Unix）会使监听失败
+        QLocalServer.removeServer(name)
+        return self.server.listen(name)
+
+    def on_new_connection(self):
+        """接受新的连接"""
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def on_ready_read(self, socket):
+        """
+        读取一份完整的启动参数并回复
+
+        Args:
+            socket (QLocalSocket): 客户端连接
+        """
+        if not socket.canReadLine():
+            return
+        try:
+            request = json.loads(bytes(socket.readLine().data()).decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            socket.abort()
+            return
+        if not isinstance(request, dict):
+            socket.abort()
+            return
+        socket.write(reply_ok)
+        socket.flush()
+        self.request_received.emit(request)
@@ -8,13 +8,87 @@
 - 按钮样式动态调整
 - 主题状态持久化保存
 - Windows 标题栏主题切换
+
+每个主题的调色板和合并后的样式表（图标按钮、菜单栏）只生成一次，保存为主题包；
+切换主题时只设置一次应用程序级的调色板和样式表，由 Qt 一次性重新计算所有控件的样式。
 """
 
 import sys
+import time
 from PySide6.QtWidgets import QApplication, QStyleFactory
 from PySide6.QtGui import QColor, QPalette, QFont
 from PySide6.QtCore import Qt
 
+
+# --- 配置部分 ---
+# 跟随主题设置背景和边框的图标按钮（对象名）
+icon_button_names = ('case_browse_btn', 'msh_browse_btn', 'case_open_btn', 'msh_open_btn',
+                     'treefoam_btn', 'gmsh_btn')
+
+# 主题定义：调色板颜色、样式表颜色和字体大小
+theme_definitions = {
+    'light': {
+        # 浅色主题 - 使用 Fusion 样式，与 dark 模式保持一致的渲染
+        'palette': {
+            'Window': (240, 240, 240),              # 窗口背景色
+            'WindowText': Qt.GlobalColor.black,     # 窗口文本色
+            'Base': (255, 255, 255),                # 基础背景色
+            'AlternateBase': (245, 245, 245),       # 交替背景色
+            'ToolTipBase': (255, 255, 220),         # 工具提示背景色
+            'ToolTipText': Qt.GlobalColor.black,    # 工具提示文本色
+            'Text': Qt.GlobalColor.black,           # 文本色
+            'Button': (240, 240, 240),              # 按钮背景色
+            'ButtonText': Qt.GlobalColor.black,     # 按钮文本色
+            'BrightText': Qt.GlobalColor.red,       # 高亮文本色
+            'Link': (0, 0, 255),                    # 链接色
+            'Highlight': (0, 120, 215),             # 选中背景色
+            'HighlightedText': Qt.GlobalColor.white,  # 选中文本色
+        },
+        'style': {
+            'button': '#E0E0E0',          # 图标按钮背景色：浅灰色
+            'button_hover': '#D0D0D0',
+            'button_pressed': '#C0C0C0',
+            'border': '#BDBDBD',          # 按钮、菜单边框和菜单分隔线
+            'menubar': '#F0F0F0',
+            'menu': 'white',
+            'text': 'black',
+        },
+        'font_point_size': 10,            # 与 UI 文件中的字体大小一致
+    },
+    'dark': {
+        # 深色主题 - 使用Fusion样式作为基础
+        'palette': {
+            'Window': (53, 53, 53),                 # 窗口背景色：深灰色
+            'WindowText': Qt.GlobalColor.white,     # 窗口文本色：白色
+            'Base': (25, 25, 25),                   # 基础背景色：更深灰色
+            'AlternateBase': (53, 53, 53),          # 交替背景色：深灰色
+            'ToolTipBase': (53, 53, 53),            # 工具提示背景色：深灰色
+            'ToolTipText': Qt.GlobalColor.white,    # 工具提示文本色：白色
+            'Text': Qt.GlobalColor.white,           # 文本色：白色
+            'Button': (53, 53, 53),                 # 按钮背景色：深灰色
+            'ButtonText': Qt.GlobalColor.white,     # 按钮文本色：白色
+            'BrightText': Qt.GlobalColor.red,       # 高亮文本色：红色
+            'Link': (42, 130, 218),                 # 链接色：蓝色
+            'Highlight': (42, 130, 218),            # 选中背景色：蓝色
+            'HighlightedText': Qt.GlobalColor.black,  # 选中文本色：黑色
+            'PlaceholderText': (150, 150, 150),     # 占位符文本色：浅灰色
+        },
+        'style': {
+            'button': '#3D3D3D',          # 图标按钮背景色：深灰色
+            'button_hover': '#4D4D4D',
+            'button_pressed': '#2D2D2D',
+            'border': '#555555',          # 按钮、菜单边框和菜单分隔线
+            'menubar': '#3D3D3D',
+            'menu': '#3D3D3D',
+            'text': 'white',
+        },
+        'font_point_size': None,          # 不修改字体
+    },
+}
+
+# 已生成的主题包：主题名称 -> ThemeBundle
+_bundles = {}
+
 # Windows 标题栏主题支持
 if sys.platform == "win32":
     try:
@@ -76,6 +150,7 @@ class ThemeManager:
         self.parent = parent_window      # 父窗口引用
         self.current_theme = "light"     # 当前主题，默认为浅色
         self._original_style = None      # 保存原始样式名称
+        self.last_apply_ms = 0.0         # 最近一次应用主题的耗时（毫秒）
 
     def set_windows_titlebar_theme(self, theme):
         """
@@ -225,257 +300,162 @@ class ThemeManager:
         """
         应用主题样式到整个应用程序
 
-        根据指定主题设置应用程序的调色板和样式
+        使用预先生成的主题包，只做一次应用程序级的调色板和样式表设置，
+        由 Qt 统一重新计算所有控件的样式，不逐个控件刷新，也不处理事件。
+        耗时记录在 last_apply_ms 中。
 
         Args:
             theme (str): 主题名称，"light" 或 "dark"
         """
+        start = time.perf_counter()
         # 获取当前运行的QApplication实例
         app = QApplication.instance()
+        bundle = get_theme_bundle(theme)
 
-        # 首次调用时保存原始样式名称
+        # 首次调用时保存原始样式名称，并切换到 Fusion 样式（两个主题相同，之后不再切换）
         if self._original_style is None:
             self._original_style = app.style().objectName()
-
-        if theme == "light":
-            # 浅色主题 - 使用 Fusion 样式，与 dark 模式保持一致的渲染
             app.setStyle("Fusion")
-
-            # 创建浅色调色板
-            palette = QPalette()
-            palette.setColor(QPalette.ColorRole.Window, QColor(240, 240, 240))          # 窗口背景色
-            palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.black)        # 窗口文本色
-            palette.setColor(QPalette.ColorRole.Base, QColor(255, 255, 255))            # 基础背景色
-            palette.setColor(QPalette.ColorRole.AlternateBase, QColor(245, 245, 245))   # 交替背景色
-            palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(255, 255, 220))     # 工具提示背景色
-            palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.black)       # 工具提示文本色
-            palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.black)              # 文本色
-            palette.setColor(QPalette.ColorRole.Button, QColor(240, 240, 240))          # 按钮背景色
-            palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.black)        # 按钮文本色
-            palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)          # 高亮文本色
-            palette.setColor(QPalette.ColorRole.Link, QColor(0, 0, 255))                # 链接色
-            palette.setColor(QPalette.ColorRole.Highlight, QColor(0, 120, 215))         # 选中背景色
-            palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.white)   # 选中文本色
-
-            app.setPalette(palette)
-
-            # 设置统一的字体，确保与 dark 模式一致
+            # 图标按钮在界面文件中带有自己的样式表，会覆盖应用程序级的样式表，清除后由主题包统一设置
+            for name in icon_button_names:
+                button = getattr(self.parent, name, None)
+                if button is not None:
+                    button.setStyleSheet("")
+
+        # 设置统一的字体（只有浅色主题设置，与界面文件中的字体大小一致）
+        if bundle.font_point_size and app.font().pointSize() != bundle.font_point_size:
             font = app.font()
-            font.setPointSize(10)  # 与 UI 文件中的字体大小一致
+            font.setPointSize(bundle.font_point_size)
             app.setFont(font)
-        elif theme == "dark":
-            # 深色主题 - 使用Fusion样式作为基础
-            app.setStyle("Fusion")
 
-            # 创建深色调色板
-            palette = QPalette()
-            palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))             # 窗口背景色：深灰色
-            palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)        # 窗口文本色：白色
-            palette.setColor(QPalette.ColorRole.Base, QColor(25, 25, 25))               # 基础背景色：更深灰色
-            palette.setColor(QPalette.ColorRole.AlternateBase, QColor(53, 53, 53))      # 交替背景色：深灰色
-            palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(53, 53, 53))        # 工具提示背景色：深灰色
-            palette.setColor(QPalette.ColorRole.ToolTipText, Qt.GlobalColor.white)       # 工具提示文本色：白色
-            palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)              # 文本色：白色
-            palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))             # 按钮背景色：深灰色
-            palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)        # 按钮文本色：白色
-            palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.red)          # 高亮文本色：红色
-            palette.setColor(QPalette.ColorRole.Link, QColor(42, 130, 218))             # 链接色：蓝色
-            palette.setColor(QPalette.ColorRole.Highlight, QColor(42, 130, 218))        # 选中背景色：蓝色
-            palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.black)   # 选中文本色：黑色
-            palette.setColor(QPalette.ColorRole.PlaceholderText, QColor(150, 150, 150))  # 占位符文本色：浅灰色
-
-            # 应用调色板到应用程序
-            app.setPalette(palette)
-
-        # 强制刷新所有控件，确保主题更改立即生效
-        # 使用多次刷新确保样式完全更新
-        app.processEvents()
-        for widget in QApplication.allWidgets():
-            widget.style().unpolish(widget)  # 取消现有样式
-            widget.style().polish(widget)    # 应用新样式
-            widget.update()                  # 更新界面
-
-        # 再次处理事件，确保所有更新都完成
-        app.processEvents()
-
-        # 更新按钮图标颜色
-        self.update_button_icons(theme)
-
-        # 重新应用进度条样式
-        if hasattr(self.parent, 'progressbar_manager'):
-            self.parent.progressbar_manager.apply_progress_bar_style()
-
-        # 最后再次刷新，确保图标颜色更新生效
-        app.processEvents()
-        for widget in QApplication.allWidgets():
-            widget.update()
+        app.setPalette(bundle.palette)
+        app.setStyleSheet(bundle.style_sheet)
+        self.last_apply_ms = (time.perf_counter() - start) * 1000
 
         # 延迟设置 Windows 标题栏主题，确保窗口完全显示后再设置
         # 使用 QTimer 单次触发，延迟 100ms 后设置标题栏主题
         from PySide6.QtCore import QTimer
         QTimer.singleShot(100, lambda: self.set_windows_titlebar_theme(theme))
 
-    def update_button_icons(self, theme):
-        """
-        更新按钮图标颜色
 
-        根据当前主题调整图标按钮的背景色和边框样式
+class ThemeBundle:
+    """主题包
+
+    一个主题预先生成的全部内容：调色板、合并后的应用程序级样式表（图标按钮和菜单栏）和字体大小。
+    """
+
+    def __init__(self, palette, style_sheet, font_point_size=None):
+        """
+        初始化主题包
 
         Args:
-            theme (str): 当前主题，"light" 或 "dark"
+            palette (QPalette): 调色板
+            style_sheet (str): 应用程序级样式表
+            font_point_size (int): 应用程序字体大小，None 表示不修改
         """
-        # 更新所有使用本地图标的按钮
-        # 这些按钮现在使用本地图片文件（search.png、open-folder.png）
-        # 本地图片的颜色是固定的，不会跟随主题变化
-        # 我们只需要设置背景色和边框，不设置 color 属性
-        icon_buttons = [
-            self.parent.case_browse_btn,   # search.png
-            self.parent.msh_browse_btn,    # search.png
-            self.parent.case_open_btn,     # open-folder.png
-            self.parent.msh_open_btn,      # open-folder.png
-            self.parent.treefoam_btn,      # TreeFoam.png
-            self.parent.gmsh_btn,          # gmsh.ico
-        ]
+        self.palette = palette
+        self.style_sheet = style_sheet
+        self.font_point_size = font_point_size
 
-        for btn in icon_buttons:
-            if btn:
-                if theme == "dark":
-                    # 深色主题：设置深灰色背景
-                    new_style = """
-QPushButton {
-    background-color: #3D3D3D;
-    border: 1px solid #555555;
-    border-radius: 6px;
-    padding: 5px 10px;
-    font-size: 10pt;
-}
-QPushButton:hover {
-    background-color: #4D4D4D;
-}
-QPushButton:pressed {
-    background-color: #2D2D2D;
-    padding-top: 3px;
-}
-"""
-                else:
-                    # 浅色主题：设置浅灰色背景
-                    new_style = """
-QPushButton {
-    background-color: #E0E0E0;
-    border: 1px solid #BDBDBD;
-    border-radius: 6px;
-    padding: 5px 10px;
-    font-size: 10pt;
-}
-QPushButton:hover {
-    background-color: #D0D0D0;
-}
-QPushButton:pressed {
-    background-color: #C0C0C0;
-    padding-top: 3px;
-}
-"""
 
-                btn.setStyleSheet(new_style)  # 应用新样式
-                # 强制刷新按钮样式
-                btn.style().unpolish(btn)  # 取消现有样式
-                btn.style().polish(btn)    # 应用新样式
-                btn.update()               # 更新界面
+def build_palette(colors):
+    """
+    按颜色表创建调色板
 
-        # 刷新主窗口样式
-        self.parent.style().unpolish(self.parent)  # 取消现有样式
-        self.parent.style().polish(self.parent)    # 应用新样式
-        self.parent.update()                       # 更新界面
+    Args:
+        colors (dict): 颜色角色名称 -> 颜色（RGB 元组或 Qt.GlobalColor）
 
-        # 设置菜单栏样式
-        self.apply_menu_style(theme)
+    Returns:
+        QPalette: 调色板
+    """
+    palette = QPalette()
+    for role, color in colors.items():
+        palette.setColor(getattr(QPalette.ColorRole, role),
+                         QColor(*color) if isinstance(color, tuple) else color)
+    return palette
 
-    def apply_menu_style(self, theme):
-        """
-        应用菜单栏样式
 
-        根据主题设置菜单栏和菜单项的样式，使用 VS Code 蓝色作为选中背景色
+def build_style_sheet(colors):
+    """
+    生成合并后的应用程序级样式表
 
-        Args:
-            theme (str): 当前主题，"light" 或 "dark"
-        """
-        if theme == "dark":
-            # Dark 模式菜单样式
-            menu_style = """
-QMenuBar {
-    background-color: #3D3D3D;
-    color: white;
-    border-bottom: 1px solid #555555;
-    font-size: 10pt;
-}
-QMenuBar::item {
-    background-color: transparent;
+    图标按钮用对象名选择，菜单只匹配菜单栏下的菜单，与原先分别设置在按钮和菜单栏上的样式范围相同
+
+    Args:
+        colors (dict): 样式表颜色
+
+    Returns:
+        str: 样式表
+    """
+    buttons = ", ".join(f"QPushButton#{name}" for name in icon_button_names)
+    hover = ", ".join(f"QPushButton#{name}:hover" for name in icon_button_names)
+    pressed = ", ".join(f"QPushButton#{name}:pressed" for name in icon_button_names)
+    return f"""
+{buttons} {{
+    background-color: {colors['button']};
+    border: 1px solid {colors['border']};
+    border-radius: 6px;
     padding: 5px 10px;
     font-size: 10pt;
-}
-QMenuBar::item:selected {
-    background-color: #007ACC;  /* VS Code 蓝色 */
-    color: white;
-}
-QMenu {
-    background-color: #3D3D3D;
-    color: white;
-    border: 1px solid #555555;
-    font-size: 10pt;
-}
-QMenu::item {
-    padding: 5px 30px 5px 20px;
-    font-size: 10pt;
-}
-QMenu::item:selected {
-    background-color: #007ACC;  /* VS Code 蓝色 */
-    color: white;
-}
-QMenu::separator {
-    height: 2px;
-    background-color: #555555;
-    margin: 4px 8px;
-}
-"""
-        else:
-            # Light 模式菜单样式
-            menu_style = """
-QMenuBar {
-    background-color: #F0F0F0;
-    color: black;
-    border-bottom: 1px solid #BDBDBD;
+}}
+{hover} {{
+    background-color: {colors['button_hover']};
+}}
+{pressed} {{
+    background-color: {colors['button_pressed']};
+    padding-top: 3px;
+}}
+QMenuBar {{
+    background-color: {colors['menubar']};
+    color: {colors['text']};
+    border-bottom: 1px solid {colors['border']};
     font-size: 10pt;
-}
-QMenuBar::item {
+}}
+QMenuBar::item {{
     background-color: transparent;
     padding: 5px 10px;
     font-size: 10pt;
-}
-QMenuBar::item:selected {
+}}
+QMenuBar::item:selected {{
     background-color: #007ACC;  /* VS Code 蓝色 */
     color: white;
-}
-QMenu {
-    background-color: white;
-    color: black;
-    border: 1px solid #BDBDBD;
+}}
+QMenuBar QMenu {{
+    background-color: {colors['menu']};
+    color: {colors['text']};
+    border: 1px solid {colors['border']};
     font-size: 10pt;
-}
-QMenu::item {
+}}
+QMenuBar QMenu::item {{
     padding: 5px 30px 5px 20px;
     font-size: 10pt;
-}
-QMenu::item:selected {
+}}
+QMenuBar QMenu::item:selected {{
     background-color: #007ACC;  /* VS Code 蓝色 */
     color: white;
-}
-QMenu::separator {
+}}
+QMenuBar QMenu::separator {{
     height: 2px;
-    background-color: #BDBDBD;
+    background-color: {colors['border']};
     margin: 4px 8px;
-}
+}}
 """
 
-        # 应用样式到菜单栏
-        if hasattr(self.parent, 'menubar'):
-            self.parent.menubar.setStyleSheet(menu_style)
\ No newline at end of file
+
+def get_theme_bundle(theme):
+    """
+    获取主题包，每个主题只生成一次
+
+    Args:
+        theme (str): 主题名称，"light" 或 "dark"；其他名称按浅色主题处理
+
+    Returns:
+        ThemeBundle: 主题包
+    """
+    theme = theme if theme in theme_definitions else "light"
+    if theme not in _bundles:
+        definition = theme_definitions[theme]
+        _bundles[theme] = ThemeBundle(build_palette(definition['palette']),
+                                      build_style_sheet(definition['style']),
+                                      definition['font_point_size'])
+    return _bundles[theme]
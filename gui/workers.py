@@ -0,0 +1,169 @@
+"""后台任务线程模块
+
+该模块提供在后台线程中执行源码合并、网格转换等耗时操作的线程类，
+避免阻塞 GUI 线程，并通过信号与主窗口通信。
+功能包括：
+- 在后台线程中扫描目录（或 git 变更文件）并合并源码为 Markdown
+- 在后台线程中执行网格转换
+- 日志、进度和完成状态通知
+- 实时推送已写入的目录条目
+- 支持中途取消
+"""
+
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+
+def make_progress_callback(signal):
+    """
+    创建只在进度值变化时发送信号的进度回调
+
+    功能模块可能在每个文件、每一页后报告进度，多数调用的百分比与上次相同；
+    跳过这些调用后每个任务最多跨线程发送约 100 个进度信号，不丢失任何变化。
+
+    Args:
+        signal: 进度信号（SignalInstance），参数为 0-100 的整数
+
+    Returns:
+        callable: 进度回调函数
+    """
+    last = [None]
+
+    def callback(value):
+        if value != last[0]:
+            last[0] = value
+            signal.emit(value)
+
+    return callback
+
+
+class BinderThread(QThread):
+    """源码合并线程
+
+    在后台线程中执行 bind_project（扫描目录后合并为 Markdown），
+    提供信号机制与主线程通信：
+    - log_signal: 发送日志消息
+    - progress_signal: 发送进度更新
+    - toc_signal: 发送新写入的目录条目列表 [(序号, 相对路径), ...]
+    - finished_signal: 发送完成状态和输出文件路径（失败时为错误信息）
+
+    取消通过 QThread.requestInterruption() 发起，合并过程在每个读取事件之间检查，
+    取消后原有的输出文件保持不变。
+    """
+    log_signal = Signal(str)             # 日志信号
+    progress_signal = Signal(int)        # 进度信号 (0-100)
+    toc_signal = Signal(list)            # 目录条目信号
+    finished_signal = Signal(bool, str)  # 完成信号，发送成功状态和输出路径或错误信息
+
+    # 目录条目批量发送的最小间隔（秒），避免逐条发送信号淹没事件循环
+    toc_interval = 0.1
+
+    def __init__(self, dir_path, md_path, config_manager):
+        """
+        初始化源码合并线程
+
+        Args:
+            dir_path (str): 项目根目录或 zip / tar 归档
+            md_path (str): Markdown 输出文件路径
+            config_manager (ConfigManager): 配置管理器，用于读取 [Binder] 配置
+        """
+        super().__init__()
+        self.dir_path = dir_path                # 项目根目录
+        self.md_path = md_path                  # 输出文件路径
+        self.config_manager = config_manager    # 配置管理器
+        self._toc_batch = []                    # 尚未发送的目录条目
+        self._toc_time = 0.0                    # 上次发送目录条目的时间
+
+    def cancel(self):
+        """请求取消当前合并任务"""
+        self.requestInterruption()
+
+    def add_toc_entry(self, number, rel_path):
+        """
+        缓存一个目录条目，按时间间隔批量发送
+
+        Args:
+            number (int): 章节序号
+            rel_path (str): 文件相对路径
+        """
+        self._toc_batch.append((number, rel_path))
+        now = time.monotonic()
+        if now - self._toc_time >= self.toc_interval:
+            self.flush_toc()
+            self._toc_time = now
+
+    def flush_toc(self):
+        """发送所有缓存的目录条目"""
+        if self._toc_batch:
+            self.toc_signal.emit(self._toc_batch)
+            self._toc_batch = []
+
+    def run(self):
+        """执行线程主任务
+
+        扫描目录并合并为 Markdown，通过信号报告日志、进度、目录和结果
+        """
+        try:
+            # 源码合并模块在第一次合并时才导入，不拖慢程序启动
+            from function.SourceCodeBinder import bind_project
+
+            success = bind_project(self.dir_path, self.md_path, self.config_manager,
+                                   log_callback=self.log_signal.emit,
+                                   progress_callback=make_progress_callback(self.progress_signal),
+                                   cancel_callback=self.isInterruptionRequested,
+                                   toc_callback=self.add_toc_entry)
+            self.flush_toc()
+            self.finished_signal.emit(success, self.md_path if success else "")
+        except Exception as e:
+            self.finished_signal.emit(False, str(e))
+
+
+class WorkerThread(QThread):
+    """网格转换线程
+
+    在后台线程中执行网格转换，避免阻塞 GUI 线程，提供信号机制与主线程通信：
+    - log_signal: 发送日志消息
+    - progress_signal: 发送进度更新
+    - finished_signal: 发送完成状态
+    """
+    # 定义线程间通信的信号
+    log_signal = Signal(str)          # 日志信号，用于发送日志消息
+    progress_signal = Signal(int)     # 进度信号，用于发送进度值 (0-100)
+    finished_signal = Signal(bool, str)  # 完成信号，发送成功状态和错误信息
+
+    def __init__(self, update_func, msh_path, case_path, env_source=None):
+        """
+        初始化工作线程
+
+        Args:
+            update_func (callable): 网格更新函数
+            msh_path (str): MSH 文件路径
+            case_path (str): 算例目录路径
+            env_source (str): OpenFOAM 环境源路径
+        """
+        super().__init__()
+        self.update_func = update_func  # 网格更新函数
+        self.msh_path = msh_path        # MSH 文件路径
+        self.case_path = case_path      # 算例目录路径
+        self.env_source = env_source    # OpenFOAM 环境源路径
+
+    def run(self):
+        """执行线程主任务
+
+        在后台线程中执行网格转换操作，并通过信号与主线程通信
+        """
+        try:
+            # 执行网格更新函数，传入信号发射器作为回调
+            success = self.update_func(
+                self.msh_path,           # MSH 文件路径
+                self.case_path,          # 算例目录路径
+                logger=self.log_signal.emit,           # 日志回调
+                env_source=self.env_source,            # 环境变量
+                progress_callback=make_progress_callback(self.progress_signal)  # 进度回调（只发送变化的值）
+            )
+            # 发送完成信号，表示操作成功
+            self.finished_signal.emit(success, "")
+        except Exception as e:
+            # 发送完成信号，表示操作失败
+            self.finished_signal.emit(False, str(e))
@@ -0,0 +1,70 @@
+"""归档扫描测试"""
+
+import io
+import os
+import sys
+import tarfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.archive import ArchiveSource  # noqa: E402
+from function.SourceCodeBinder import find_duplicates, scan_directory  # noqa: E402
+
+
+def write_tar(path, members):
+    """按给定顺序写入 tar.gz 归档，members 为 [(成员名, 内容), ...]"""
+    with tarfile.open(path, 'w:gz') as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def list_names(path):
+    """列出归档中文件的相对路径"""
+    source = ArchiveSource(str(path))
+    try:
+        return [name for name, _ in source.list_files()]
+    finally:
+        source.close()
+
+
+def test_strips_only_top_directory_named_like_archive(tmp_path):
+    write_tar(tmp_path / 'case.tar.gz', [('case/system/controlDict', b'a'), ('case/0/U', b'b')])
+    with zipfile.ZipFile(tmp_path / 'project.zip', 'w') as archive:
+        archive.writestr('src/m26.py', 'x = 1\n')
+    assert list_names(tmp_path / 'case.tar.gz') == ['system/controlDict', '0/U']
+    assert list_names(tmp_path / 'project.zip') == ['src/m26.py']
+
+
+def test_scan_applies_ignore_files_and_skips_outputs(tmp_path):
+    archive = tmp_path / 'proj.tar.gz'
+    write_tar(archive, [
+        ('./src/main.py', b'print(1)\n'),
+        ('./src/.gitignore', b'gen/\n'),
+        ('./src/gen/out.py', b'x = 1\n'),
+        ('./.gitignore', b'*.log\n'),
+        ('./run.log', b'log\n'),
+        ('./proj_source_code.md.htmlcache/0001.html', b'<p></p>\n'),
+        ('./docs/proj_source_code.md', b'# old\n'),
+    ])
+    files = scan_directory(str(archive))
+    assert [rel_path for _, rel_path, _ in files] == ['src/main.py', 'src/.gitignore', '.gitignore']
+
+
+def test_duplicates_are_read_in_archive_order(tmp_path):
+    archive = tmp_path / 'proj.tar.gz'
+    # 大小分组的顺序（先 b 组后 a 组）与归档顺序不同
+    write_tar(archive, [('a1.py', b'aa\n'), ('b1.py', b'b\n'), ('a2.py', b'aa\n'), ('b2.py', b'b\n')])
+    source = ArchiveSource(str(archive))
+    try:
+        files = [(full_path, rel_path, '.py') for rel_path, full_path in source.list_files()]
+        opened = []
+        original_open = source.open
+        source.open = lambda full_path: opened.append(full_path) or original_open(full_path)
+        duplicates, _ = find_duplicates(files, source=source)
+    finally:
+        source.close()
+    assert duplicates == {2: 0, 3: 1}
+    assert opened == [full_path for full_path, _, _ in files]
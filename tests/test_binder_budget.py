@@ -0,0 +1,71 @@
+"""源码合并的大小预算和 OpenFOAM 列表折叠测试"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.SourceCodeBinder import ListCollapser, combine_files_to_markdown  # noqa: E402
+
+
+foam_header = """FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       volVectorField;
+    object      U;
+}
+dimensions      [0 1 -1 0 0 0 0];
+
+"""
+
+
+def vector_list(count):
+    """生成 count 个元素的 nonuniform List<vector>"""
+    return f"nonuniform List<vector>\n{count}\n(\n" + ''.join(f"({i} 0 0)\n" for i in range(count)) + ")\n"
+
+
+def bind(tmp_path, text, **kwargs):
+    """合并单个 0/U 文件，返回生成的 Markdown"""
+    case = tmp_path / 'case'
+    (case / '0').mkdir(parents=True)
+    (case / '0' / 'U').write_text(text)
+    output = tmp_path / 'case_source_code.md'
+    assert combine_files_to_markdown([(str(case / '0' / 'U'), '0/U', '')], str(output), str(case),
+                                     use_cache=False, **kwargs)
+    return output.read_text(encoding='utf-8')
+
+
+def test_collapser_across_chunks():
+    collapser = ListCollapser()
+    text = "a nonuniform List<scalar> 4\n(\n1\n2\n3\n4\n)\n;\nb\n"
+    out = ''.join(collapser.feed(text[i:i + 5]) for i in range(0, len(text), 5)) + collapser.finish()
+    assert out.startswith("a nonuniform List<scalar> 4\n(\n    // ... 已折叠 4 个元素 ...\n)")
+    assert out.endswith(";\nb\n")
+    assert collapser.collapsed == 1
+
+
+def test_large_internal_field_is_bounded(tmp_path):
+    text = foam_header + "internalField   " + vector_list(200000) + ";\n\nboundaryField\n{\n}\n"
+    markdown = bind(tmp_path, text, file_budget=512 * 1024, collapse_lists=True)
+    assert len(markdown.encode('utf-8')) < 4 * 1024
+    assert '已折叠 200000 个元素' in markdown
+    assert '(179841 0 0)' not in markdown
+    assert 'boundaryField' in markdown
+
+
+def test_tail_starting_inside_a_list(tmp_path):
+    # 结尾片段落在边界条件的列表中间，残留的元素行不应出现在输出中
+    text = (foam_header + "internalField   uniform (0 0 0);\n\nboundaryField\n{\n    inlet\n    {\n"
+            "        type fixedValue;\n        value " + vector_list(100000) + "        ;\n    }\n}\n")
+    markdown = bind(tmp_path, text, file_budget=64 * 1024, collapse_lists=True)
+    assert len(markdown.encode('utf-8')) < 4 * 1024
+    assert '(99999 0 0)' not in markdown
+    assert markdown.count('\n)\n') == 1
+
+
+def test_budget_without_collapsing(tmp_path):
+    text = foam_header + "internalField   " + vector_list(200000) + ";\n"
+    markdown = bind(tmp_path, text, file_budget=64 * 1024, collapse_lists=False)
+    assert len(markdown.encode('utf-8')) < 64 * 1024 + 2048
+    assert '[已省略' in markdown
@@ -0,0 +1,63 @@
+"""源码合并的增量缓存测试"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.SourceCodeBinder import combine_files_to_markdown, get_manifest_path, scan_directory  # noqa: E402
+
+
+def bind(root, output):
+    """合并 root 下的文件，返回日志"""
+    messages = []
+    assert combine_files_to_markdown(scan_directory(str(root)), str(output), str(root),
+                                     log_callback=messages.append, part_bytes=0)
+    return messages
+
+
+def body(output):
+    """去掉生成时间行后的文档内容"""
+    return ''.join(line for line in output.read_text(encoding='utf-8').splitlines(True) if '生成时间' not in line)
+
+
+def test_unchanged_files_are_reused(tmp_path):
+    root = tmp_path / 'demo'
+    (root / 'src').mkdir(parents=True)
+    for name in ('a', 'b', 'c'):
+        (root / 'src' / f'{name}.py').write_text(f'{name} = 1\n')
+    output = root / 'demo_source_code.md'
+
+    assert '♻️ 复用 0 个未变化文件，重新渲染 3 个文件' in bind(root, output)
+    assert os.path.exists(get_manifest_path(str(output)))
+    first = body(output)
+    assert '♻️ 复用 3 个未变化文件，重新渲染 0 个文件' in bind(root, output)
+    assert body(output) == first
+
+    (root / 'src' / 'b.py').write_text('b = 22\n')
+    assert '♻️ 复用 2 个未变化文件，重新渲染 1 个文件' in bind(root, output)
+    assert 'b = 22' in body(output) and 'b = 1\n' not in body(output)
+
+
+def test_new_file_renumbers_reused_sections(tmp_path):
+    root = tmp_path / 'demo'
+    root.mkdir()
+    (root / 'b.py').write_text('b = 1\n')
+    output = root / 'demo_source_code.md'
+    bind(root, output)
+    (root / 'a.py').write_text('a = 1\n')
+    assert '♻️ 复用 1 个未变化文件，重新渲染 1 个文件' in bind(root, output)
+    text = body(output)
+    assert '## 1. a.py' in text and '## 2. b.py' in text
+
+
+def test_edited_output_discards_manifest(tmp_path):
+    root = tmp_path / 'demo'
+    root.mkdir()
+    (root / 'a.py').write_text('a = 1\n')
+    output = root / 'demo_source_code.md'
+    bind(root, output)
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('手动修改\n')
+    assert '♻️ 复用 0 个未变化文件，重新渲染 1 个文件' in bind(root, output)
+    assert '手动修改' not in body(output)
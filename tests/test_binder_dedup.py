@@ -0,0 +1,67 @@
+"""源码合并的内容去重测试"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.SourceCodeBinder import (combine_files_to_markdown, find_duplicates, list_part_paths,  # noqa: E402
+                                      scan_directory)
+
+
+def make_project(root):
+    """a.py 和 sub/c.py 内容相同，b.py 大小相同但内容不同"""
+    (root / 'sub').mkdir(parents=True)
+    (root / 'a.py').write_text('x = 1\n')
+    (root / 'b.py').write_text('x = 2\n')
+    (root / 'sub' / 'c.py').write_text('x = 1\n')
+    (root / 'd.py').write_text('y = 10\n')
+
+
+def test_find_duplicates(tmp_path):
+    make_project(tmp_path)
+    files = scan_directory(str(tmp_path))
+    assert [rel_path for _, rel_path, _ in files] == ['a.py', 'b.py', 'd.py', 'sub/c.py']
+    duplicates, hashes = find_duplicates(files)
+    assert duplicates == {3: 0}
+    # 大小唯一的文件不计算哈希
+    assert 2 not in hashes
+    assert find_duplicates(files, max_bytes=5) == ({}, {})
+
+
+def test_duplicate_links_to_first_copy(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root)
+    output = root / 'demo_source_code.md'
+    messages = []
+    assert combine_files_to_markdown(scan_directory(str(root)), str(output), str(root),
+                                     log_callback=messages.append, part_bytes=0, dedup=True)
+    text = output.read_text(encoding='utf-8')
+    assert '🔁 1 个文件与已嵌入文件内容相同，节省 6 B' in messages
+    assert text.count('x = 1') == 1
+    assert '> 🔁 内容与 [a.py](#file-apy) 相同（6 B），不再重复嵌入' in text
+    assert '<a name="file-apy"></a>' in text
+
+
+def test_duplicate_links_across_parts(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root)
+    (root / 'big.py').write_text('z = 0\n' * 200)
+    output = root / 'demo_source_code.md'
+    assert combine_files_to_markdown(scan_directory(str(root)), str(output), str(root),
+                                     part_bytes=1000, dedup=True)
+    parts = list_part_paths(str(output))
+    assert len(parts) > 1
+    with open(parts[-1], encoding='utf-8') as f:
+        last = f.read()
+    assert '## 5. sub/c.py' in last
+    assert '[a.py](demo_source_code.part001.md#file-apy)' in last
+
+
+def test_dedup_disabled(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root)
+    output = root / 'demo_source_code.md'
+    assert combine_files_to_markdown(scan_directory(str(root)), str(output), str(root),
+                                     part_bytes=0, dedup=False)
+    assert output.read_text(encoding='utf-8').count('x = 1') == 2
@@ -0,0 +1,100 @@
+"""源码合并的 HTML、JSONL 输出测试"""
+
+import json
+import os
+import sys
+from html.parser import HTMLParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.SourceCodeBinder import combine_files_to_markdown, scan_directory  # noqa: E402
+
+
+class CodeCollector(HTMLParser):
+    """收集 HTML 中各个 <code class="language-..."> 代码块的文本和页内锚点"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+        self.ids = set()
+        self.hrefs = []
+        self.in_code = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if 'id' in attrs:
+            self.ids.add(attrs['id'])
+        if tag == 'a' and attrs.get('href', '').startswith('#'):
+            self.hrefs.append(attrs['href'][1:])
+        if tag == 'code' and attrs.get('class', '').startswith('language-'):
+            self.in_code = True
+            self.blocks.append('')
+
+    def handle_endtag(self, tag):
+        if tag == 'code':
+            self.in_code = False
+
+    def handle_data(self, data):
+        if self.in_code:
+            self.blocks[-1] += data
+
+
+def make_project(root):
+    """包含需要转义的字符、非 ASCII 字符和重复文件的项目"""
+    root.mkdir()
+    (root / 'a.py').write_text('if a < b and c > d:\n    s = "<tag> & \\"q\\""\n', encoding='utf-8')
+    (root / 'b.py').write_text('# 中文注释\nx = 1\n', encoding='utf-8')
+    (root / 'c.py').write_text('# 中文注释\nx = 1\n', encoding='utf-8')
+
+
+def bind(root, **kwargs):
+    """合并并同时输出 HTML 和 JSONL，返回输出文件的公共前缀"""
+    output = root / 'demo_source_code.md'
+    assert combine_files_to_markdown(scan_directory(str(root)), str(output), str(root), part_bytes=0,
+                                     formats=['html', 'jsonl'], dedup=True, **kwargs)
+    return root / 'demo_source_code'
+
+
+def read_output(path):
+    """读取输出文件，去掉生成时间行"""
+    with open(path, encoding='utf-8') as f:
+        return ''.join(line for line in f if '生成时间' not in line)
+
+
+def test_jsonl_records(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root)
+    stem = bind(root)
+    with open(f'{stem}.jsonl', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [r['path'] for r in records] == ['a.py', 'b.py', 'c.py']
+    assert records[0]['content'] == (root / 'a.py').read_text(encoding='utf-8')
+    assert records[0]['language'] == 'python'
+    assert records[1]['size'] == len((root / 'b.py').read_bytes())
+    assert records[1]['truncated'] is False
+    assert records[2]['duplicate_of'] == 'b.py' and 'content' not in records[2]
+    assert records[2]['hash'] == records[1]['hash']
+
+
+def test_html_escapes_code(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root)
+    stem = bind(root)
+    parser = CodeCollector()
+    parser.feed(read_output(f'{stem}.html'))
+    assert parser.blocks == [(root / 'a.py').read_text(encoding='utf-8'), (root / 'b.py').read_text(encoding='utf-8')]
+    # 目录、回到目录和重复文件的链接都指向存在的锚点
+    assert parser.hrefs and set(parser.hrefs) <= parser.ids
+
+
+def test_cached_sections_in_every_format(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root)
+    stem = bind(root)
+    first = {ext: read_output(f'{stem}.{ext}') for ext in ('html', 'jsonl')}
+    messages = []
+    bind(root, log_callback=messages.append)
+    # 重复文件的章节只有一行链接，总是重新生成
+    assert '♻️ 复用 2 个未变化文件，重新渲染 1 个文件' in messages
+    assert read_output(f'{stem}.jsonl') == first['jsonl']
+    assert read_output(f'{stem}.html') == first['html']
@@ -0,0 +1,58 @@
+"""源码合并的分卷输出测试"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.SourceCodeBinder import combine_files_to_markdown, list_part_paths, scan_directory  # noqa: E402
+
+
+def bind(root, output, part_bytes):
+    """合并 root 下的文件，返回日志"""
+    messages = []
+    assert combine_files_to_markdown(scan_directory(str(root)), str(output), str(root),
+                                     log_callback=messages.append, part_bytes=part_bytes)
+    return messages
+
+
+def make_project(root, count):
+    """生成 count 个大小约 600 B 的源码文件"""
+    root.mkdir()
+    for i in range(count):
+        (root / f'm{i}.py').write_text(f'v = {i}\n' * 100)
+
+
+def test_index_links_into_parts(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root, 5)
+    output = root / 'demo_source_code.md'
+    messages = bind(root, output, 1500)
+
+    parts = list_part_paths(str(output))
+    assert len(parts) > 1
+    assert f'📚 已拆分为 {len(parts)} 个分卷，索引文件: demo_source_code.md' in messages
+    index = output.read_text(encoding='utf-8')
+    # 索引只含分卷列表和目录，不含代码
+    assert 'v = 0' not in index
+    for part in parts:
+        assert f'({os.path.basename(part)})' in index
+        assert os.path.getsize(part) < 1500 + 1024
+    # 目录中的每个链接都指向分卷中存在的锚点
+    links = re.findall(r'\]\(([^)#]+)#(file-[^)]+)\)', index)
+    assert len(links) == 5
+    for name, anchor in links:
+        assert f'<a name="{anchor}"></a>' in (root / name).read_text(encoding='utf-8')
+
+
+def test_stale_parts_are_removed(tmp_path):
+    root = tmp_path / 'demo'
+    make_project(root, 5)
+    output = root / 'demo_source_code.md'
+    bind(root, output, 1500)
+    assert list_part_paths(str(output))
+
+    bind(root, output, 0)
+    assert list_part_paths(str(output)) == []
+    assert 'v = 4' in output.read_text(encoding='utf-8')
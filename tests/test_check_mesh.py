@@ -0,0 +1,71 @@
+"""checkMesh 输出解析测试"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.Gmsh2OpenFOAM import parse_check_mesh  # noqa: E402
+
+
+# checkMesh 输出样例（OpenFOAM v2306，节选）
+sample_log = """/*---------------------------------------------------------------------------*\\
+| =========                 |                                                 |
+| \\\\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |
+\\*---------------------------------------------------------------------------*/
+Create time
+
+Create mesh for time = 0
+
+Time = 0
+
+Mesh stats
+    points:           12831
+    faces:            36210
+    internal faces:   33390
+    cells:            11700
+    faces per cell:   5.94872
+    boundary patches: 4
+    point zones:      0
+    face zones:       0
+    cell zones:       0
+
+Checking geometry...
+    Overall domain bounding box (0 0 0) (0.1 0.1 0.01)
+    Max cell openness = 2.1684e-16 OK.
+    Max aspect ratio = 14.2857 OK.
+    Mesh non-orthogonality Max: 37.5214 average: 6.84372
+    Non-orthogonality check OK.
+    Face pyramids OK.
+    Max skewness = 0.823101 OK.
+    Coupled point location match (average 0) OK.
+
+Mesh OK.
+
+End
+"""
+
+
+def test_parse_check_mesh():
+    result = parse_check_mesh(sample_log)
+    assert result['cells'] == 11700
+    assert result['max_aspect_ratio'] == 14.2857
+    assert result['max_non_orthogonality'] == 37.5214
+    assert result['avg_non_orthogonality'] == 6.84372
+    assert result['max_skewness'] == 0.823101
+    assert result['failed_checks'] == 0
+    assert result['mesh_ok'] is True
+
+
+def test_parse_check_mesh_failed():
+    log = sample_log.replace("Mesh OK.", "Failed 2 mesh checks.")
+    result = parse_check_mesh(log)
+    assert result['failed_checks'] == 2
+    assert result['mesh_ok'] is False
+
+
+def test_parse_check_mesh_missing():
+    result = parse_check_mesh("")
+    assert result['cells'] is None
+    assert result['max_skewness'] is None
+    assert result['failed_checks'] == 0
@@ -0,0 +1,55 @@
+"""git 变更范围测试"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.gitdiff import collect_diffs, list_changed_files, unquote_path  # noqa: E402
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="需要 git")
+
+# 含空格、非 ASCII 字符和双引号的文件名
+names = ['plain.py', 'with space.py', '网格.py', 'say "hi".py']
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-C', str(repo), '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(args),
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    for name in names:
+        (tmp_path / name).write_text("a = 1\n" + "b = 0\n" * 10, encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'init')
+    for name in names:
+        (tmp_path / name).write_text("a = 2\n" + "b = 0\n" * 10, encoding='utf-8')
+    return tmp_path
+
+
+def test_unquote_path():
+    assert unquote_path('plain.py') == 'plain.py'
+    assert unquote_path('"b/\\347\\275\\221\\346\\240\\274.py"') == 'b/网格.py'
+    assert unquote_path('"b/say \\"hi\\".py"') == 'b/say "hi".py'
+
+
+def test_diff_keys_match_changed_files(repo):
+    diffs = collect_diffs(str(repo))
+    assert sorted(diffs) == list_changed_files(str(repo)) == sorted(names)
+    for name in names:
+        assert '+a = 2\n' in diffs[name]
+
+
+def test_renamed_file_with_space(repo):
+    git(repo, 'mv', 'with space.py', 'new name.py')
+    diffs = collect_diffs(str(repo))
+    assert 'new name.py' in diffs
+    assert 'with space.py' not in diffs
@@ -0,0 +1,50 @@
+"""HTML 片段缓存测试"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.htmlcache import FragmentCache  # noqa: E402
+
+
+def set_used(cache, key, when):
+    """把片段的最近使用时间设为 when（秒）"""
+    os.utime(cache.get_path(key), (when, when))
+
+
+def test_get_and_put(tmp_path):
+    cache = FragmentCache(str(tmp_path / 'cache'), 1024)
+    key = cache.get_key('## 1. a.py\n')
+    assert cache.get(key) is None
+    cache.put(key, '<h2>1. a.py</h2>\n')
+    assert cache.get(key) == '<h2>1. a.py</h2>\n'
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not [name for name in os.listdir(cache.cache_dir) if name.endswith('.tmp')]
+
+
+def test_settings_change_key(tmp_path):
+    text = '## 1. a.py\n'
+    assert FragmentCache(str(tmp_path), 0, 'x').get_key(text) != FragmentCache(str(tmp_path), 0, 'y').get_key(text)
+
+
+def test_evict_least_recently_used(tmp_path):
+    cache = FragmentCache(str(tmp_path / 'cache'), 250)
+    keys = [cache.get_key(str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, 'x' * 100)
+        set_used(cache, key, 1000 + i)
+    # 读取最旧的片段后它变为最近使用
+    assert cache.get(keys[0]) is not None
+    assert cache.evict() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert cache.evict() == 0
+
+
+def test_evict_ignores_other_files(tmp_path):
+    cache = FragmentCache(str(tmp_path / 'cache'), 0)
+    (tmp_path / 'cache' / 'notes.txt').write_text('x' * 100)
+    cache.put(cache.get_key('a'), 'x')
+    assert cache.evict() == 1
+    assert os.listdir(cache.cache_dir) == ['notes.txt']
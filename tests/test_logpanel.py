@@ -0,0 +1,39 @@
+"""日志行索引测试"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('PySide6')
+
+from gui.logpanel import LEVEL_ERROR, LEVEL_FATAL, LEVEL_NONE, LEVEL_WARNING, LogIndex  # noqa: E402
+
+
+def test_severity():
+    index = LogIndex()
+    index.append("Create time\n--> FOAM FATAL ERROR:\n*** Error in mesh\n  ***Number of severely non-orthogonal faces: 3")
+    index.append("Warning: 网格质量较差\nEnd")
+    assert list(index.severity) == [LEVEL_NONE, LEVEL_FATAL, LEVEL_ERROR, LEVEL_WARNING, LEVEL_WARNING, LEVEL_NONE]
+    assert index.at_least[LEVEL_WARNING] == [1, 2, 3, 4]
+    assert index.at_least[LEVEL_ERROR] == [1, 2]
+    assert index.at_least[LEVEL_FATAL] == [1]
+
+
+def test_severity_after_length_changing_lowercase():
+    # 'İ'.lower() 的长度为 2，后面各行的偏移不能按原始文本计算
+    index = LogIndex()
+    index.append("İ" * 20 + "\nrun failed\n" + "\n".join(["ok"] * 10))
+    assert index.at_least[LEVEL_ERROR] == [1]
+
+
+def test_incremental_search():
+    index = LogIndex()
+    index.append("Mesh OK\nmesh failed\ncells: 10")
+    assert index.search('MESH') == [0, 1]
+    assert index.search('mesh f') == [1]
+    index.append("Mesh again")
+    assert index.search('mesh') == [0, 1, 3]
+    assert index.search('') == []
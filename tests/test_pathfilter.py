@@ -0,0 +1,97 @@
+"""路径过滤规则与 git 忽略规则的一致性测试"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.pathfilter import PathMatcher, compile_rule, glob_to_regex  # noqa: E402
+
+
+gitignore = """\
+# 注释和空行被忽略
+
+*.log
+!keep.log
+build/
+/top.txt
+doc/**/*.tmp
+a?c.py
+[ab]x.py
+sub/
+\\#hash.py
+"""
+
+nested_gitignore = """\
+local.py
+/anchored.py
+!app.log
+"""
+
+files = [
+    'app.log', 'keep.log', 'build/keep.log', 'build/a.py', 'lib/build/b.py',
+    'top.txt', 'src/top.txt', 'doc/z.tmp', 'doc/x/y/z.tmp', 'other/doc/z.tmp',
+    'abc.py', 'abbc.py', 'ax.py', 'cx.py', '#hash.py',
+    'src/local.py', 'src/deep/local.py', 'src/anchored.py', 'src/deep/anchored.py',
+    'src/app.log', 'src/deep/app.log', 'src/sub/f.py', 'other/sub', 'main.py',
+]
+
+
+def walk(root):
+    """按扫描时的方式遍历：逐级读取忽略文件，剪枝被排除的目录"""
+    matcher = PathMatcher(case_sensitive=True)
+    kept = set()
+    for dir_path, dir_names, file_names in os.walk(root):
+        base = os.path.relpath(dir_path, root).replace(os.sep, '/')
+        base = '' if base == '.' else base
+        matcher.load_ignore_files(dir_path, base)
+        prefix = base + '/' if base else ''
+        dir_names[:] = [d for d in dir_names if d != '.git' and not matcher.is_excluded(prefix + d, is_dir=True)]
+        kept.update(prefix + f for f in file_names if not matcher.is_excluded(prefix + f))
+    return kept
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="需要 git")
+def test_matches_git(tmp_path):
+    for rel_path in files:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x\n')
+    (tmp_path / '.gitignore').write_text(gitignore)
+    (tmp_path / 'src' / '.gitignore').write_text(nested_gitignore)
+    subprocess.run(['git', 'init', '-q', str(tmp_path)], check=True)
+    result = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'], cwd=tmp_path,
+                            capture_output=True, text=True, check=True, env={**os.environ, 'GIT_CONFIG_NOSYSTEM': '1'})
+    expected = set(result.stdout.splitlines())
+    assert 'keep.log' in expected and 'src/deep/app.log' in expected
+    assert walk(str(tmp_path)) == expected
+
+
+def test_later_rule_wins():
+    matcher = PathMatcher(case_sensitive=True)
+    matcher.add_default_rule('*.txt')
+    matcher.add_ignore_lines(['!notes.txt'])
+    matcher.add_override_rule('notes.txt')
+    assert matcher.is_excluded('notes.txt')
+    assert matcher.match('main.py') is None
+    matcher.add_override_rule('!*.txt')
+    assert matcher.match('notes.txt') is False
+
+
+def test_dir_only_rule():
+    matcher = PathMatcher(case_sensitive=True)
+    matcher.add_default_rule('out/')
+    assert matcher.is_excluded('a/out', is_dir=True)
+    assert not matcher.is_excluded('a/out')
+
+
+def test_glob_to_regex():
+    assert glob_to_regex('*.py') == r'[^/]*\.py'
+    assert glob_to_regex('a/**/b') == r'a/(?:.*/)?b'
+    assert glob_to_regex('[!a]x') == r'[^a]x'
+    assert compile_rule('   ') is None
+    assert compile_rule('# comment') is None
@@ -0,0 +1,85 @@
+"""PDF 分段渲染测试"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('PySide6')
+pypdf = pytest.importorskip('pypdf')
+
+from function import pdfparts  # noqa: E402
+
+
+def write_document(path, names):
+    """写入与源码合并导出相同结构的 HTML：目录，之后每个文件一个章节"""
+    toc = ''.join(f'<li><a href="#file-{name}">{number}. {name}</a></li>\n' for number, name in enumerate(names, 1))
+    sections = ''.join(f'<p><a name="file-{name}"></a></p>\n<h2>{number}. {name}</h2>\n'
+                       + '<p>x</p>\n' * 60 + '<p><a href="#目录">回到目录</a></p>\n'
+                       for number, name in enumerate(names, 1))
+    path.write_text('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="UTF-8">\n</head>\n<body>\n'
+                    f'<h1>demo</h1>\n<p><a name="目录"></a></p>\n<h2>目录</h2>\n<ul>\n{toc}</ul>\n'
+                    f'{sections}</body>\n</html>\n', encoding='utf-8')
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    # 每个章节单独成段
+    monkeypatch.setattr(pdfparts, 'part_max_bytes', 1)
+
+
+def test_links_survive_merge(tmp_path, small_parts):
+    html_path = tmp_path / 'doc.html'
+    write_document(html_path, ['a', 'b', 'c'])
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    pdfparts.render_parts(str(html_path), str(tmp_path / 'doc.pdf'), 'qt', None, 1, str(work_dir))
+    reader = pypdf.PdfReader(str(tmp_path / 'doc.pdf'))
+    names = reader.named_destinations
+    links = [annot.get_object()['/Dest'] for page in reader.pages for annot in page.get('/Annots') or ()]
+    assert {'目录', 'file-a', 'file-b', 'file-c'} <= set(names)
+    assert sorted(links) == ['file-a', 'file-b', 'file-c', '目录', '目录', '目录']
+
+
+def test_html_chunks_split_at_sections(tmp_path, monkeypatch):
+    html_path = tmp_path / 'doc.html'
+    write_document(html_path, ['a', 'b', 'c', 'd'])
+    chunks = list(pdfparts.iter_html_chunks(str(html_path), 1500))
+    assert len(chunks) > 1
+    assert chunks[-1][1] == 100
+    bodies = [html.split('<body>', 1)[1].split('</body>')[0] for html, _ in chunks]
+    assert all(body.lstrip().startswith('<p><a name="file-') for body in bodies[1:])
+    original = html_path.read_text(encoding='utf-8').split('<body>', 1)[1].split('</body>')[0]
+    assert ''.join(bodies).split() == original.split()
+
+
+def test_inserted_file_reuses_later_parts(tmp_path, small_parts):
+    html_path = tmp_path / 'doc.html'
+    cache_dir = tmp_path / 'cache'
+    messages = []
+    for names in (['b', 'c', 'd'], ['a', 'b', 'c', 'd']):
+        write_document(html_path, names)
+        work_dir = tmp_path / f'work{len(names)}'
+        work_dir.mkdir()
+        pdfparts.render_parts(str(html_path), str(tmp_path / 'doc.pdf'), 'qt', None, 1, str(work_dir),
+                              logger=messages.append, cache_dir=str(cache_dir))
+    # 目录和新文件所在的段重新渲染，编号后移的 b、c、d 复用
+    assert '共 5 段：复用 3 段，渲染 2 段' in messages
+    reader = pypdf.PdfReader(str(tmp_path / 'doc.pdf'))
+    titles = [item.title for item in reader.outline[1]]
+    assert titles == ['目录', '1. a', '2. b', '3. c', '4. d']
+    text = ''.join(page.extract_text() for page in reader.pages)
+    assert '4.' in text
+
+
+def test_numbers_in_single_part(tmp_path):
+    # 目录和各章节在同一段中，目录标题不带编号
+    html_path = tmp_path / 'doc.html'
+    write_document(html_path, ['a', 'b'])
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    pdfparts.render_parts(str(html_path), str(tmp_path / 'doc.pdf'), 'qt', None, 1, str(work_dir))
+    reader = pypdf.PdfReader(str(tmp_path / 'doc.pdf'))
+    assert [item.title for item in reader.outline[1]] == ['目录', '1. a', '2. b']
@@ -0,0 +1,49 @@
+"""图形界面启动参数解析测试"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('PySide6')
+
+from function.cli import is_cli_invocation  # noqa: E402
+from gui.single_instance import parse_gui_args  # noqa: E402
+
+
+def test_positional_paths(tmp_path):
+    case = tmp_path / 'case'
+    case.mkdir()
+    request = parse_gui_args([str(case), 'mesh.msh'])
+    assert request['case'] == str(case)
+    assert request['msh'] == os.path.abspath('mesh.msh')
+    assert request['action'] == '' and request['new_instance'] is False
+
+
+def test_options(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    request = parse_gui_args(['--msh', 'a.msh', '--case', 'run', '--action', 'convert', '--new-instance'])
+    assert request == {'msh': str(tmp_path / 'a.msh'), 'case': str(tmp_path / 'run'),
+                       'action': 'convert', 'new_instance': True}
+
+
+def test_no_arguments():
+    assert parse_gui_args([]) == {'msh': '', 'case': '', 'action': '', 'new_instance': False}
+
+
+def test_unknown_action():
+    with pytest.raises(SystemExit):
+        parse_gui_args(['--action', 'unknown'])
+
+
+def test_cli_or_gui():
+    # 单个路径或选项启动图形界面，子命令和旧的两参数用法进入命令行模式
+    assert not is_cli_invocation([])
+    assert not is_cli_invocation(['mesh.msh'])
+    assert not is_cli_invocation(['--msh', 'mesh.msh'])
+    assert not is_cli_invocation(['mesh.msh', '--action', 'convert'])
+    assert is_cli_invocation(['convert', 'mesh.msh', 'case'])
+    assert is_cli_invocation(['mesh.msh', 'case'])
+    assert is_cli_invocation(['--help'])